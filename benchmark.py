@@ -0,0 +1,218 @@
+"""
+Benchmarks the game on the shipped worlds and on bigger versions of them, without a screen or sound. Every world is
+loaded, simulated for a fixed number of frames with a fixed time step and a scripted input trace, and rendered after
+every frame. The results are printed as JSON.
+
+The worlds are benchmarked in one or more modes: "play" sets the world up like the play menu does (only the objects
+in the active region are updated and render_dirty is used if DIRTY_RECT_RENDERING is set), "full" updates all objects
+and renders the entire world every frame.
+
+Usage:
+    python benchmark.py [--frames 600] [--scales 1 10 100] [--worlds "World 1-1" MarioBros first] [--modes play full]
+                        [--output file]
+"""
+import os
+
+# the benchmark doesn't need a screen or sound card, this must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# the assets are loaded relative to the directory of the game when the game is imported
+START_DIRECTORY = os.getcwd()
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from mario import World, HeadlessEngine, ScriptedInput, SCREEN_SIZE, FIXED_TIME_STEP, TILE_SIZE, \
+    ACTIVE_REGION_MARGIN, DIRTY_RECT_RENDERING, load_sprite_cache
+from mario.level_format import LevelData, read_level, tile_grid_shape, write_level
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+SEED = 0
+# the player walks to the right and jumps regularly, the trace is repeated
+INPUT_TRACE = ["right"] * 30 + ["right+up"] * 20 + ["right"] * 20 + ["left+up"] * 10
+# the number of frames that are simulated while the memory is traced, tracing makes everything a lot slower
+MEMORY_FRAMES = 60
+# the modes a world can be benchmarked in, see the docstring of this module
+MODES = ["play", "full"]
+
+
+def scale_level(level, scale):
+    """
+    Creates a bigger version of a level by putting the given number of copies of it next to each other, such that
+    there are scale times as many tiles and game objects. Only the first copy contains the player.
+
+    Args:
+        level (LevelData): The level to scale.
+        scale (int): The number of copies.
+
+    Returns:
+        LevelData: The scaled level.
+    """
+    width = level.size[0]
+    columns = width // TILE_SIZE[0]
+    size = (width * scale, level.size[1])
+    tile_grid = np.zeros(tile_grid_shape(size), dtype=np.uint8)
+    entities = []
+    for copy in range(scale):
+        tile_grid[copy * columns:(copy + 1) * columns] = level.tile_grid[:columns]
+        for tag, input_parameters in level.entities:
+            if tag == "mario" and copy > 0:
+                continue
+            pos = np.array(input_parameters[0]) + np.array([copy * width, 0])
+            entities.append((tag, (pos,) + tuple(input_parameters[1:])))
+    return LevelData(size, level.background_image, 0, level.tile_names, tile_grid, entities)
+
+
+def write_level_data(file, level):
+    """
+    Writes the given level data to a level file.
+
+    Args:
+        file (str): The path of the file.
+        level (LevelData): The level.
+    """
+    world = World()
+    world.load_level(level)
+    write_level(file, world)
+
+
+def load_world(file, mode):
+    """
+    Loads a world and sets it up for the given mode.
+
+    Args:
+        file (str): The path of the level file.
+        mode (str): "play" to set the world up like the play menu does, "full" to update all objects.
+
+    Returns:
+        World: The world.
+    """
+    world = World(load_file=file)
+    if mode == "play":
+        world.set_active_region(ACTIVE_REGION_MARGIN)
+    return world
+
+
+def run_frames(world, frames, screen=None, mode="play"):
+    """
+    Simulates the world for the given number of frames, the world is rendered after every frame if a screen is given.
+
+    Args:
+        world (World): The world.
+        frames (int): The number of frames.
+        screen (pygame.Surface, optional): The surface to render on. Defaults to None.
+        mode (str, optional): "play" to render like the play menu does, "full" to render the entire world every
+            frame. Defaults to "play".
+
+    Returns:
+        tuple: The total time of the simulation and the total time of the rendering in seconds.
+    """
+    engine = HeadlessEngine(world, ScriptedInput(INPUT_TRACE, loop=True), FIXED_TIME_STEP)
+    dirty = mode == "play" and DIRTY_RECT_RENDERING
+    update_time = 0
+    render_time = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        engine.step()
+        update_time += time.perf_counter() - start
+        if screen is not None:
+            start = time.perf_counter()
+            if dirty:
+                world.render_dirty(screen)
+            else:
+                world.render(screen)
+            render_time += time.perf_counter() - start
+    return update_time, render_time
+
+
+def benchmark_level(file, frames, screen, mode="play"):
+    """
+    Benchmarks one level file.
+
+    Args:
+        file (str): The path of the level file.
+        frames (int): The number of frames to simulate.
+        screen (pygame.Surface): The surface to render on.
+        mode (str, optional): The mode, see the docstring of this module. Defaults to "play".
+
+    Returns:
+        dict: The results of the benchmark.
+    """
+    np.random.seed(SEED)
+    start = time.perf_counter()
+    world = load_world(file, mode)
+    load_time = time.perf_counter() - start
+    n_game_objects = len(world.game_objects)
+    update_time, render_time = run_frames(world, frames, screen, mode)
+
+    # the memory is measured in a separate run, because tracing the memory slows everything down
+    np.random.seed(SEED)
+    tracemalloc.start()
+    run_frames(load_world(file, mode), MEMORY_FRAMES, mode=mode)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {
+        "mode": mode,
+        "game_objects": n_game_objects,
+        "tiles": len(world.tile_grid),
+        "frames": frames,
+        "load_time_s": load_time,
+        "steps_per_s": frames / update_time,
+        "render_ms_per_frame": 1000 * render_time / frames,
+        "peak_traced_memory_mb": peak_memory / 1024 ** 2,
+    }
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS, this is the maximum of the entire process so far
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result["max_rss_mb"] = max_rss / (1024 ** 2 if os.uname().sysname == "Darwin" else 1024)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the game on the shipped worlds.")
+    parser.add_argument("--frames", type=int, default=600, help="the number of frames simulated per world")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="the number of copies of every world that are put next to each other")
+    parser.add_argument("--worlds", nargs="+", default=["World 1-1", "MarioBros", "first"],
+                        help="the names of the worlds in the Worlds directory")
+    parser.add_argument("--modes", nargs="+", default=["play"], choices=MODES,
+                        help="play: set the world up like the play menu, full: update and render everything")
+    parser.add_argument("--output", default=None, help="the file to write the results to, instead of printing them")
+    arguments = parser.parse_args()
+
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    load_sprite_cache()
+
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in arguments.worlds:
+            level = read_level(os.path.join("Worlds", name))
+            for scale in arguments.scales:
+                file = os.path.join(directory, name + " x" + str(scale))
+                write_level_data(file, scale_level(level, scale))
+                for mode in arguments.modes:
+                    key = name + " x" + str(scale)
+                    if len(arguments.modes) > 1:
+                        key += " " + mode
+                    results[key] = benchmark_level(file, arguments.frames, screen, mode)
+
+    output = json.dumps(results, indent=4)
+    if arguments.output is not None:
+        with open(os.path.join(START_DIRECTORY, arguments.output), "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Writes the sprite manifest and the sprite atlas (see mario.sprite_loader.build_sprite_atlas), such that the game
+doesn't need to load and scan the big sprite sheets when it starts. Run this again after changing a sprite sheet or
+the rect of a sprite, until then the game falls back to the sheets.
+
+Usage:
+    python build_sprite_atlas.py
+"""
+import os
+
+# no screen is shown, but one is needed to convert the sprites. This must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# the assets are loaded relative to the directory of the game when the game is imported
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+from mario import SCREEN_SIZE, SPRITE_PATH
+from mario.sprite_loader import SPRITE_MANIFEST_FILE, build_sprite_atlas
+
+
+def main():
+    pygame.display.set_mode(SCREEN_SIZE)
+    build_sprite_atlas()
+    print("Wrote " + SPRITE_MANIFEST_FILE + " and its atlas in " + SPRITE_PATH)
+
+
+if __name__ == "__main__":
+    main()
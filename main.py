@@ -1,4 +1,5 @@
-from mario import MainMenu, LevelMenu, PlayMenu, GameOverMenu, LevelCreatorMenu, AboutMenu, SettingsMenu, SCREEN_SIZE, mixer
+from mario import MainMenu, LevelMenu, PlayMenu, GameOverMenu, LevelCreatorMenu, AboutMenu, SettingsMenu, SCREEN_SIZE, mixer, \
+    load_sprite_cache, load_music, MUSIC_FILE, MUSIC_VOLUME
 import pygame
 
 pygame.init()
@@ -7,6 +8,8 @@ pygame.init()
 def main():
     screen = pygame.display.set_mode(SCREEN_SIZE)
     pygame.display.set_caption("Super mario Bros")
+    # now that the screen exists, the cached sprites can be converted for faster blitting
+    load_sprite_cache()
 
     main_menu = MainMenu(screen)
     level_menu = LevelMenu(screen)
@@ -17,6 +20,9 @@ def main():
     settings_menu = SettingsMenu(screen)
     current_menu = "main"
     world = None
+    # the state of the world when the level was loaded, a retry restores it instead of loading the level again
+    snapshot = None
+    load_music(MUSIC_FILE, MUSIC_VOLUME)
     mixer.music.play(-1, 0.0)
     if SettingsMenu.SETTINGS["Music"] == "off":
         mixer.music.pause()
@@ -25,10 +31,15 @@ def main():
             current_menu = main_menu.loop()
         elif current_menu == "level":
             current_menu, world, path = level_menu.loop()
+            if world is not None:
+                snapshot = world.snapshot()
         elif current_menu == "play":
             current_menu = play_menu.loop(world, path)
         elif current_menu == "game over":
             current_menu = game_over_menu.loop(world)
+            if current_menu == "retry":
+                world.restore(snapshot)
+                current_menu = "play"
         elif current_menu == "creator":
             current_menu = level_creator_menu.loop()
         elif current_menu == "about":
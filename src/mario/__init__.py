@@ -1,9 +1,25 @@
 from .constants import *
+from .object_types import ObjectType, COLLISION_MATRIX
 from .game_object import GameObject
+from .spatial_hash import SpatialHash
+from .physics import PhysicsStore
+from .animation import AnimationClock
+from .static_layer import StaticLayer
+from .collision_mesh import SolidRect, CollisionMesh
+from .tile_grid import TileGrid
 from .menus import *
 from .tiles import *
 from .specials import *
 from .enemies import *
 from .player import *
 from .world import *
+from .snapshot import WorldSnapshot
+from .level_format import *
+from .level_index import LevelIndex
+from .level_loader import LevelLoader
+from .edit_journal import EditJournal
+from .engine import *
+from .profiler import *
+from .text_cache import *
+from .assets import *
 from .sprite_loader import *
\ No newline at end of file
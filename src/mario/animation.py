@@ -0,0 +1,33 @@
+class AnimationClock:
+    """
+    The clock of the animations in a world. Instead of every animated game object counting the time until its next
+    frame, all objects with the same cycle (e.g. all coins, or all goombas) show the same frame, which is computed from
+    the time of the clock. The world advances the clock once per update.
+    """
+    def __init__(self):
+        """
+        Initializes an AnimationClock object.
+        """
+        self.time = 0
+
+    def advance(self, time):
+        """
+        Advances the clock by the given time.
+
+        Args:
+            time (float): The elapsed time since the last update.
+        """
+        self.time += time
+
+    def frame(self, frame_time, n_frames):
+        """
+        Returns the current frame of a cycle of animation frames.
+
+        Args:
+            frame_time (float): How long every frame is shown.
+            n_frames (int): The number of frames in the cycle.
+
+        Returns:
+            int: The index of the current frame.
+        """
+        return int(self.time / frame_time) % n_frames
@@ -0,0 +1,131 @@
+import threading
+from collections.abc import Mapping
+import pygame
+from pygame import mixer
+
+# the settings of the mixer, they are used when the mixer is initialized (by pygame.init() or init_mixer)
+mixer.pre_init(channels=12)
+
+# loading assets can happen in a background thread (e.g. when a level is loaded), so everything that is loaded lazily
+# is protected by this lock
+ASSET_LOCK = threading.RLock()
+
+
+class LazyAsset:
+    """
+    A placeholder for an asset (a font, a sound, ...) that is only loaded the first time it is used, such that
+    importing the game doesn't need a screen or sound card and is fast. All attributes of the placeholder are those of
+    the loaded asset, so it can be used like the asset itself (e.g. FONT_BIG.render(...) or COIN_SOUND.play()).
+    """
+    def __init__(self, loader, *args):
+        """
+        Initializes a LazyAsset object.
+
+        Args:
+            loader (callable): The function that loads the asset.
+            *args: The arguments of the loader.
+        """
+        self.loader = loader
+        self.args = args
+        self.asset = None
+
+    def get(self):
+        """
+        Returns:
+            The asset, it is loaded the first time.
+        """
+        if self.asset is None:
+            with ASSET_LOCK:
+                if self.asset is None:
+                    self.asset = self.loader(*self.args)
+        return self.asset
+
+    @property
+    def loaded(self):
+        return self.asset is not None
+
+    def __getattr__(self, name):
+        # only called for attributes that the placeholder itself doesn't have
+        if name in ("loader", "args", "asset"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+class LazyDict(Mapping):
+    """
+    A dict of which the values are only loaded the first time they are looked up. The keys are known in advance.
+    """
+    def __init__(self, loaders=()):
+        """
+        Initializes a LazyDict object.
+
+        Args:
+            loaders (dict, optional): Maps every key to a function without arguments that loads its value. Defaults to
+                ().
+        """
+        self.loaders = dict(loaders)
+        self.loaded_values = dict()
+
+    def __setitem__(self, key, loader):
+        """
+        Adds a key with the function that loads its value.
+        """
+        self.loaders[key] = loader
+
+    def __getitem__(self, key):
+        value = self.loaded_values.get(key)
+        if value is None:
+            loader = self.loaders[key]
+            with ASSET_LOCK:
+                value = self.loaded_values.get(key)
+                if value is None:
+                    value = loader()
+                    self.loaded_values[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self):
+        return len(self.loaders)
+
+
+def init_mixer():
+    """
+    Initializes the mixer if this didn't happen yet.
+    """
+    with ASSET_LOCK:
+        if mixer.get_init() is None:
+            mixer.init()
+
+
+def load_font(file, size):
+    """
+    Returns:
+        pygame.font.Font: The font in the given file (None for the default font) with the given size.
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(file, size)
+
+
+def load_sound(file):
+    """
+    Returns:
+        pygame.mixer.Sound: The sound in the given file, the mixer is initialized if needed.
+    """
+    init_mixer()
+    return mixer.Sound(file)
+
+
+def load_music(file, volume):
+    """
+    Loads the given music in the mixer (initializing it if needed), such that it can be played with mixer.music.play.
+
+    Args:
+        file (str): The path of the music file.
+        volume (float): The volume of the music.
+    """
+    init_mixer()
+    mixer.music.load(file)
+    mixer.music.set_volume(volume)
@@ -0,0 +1,143 @@
+import numpy as np
+from .constants import *
+from .object_types import ObjectType
+
+
+class SolidRect:
+    """
+    A rectangle of tiles in the collision mesh of a tile grid. In collisions it takes the place of the tiles it covers,
+    so it has the attributes of a tile that collisions use.
+    """
+    type = ObjectType.TILE
+    passable = False
+
+    def __init__(self, pos, size):
+        """
+        Initializes a SolidRect object.
+
+        Args:
+            pos (tuple): The position of the rectangle.
+            size (tuple): The size of the rectangle.
+        """
+        self.pos = np.array(pos, dtype=np.float64)
+        self.size = size
+
+    def special_reaction_collision(self, side, other):
+        """
+        Tiles don't react to collisions.
+        """
+        pass
+
+    def __str__(self):
+        return "solid rect"
+
+
+class CollisionMesh:
+    """
+    The normal tiles of a tile grid merged into rectangles: every horizontal run of tiles (axis 0, one tile high) and
+    every vertical run of tiles (axis 1, one tile wide) is a SolidRect. A vertical collision is resolved against the
+    horizontal run of the tile that is hit and a horizontal collision against its vertical run. The object is pushed
+    to the same position as by the tile itself, but no tile objects need to be created.
+
+    For every tile position and axis, the id of its run is kept in an array (-1 if there is no normal tile). When a
+    tile is added or removed, only the runs through its position are computed again.
+    """
+    def __init__(self, tile_grid):
+        """
+        Initializes a CollisionMesh object, the runs of all tiles in the grid are computed.
+
+        Args:
+            tile_grid (TileGrid): The tile grid.
+        """
+        self.tile_grid = tile_grid
+        # per axis: the run id of every tile position, the SolidRect of every run id and the next free run id
+        self.run_ids = [None, None]
+        self.rects = [dict(), dict()]
+        self.next_ids = [0, 0]
+        for axis in range(2):
+            self.build(axis)
+
+    def solid(self):
+        """
+        Returns:
+            numpy.ndarray: Whether every tile position has a normal tile, other tiles are not in the mesh.
+        """
+        ids = self.tile_grid.ids
+        return (ids != 0) & (ids != self.tile_grid.CUSTOM_TILE_ID)
+
+    def build(self, axis):
+        """
+        Computes the runs of all tiles along the given axis.
+
+        Args:
+            axis (int): 0 for the horizontal runs, 1 for the vertical runs.
+        """
+        # the runs are numbered in the order of the lines (rows or columns) of the grid
+        lines = np.moveaxis(self.solid(), axis, -1)
+        starts = np.copy(lines)
+        starts[:, 1:] &= ~lines[:, :-1]
+        numbers = np.cumsum(starts.ravel()).reshape(lines.shape) - 1
+        run_ids = np.where(lines, numbers, -1).astype(np.int32)
+        self.run_ids[axis] = np.moveaxis(run_ids, -1, axis)
+
+        lengths = np.bincount(run_ids[lines]).tolist()
+        line_indices, begins = np.nonzero(starts)
+        self.rects[axis] = {run_id: self.make_rect(axis, line, begin, length) for run_id, (line, begin, length)
+                            in enumerate(zip(line_indices.tolist(), begins.tolist(), lengths))}
+        self.next_ids[axis] = len(lengths)
+
+    @staticmethod
+    def make_rect(axis, line, begin, length):
+        """
+        Returns:
+            SolidRect: The rectangle of the run of the given length along the given axis, which starts at tile
+                position begin of the given line (row for axis 0, column for axis 1).
+        """
+        if axis == 0:
+            return SolidRect((begin * TILE_SIZE[0], line * TILE_SIZE[1]), (length * TILE_SIZE[0], TILE_SIZE[1]))
+        return SolidRect((line * TILE_SIZE[0], begin * TILE_SIZE[1]), (TILE_SIZE[0], length * TILE_SIZE[1]))
+
+    def update(self, i, j):
+        """
+        Computes the runs through the given tile position again, after a tile was added or removed there.
+
+        Args:
+            i (int): The horizontal index of the tile position.
+            j (int): The vertical index of the tile position.
+        """
+        ids = self.tile_grid.ids
+        custom_id = self.tile_grid.CUSTOM_TILE_ID
+        for axis, line, index in ((0, j, i), (1, i, j)):
+            line_ids = (ids[:, line] if axis == 0 else ids[line, :]).tolist()
+            line_run_ids = self.run_ids[axis][:, line] if axis == 0 else self.run_ids[axis][line, :]
+
+            def solid(k):
+                return line_ids[k] != 0 and line_ids[k] != custom_id
+
+            # the tiles that are connected to the position along the axis, their runs are replaced
+            begin = index
+            while begin > 0 and solid(begin - 1):
+                begin -= 1
+            end = index + 1
+            while end < len(line_ids) and solid(end):
+                end += 1
+            for run_id in set(line_run_ids[begin:end].tolist()) - {-1}:
+                del self.rects[axis][run_id]
+            line_run_ids[begin:end] = -1
+
+            runs = [(begin, end)] if solid(index) else [(begin, index), (index + 1, end)]
+            for run_begin, run_end in runs:
+                if run_begin < run_end:
+                    run_id = self.next_ids[axis]
+                    self.next_ids[axis] += 1
+                    line_run_ids[run_begin:run_end] = run_id
+                    self.rects[axis][run_id] = self.make_rect(axis, line, run_begin, run_end - run_begin)
+
+    def rect_at(self, i, j, axis):
+        """
+        Returns:
+            SolidRect: The run along the given axis of the normal tile at the given tile position, None if there is
+                no normal tile there.
+        """
+        run_id = self.run_ids[axis][i, j]
+        return None if run_id < 0 else self.rects[axis][run_id]
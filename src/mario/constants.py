@@ -1,18 +1,25 @@
 import pygame
 import os
 from pygame import mixer
-
-pygame.init()
-mixer.pre_init(channels=12)
-mixer.init()
+from .assets import LazyAsset, load_font, load_sound, load_music
 
 # A list of all constants used in the game, you can change them at will (changing TILE_SIZE will change the saved
 # worlds in ways you probably don't want, so this is not advised)
 
 GRAVITY = 500
 FPS = 60
+# The time step of the simulation when it is run with a fixed time step (e.g. without a screen)
+FIXED_TIME_STEP = 1 / FPS
+# The longest time step of one update, a slower frame is split into equal updates of at most this time
+MAX_TIME_STEP = 1 / 30
 SCREEN_SIZE = (1200, 600)
 TILE_SIZE = (15, 15)
+# A movement along one axis that is longer than this (in pixels) is swept: it is stopped at the first tile or solid
+# object on its way, so it can't pass through it. Shorter movements can't pass through a tile
+SWEEP_DISTANCE = min(TILE_SIZE) // 2
+# How far (in pixels) a swept movement goes into the tile or object it is stopped at, such that the collision with it
+# is still handled (e.g. standing on a floor)
+COLLISION_SKIN = 1
 CAMERA_POS = (-300, -300)
 TIME_SPRITE_CHANGE = 0.075
 TIME_SPRITE_CHANGE_PLAYER = 0.01
@@ -26,24 +33,65 @@ SPEED_MUSHROOM = 60
 SPEED_TURTLE = 120
 INVULNERABLE_TIME = 0.6
 FLAGPOLE_SIZE = (60, 150)
+# Mario's sprites are scaled down by these factors, depending on whether he is small (1 life) or big
+MARIO_SCALE_SMALL = 1.3
+MARIO_SCALE_BIG = 1.1
 GOOMBA_SECONDS_REMOVED_AFTER_DEATH = 1
+# The size of one bucket of the spatial hash that is used to find objects that are close to each other
+SPATIAL_HASH_CELL_SIZE = (4 * TILE_SIZE[0], 4 * TILE_SIZE[1])
+# How far (in pixels) outside of the screen game objects are still updated when the active region is used
+ACTIVE_REGION_MARGIN = 20 * TILE_SIZE[0]
+# The initial number of game objects the arrays of the physics store can hold
+PHYSICS_STORE_CAPACITY = 64
+# the static part of a world (background, tiles) is rendered in chunks of this width, and the rendered chunks may use
+# at most this many bytes
+STATIC_CHUNK_WIDTH = 40 * TILE_SIZE[0]
+STATIC_LAYER_MEMORY_BUDGET = 16 * 1024 * 1024
+# Whether the play menu only draws and updates the parts of the screen that changed, instead of the entire screen
+DIRTY_RECT_RENDERING = True
+# The number of frames the profiler keeps, the size of its graph and the frame time (in ms) at the top of the graph
+PROFILER_HISTORY = 600
+PROFILER_GRAPH_SIZE = (300, 100)
+PROFILER_GRAPH_MAX_MS = 50
+# The percentiles of the profiler overlay are computed again every this many frames
+PROFILER_TEXT_INTERVAL = 30
+PROFILER_COLORS = [(230, 25, 75), (60, 180, 75), (255, 225, 25), (0, 130, 200), (245, 130, 48), (145, 30, 180),
+                   (70, 240, 240), (240, 50, 230)]
+# The number of rendered texts that are kept by the text cache
+TEXT_CACHE_SIZE = 256
+# The part of the progress of the level loader that is reading the level file, the rest is rendering the static layer
+LEVEL_LOADER_WORLD_PROGRESS = 0.8
+# The size of the progress bar that is shown while a level is loading
+LOADING_BAR_SIZE = (400, 20)
+# The level index (metadata and thumbnails of the levels) is kept in this directory, the index is rebuilt when its
+# version differs from this one
+LEVEL_INDEX_DIRECTORY = ".level_index"
+LEVEL_INDEX_VERSION = 2
+LEVEL_THUMBNAIL_SIZE = (240, 120)
+# The level creator autosaves the world that is changed in this directory, see EditJournal. The journal of changes is
+# compacted (written as a new base world) when it has this many records
+AUTOSAVE_DIRECTORY = "TempWorlds"
+JOURNAL_COMPACTION_RECORDS = 500
+# The name of the autosave of a world that is created and has no name yet
+NEW_WORLD_AUTOSAVE = "new world"
 
 SPRITE_PATH = os.path.join("assets", "sprites")
 SOUND_PATH = os.path.join("assets", "sounds")
 
-FONT_BIG = pygame.font.Font(os.path.join("assets", "ARCADE_N.TTF"), 30)
-FONT_MEDIUM = pygame.font.Font(os.path.join("assets", "ARCADE_N.TTF"), 20)
-FONT_SMALL = pygame.font.Font(os.path.join("assets", "ARCADE_N.TTF"), 15)
-FONT_MINI = pygame.font.Font(os.path.join("assets", "ARCADE_N.TTF"), 10)
-FONT_STANDARD = pygame.font.Font(None, 30)
+# The fonts and sounds are only loaded when they are used for the first time, see LazyAsset
+FONT_BIG = LazyAsset(load_font, os.path.join("assets", "ARCADE_N.TTF"), 30)
+FONT_MEDIUM = LazyAsset(load_font, os.path.join("assets", "ARCADE_N.TTF"), 20)
+FONT_SMALL = LazyAsset(load_font, os.path.join("assets", "ARCADE_N.TTF"), 15)
+FONT_MINI = LazyAsset(load_font, os.path.join("assets", "ARCADE_N.TTF"), 10)
+FONT_STANDARD = LazyAsset(load_font, None, 30)
 
-# Loading all sounds
-mixer.music.load(os.path.join(SOUND_PATH, "SuperMarioBros.mp3"))
-mixer.music.set_volume(0.3)
-COIN_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_coin.wav"))
-JUMP_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_jump-super.wav"))
-KICK_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_kick.wav"))
-DIE_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_mariodie.wav"))
-POWERUP_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_powerup.wav"))
-POWERUP_APPEARS_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_powerup_appears.wav"))
-STAGE_CLEAR_SOUND = mixer.Sound(os.path.join(SOUND_PATH, "smb_stage_clear.wav"))
\ No newline at end of file
+# The music is loaded with load_music(MUSIC_FILE, MUSIC_VOLUME) before it is played
+MUSIC_FILE = os.path.join(SOUND_PATH, "SuperMarioBros.mp3")
+MUSIC_VOLUME = 0.3
+COIN_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_coin.wav"))
+JUMP_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_jump-super.wav"))
+KICK_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_kick.wav"))
+DIE_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_mariodie.wav"))
+POWERUP_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_powerup.wav"))
+POWERUP_APPEARS_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_powerup_appears.wav"))
+STAGE_CLEAR_SOUND = LazyAsset(load_sound, os.path.join(SOUND_PATH, "smb_stage_clear.wav"))
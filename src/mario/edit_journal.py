@@ -0,0 +1,286 @@
+import json
+import os
+import numpy as np
+from .constants import *
+from .level_format import ENTITY_TYPES, entity_tag, write_level
+from .tiles import NormalTile
+from .world import World
+
+
+def encode_game_object(game_object):
+    """
+    Returns:
+        list: The tag of the type of the given game object followed by its input parameters, as they are stored in
+            the edit journal. Tiles have the tag "tile".
+    """
+    if type(game_object) is NormalTile:
+        tag, fields = "tile", ("str",)
+    else:
+        tag = entity_tag(game_object)
+        if tag is None:
+            raise ValueError("Game objects of type " + type(game_object).__name__ + " can't be saved.")
+        fields = ENTITY_TYPES[tag][1]
+    pos = game_object.input_parameters[0]
+    record = [tag, [float(pos[0]), float(pos[1])]]
+    for field, value in zip(fields, game_object.input_parameters[1:]):
+        if field == "size" and value is not None:
+            value = [int(value[0]), int(value[1])]
+        elif field == "int":
+            value = int(value)
+        record.append(value)
+    return record
+
+
+def decode_game_object(record):
+    """
+    Returns:
+        GameObject: A new game object created from a record of encode_game_object.
+    """
+    tag, pos = record[0], np.array(record[1])
+    if tag == "tile":
+        return NormalTile(pos, record[2])
+    cls, fields = ENTITY_TYPES[tag]
+    values = [tuple(value) if field == "size" and value is not None else value
+              for field, value in zip(fields, record[2:])]
+    return cls(pos, *values)
+
+
+class EditJournal:
+    """
+    Autosaves the changes that are made to a world in the level creator and keeps them for undo and redo.
+
+    The autosave consists of a base level file and a journal file to which every change (adding or removing a game
+    object) is appended as one line, so saving a change doesn't depend on the size of the world. When the journal gets
+    long, it is compacted: the current world is written as the new base and the journal is emptied. After a crash, the
+    world is recovered by loading the base and replaying the journal. An undo or redo is journaled as the change it
+    makes, so the journal is never rewritten.
+
+    Every compaction has a generation number, which is in the file name of its base and in the first line of its
+    journal. The journal is only replayed on the base of the same generation, so a crash during a compaction never
+    replays the changes of the old journal on the new base, which already contains them.
+    """
+    def __init__(self, name, directory=AUTOSAVE_DIRECTORY, compaction_records=JOURNAL_COMPACTION_RECORDS):
+        """
+        Initializes an EditJournal object.
+
+        Args:
+            name (str): The name of the autosave, e.g. the file name of the world.
+            directory (str, optional): The directory of the autosave files. Defaults to AUTOSAVE_DIRECTORY.
+            compaction_records (int, optional): The journal is compacted when it has this many records. Defaults to
+                JOURNAL_COMPACTION_RECORDS.
+        """
+        self.directory = directory
+        self.name = name
+        self.journal_file = os.path.join(directory, name + ".journal")
+        self.compaction_records = compaction_records
+        self.world = None
+        self.file = None
+        self.n_records = 0
+        # the generation of the last compaction, see base_file
+        self.generation = 0
+        # the changes that can be undone and redone: ("add" or "remove", record of the game object)
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def base_file(self, generation):
+        """
+        Returns:
+            str: The path of the base of the given generation.
+        """
+        return os.path.join(self.directory, self.name + ".base." + str(generation))
+
+    def base_generations(self):
+        """
+        Returns:
+            list: The generations of the bases that are on disk, from old to new.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        prefix = self.name + ".base."
+        return sorted(int(file[len(prefix):]) for file in os.listdir(self.directory)
+                      if file.startswith(prefix) and file[len(prefix):].isdigit())
+
+    def journal_generation(self):
+        """
+        Returns:
+            int: The generation in the first line of the journal, None if there is no journal or no complete first
+                line.
+        """
+        if not os.path.exists(self.journal_file):
+            return None
+        with open(self.journal_file) as f:
+            try:
+                return json.loads(f.readline())["generation"]
+            except (ValueError, KeyError, TypeError):
+                return None
+
+    def has_autosave(self):
+        """
+        Returns:
+            bool: Whether there is an autosave, which means that the level creator was not closed properly.
+        """
+        return len(self.base_generations()) > 0
+
+    def start(self, world):
+        """
+        Starts journaling the changes to the given world, the world is written as the base of the autosave.
+
+        Args:
+            world (World): The world that is changed.
+        """
+        self.world = world
+        self.undo_stack = []
+        self.redo_stack = []
+        # the new base must be newer than an autosave that was not recovered
+        self.generation = max([0] + self.base_generations())
+        self.compact()
+
+    def recover(self):
+        """
+        Loads the world of the autosave: the newest base with all changes of the journal, if the journal belongs to
+        that base. A last record that was only partly written is ignored.
+
+        Returns:
+            World: The recovered world.
+        """
+        generation = self.base_generations()[-1]
+        world = World(load_file=self.base_file(generation))
+        if self.journal_generation() == generation:
+            with open(self.journal_file) as f:
+                # the first line is the generation
+                f.readline()
+                for line in f:
+                    try:
+                        operation, record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.apply(world, operation, record)
+        return world
+
+    def compact(self):
+        """
+        Writes the current world as the base of a new generation and starts its empty journal. The old base is only
+        removed after that, such that there is always a complete base with a journal that belongs to it, or a newer
+        base that already contains all changes of the journal.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self.file is not None:
+            self.file.close()
+        generation = self.generation + 1
+        base_file = self.base_file(generation)
+        # the base is on disk before it gets its name, such that a base with a name is always complete
+        write_level(base_file + ".tmp", self.world)
+        with open(base_file + ".tmp", "rb+") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(base_file + ".tmp", base_file)
+
+        with open(self.journal_file + ".tmp", "w") as f:
+            f.write(json.dumps({"generation": generation}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.journal_file + ".tmp", self.journal_file)
+        self.file = open(self.journal_file, "a")
+        self.n_records = 0
+
+        for old_generation in self.base_generations():
+            if old_generation < generation:
+                os.remove(self.base_file(old_generation))
+        self.generation = generation
+
+    def append(self, operation, record):
+        """
+        Appends a change to the journal, it is on disk when this returns.
+
+        Args:
+            operation (str): "add" or "remove".
+            record (list): The record of the game object, see encode_game_object.
+        """
+        self.file.write(json.dumps([operation, record]) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.n_records += 1
+        if self.n_records >= self.compaction_records:
+            self.compact()
+
+    def apply(self, world, operation, record):
+        """
+        Makes a change of the journal to the given world.
+
+        Args:
+            world (World): The world.
+            operation (str): "add" or "remove".
+            record (list): The record of the game object, see encode_game_object.
+        """
+        if operation == "add":
+            world.add_gameobject(decode_game_object(record))
+        else:
+            game_object = self.find(world, record)
+            if game_object is not None:
+                world.remove_gameobject(game_object)
+
+    def find(self, world, record):
+        """
+        Returns:
+            GameObject: The game object of the given world with the given record, or None if there is none.
+        """
+        if record[0] == "tile":
+            return world.tile_grid.tile_at(record[1])
+        for game_object in world.get_all_game_objects_no_tiles() + world.background_objects:
+            if entity_tag(game_object) == record[0] and encode_game_object(game_object) == record:
+                return game_object
+        return None
+
+    def added(self, game_object):
+        """
+        Journals that the given game object was added to the world.
+        """
+        self.change("add", encode_game_object(game_object))
+
+    def removed(self, game_object):
+        """
+        Journals that the given game object is about to be removed from the world.
+        """
+        self.change("remove", encode_game_object(game_object))
+
+    def change(self, operation, record):
+        """
+        Journals a change that was made by the user, the changes that were undone can no longer be redone.
+        """
+        self.append(operation, record)
+        self.undo_stack.append((operation, record))
+        self.redo_stack = []
+
+    def undo(self):
+        """
+        Undoes the last change that was not undone yet, if any.
+        """
+        if len(self.undo_stack) > 0:
+            operation, record = self.undo_stack.pop()
+            inverse = "remove" if operation == "add" else "add"
+            self.apply(self.world, inverse, record)
+            self.append(inverse, record)
+            self.redo_stack.append((operation, record))
+
+    def redo(self):
+        """
+        Makes the last undone change again, if any.
+        """
+        if len(self.redo_stack) > 0:
+            operation, record = self.redo_stack.pop()
+            self.apply(self.world, operation, record)
+            self.append(operation, record)
+            self.undo_stack.append((operation, record))
+
+    def close(self):
+        """
+        Stops journaling and removes the autosave, this is done when the world was saved.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        files = [self.base_file(generation) for generation in self.base_generations()] + [self.journal_file]
+        for file in files:
+            if os.path.exists(file):
+                os.remove(file)
+        self.world = None
@@ -1,10 +1,13 @@
 from .sprite_loader import *
 from .constants import *
 from .game_object import GameObject
+from .object_types import ObjectType, collision_mask
 import numpy as np
 
 
 class Enemy(GameObject):
+    batch_physics = True
+
     def __init__(self, pos, sprites, death_sprite=None, dir=1, world=None):
         """
         Initializes an Enemy object.
@@ -20,7 +23,6 @@ class Enemy(GameObject):
             direction (int): The direction of the enemy.
             speed (int): The speed of the enemy.
             current_sprite_int (int): The index of the current sprite in use.
-            time_since_sprite_change (int): The time since the sprite was last changed.
             time_death (int): The time since the enemy died.
             death_sprite (optional): The sprite of the enemy when it is dead but not yet removed from the world.
             sprites (list): A list of sprites for the enemy.
@@ -28,14 +30,11 @@ class Enemy(GameObject):
         self.direction = dir
         self.speed = SPEED_ENEMY
         self.current_sprite_int = 0
-        self.time_since_sprite_change = 0
         self.time_death = 0
         self.death_sprite = death_sprite
         self.sprites = sprites
-        sprite = self.sprites[0]
-        if self.direction == -1:
-            sprite = pygame.transform.flip(sprite, True, False)
-        super(Enemy, self).__init__(pos, np.array([dir * SPEED_ENEMY, 0]), sprite, world=world, type="enemy")
+        sprite = get_sprite(self.sprites[0], self.direction == -1)
+        super(Enemy, self).__init__(pos, np.array([dir * SPEED_ENEMY, 0]), sprite, world=world, type=ObjectType.ENEMY)
 
     def special_reaction_collision(self, side, other):
         """
@@ -71,9 +70,9 @@ class Enemy(GameObject):
         """
         Changes the sprite of the enemy character based on its current state and direction.
         """
-        if self.time_since_sprite_change > TIME_SPRITE_CHANGE:
-            self.current_sprite_int = (self.current_sprite_int + 1) % len(self.sprites)
-            self.time_since_sprite_change = 0
+        # the enemies with the same sprites walk in step, see AnimationClock
+        if self.alive and self.world is not None:
+            self.current_sprite_int = self.world.animation_clock.frame(TIME_SPRITE_CHANGE, len(self.sprites))
 
         if self.alive:
             sprite = self.sprites[self.current_sprite_int]
@@ -82,12 +81,9 @@ class Enemy(GameObject):
         else:
             sprite = self.sprites[0]
 
-        if self.direction == 1:
-            sprite = pygame.transform.flip(sprite, True, False)
-
-        self.set_sprite(sprite)
+        self.set_sprite(get_sprite(sprite, self.direction == 1))
 
-    def update(self, time):
+    def update_state(self, time):
         """
         Update the enemy's state based on the elapsed time.
 
@@ -97,9 +93,7 @@ class Enemy(GameObject):
         Returns:
             None
         """
-        super(Enemy, self).update(time)
         if self.alive:
-            self.time_since_sprite_change += time
             self.vel[0] = self.direction * self.speed
         else:
             self.time_death += time
@@ -121,7 +115,7 @@ class Goomba(Enemy):
         self.time_death = 0
         super(Goomba, self).__init__(pos, GOOMBA, GOOMBA_DEATH, dir=dir, world=world)
 
-    def update(self, time):
+    def update_state(self, time):
         """
         Update the Goomba's state based on the elapsed time.
 
@@ -131,7 +125,7 @@ class Goomba(Enemy):
         Returns:
             None
         """
-        super(Goomba, self).update(time)
+        super(Goomba, self).update_state(time)
 
         if self.time_death >= GOOMBA_SECONDS_REMOVED_AFTER_DEATH:
             self.world.remove_gameobject(self)
@@ -168,7 +162,7 @@ class KoopaTroopa(Enemy):
         Creates a KoopTroopaTurtle object, adjusts its position, and adds it to the game world.
         """
         super(KoopaTroopa, self).on_death()
-        turtle = KoopTroopaTurtle(self.pos, color=self.color)
+        turtle = KoopTroopaTurtle(np.copy(self.pos), color=self.color)
         turtle.pos[1] += self.size[1] - turtle.size[1]
         world = self.world
         self.world.remove_gameobject(self)
@@ -199,8 +193,10 @@ class KoopTroopaTurtle(Enemy):
             sprites = KOOPA_TURTLE["red"]
 
         super(KoopTroopaTurtle, self).__init__(pos, sprites, None, dir=dir, world=world)
+        self.type = ObjectType.ENEMY | ObjectType.TURTLE
+        self.collision_mask = collision_mask(self.type)
 
-        self.vel = np.zeros(2)
+        self.vel[:] = 0
         self.speed = SPEED_TURTLE
         self.direction = 0
 
@@ -235,12 +231,12 @@ class KoopTroopaTurtle(Enemy):
         """
         super(KoopTroopaTurtle, self).special_reaction_collision(side, other)
 
-        if self.direction == 0 and not "tile" in other.type and not other.passable:
+        if self.direction == 0 and other.type != ObjectType.TILE and not other.passable:
             if other.pos[0] <= self.pos[0]:
                 self.direction = 1
             else:
                 self.direction = -1
-        elif self.direction != 0 and other.type == "enemy" and str(other) != "turtle":
+        elif self.direction != 0 and other.type == ObjectType.ENEMY:
             other.set_lives(other.lives - 1)
             if other.alive:
                 self.direction *= -1
@@ -0,0 +1,139 @@
+import pygame
+from .constants import *
+
+
+class InputState:
+    """
+    The buttons that are pressed during one step of the simulation.
+    """
+    def __init__(self, left=False, right=False, up=False, down=False):
+        """
+        Initializes an InputState object.
+
+        Args:
+            left (bool, optional): Whether the player wants to move left. Defaults to False.
+            right (bool, optional): Whether the player wants to move right. Defaults to False.
+            up (bool, optional): Whether the player wants to jump. Defaults to False.
+            down (bool, optional): Whether the player wants to duck. Defaults to False.
+        """
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+
+    @staticmethod
+    def from_string(string):
+        """
+        Creates an InputState from a string with the pressed buttons separated by a "+", for example "right+up".
+        An empty string means that no button is pressed.
+
+        Args:
+            string (str): The pressed buttons.
+
+        Returns:
+            InputState: The corresponding input state.
+        """
+        buttons = [button.strip() for button in string.split("+") if button.strip() != ""]
+        for button in buttons:
+            if button not in ("left", "right", "up", "down"):
+                raise ValueError("Unknown button: " + button)
+        return InputState("left" in buttons, "right" in buttons, "up" in buttons, "down" in buttons)
+
+    def __str__(self):
+        return "+".join(button for button in ("left", "right", "up", "down") if getattr(self, button))
+
+
+class KeyboardInput:
+    """
+    Input source that reads the arrow keys and WASD from the keyboard, used when playing the game.
+    """
+    def get_state(self):
+        """
+        Returns:
+            InputState: The buttons that are currently pressed on the keyboard.
+        """
+        keys = pygame.key.get_pressed()
+        return InputState(left=keys[pygame.K_LEFT] or keys[pygame.K_a], right=keys[pygame.K_RIGHT] or keys[pygame.K_d],
+                          up=keys[pygame.K_UP] or keys[pygame.K_w], down=keys[pygame.K_DOWN] or keys[pygame.K_s])
+
+
+class ScriptedInput:
+    """
+    Input source that replays a fixed trace of input states, one per step. This makes simulations reproducible and
+    does not need a keyboard or a screen.
+    """
+    def __init__(self, trace, loop=False):
+        """
+        Initializes a ScriptedInput object.
+
+        Args:
+            trace (list): The input states, either InputState objects or strings such as "right+up".
+            loop (bool, optional): Whether to start over at the end of the trace. Otherwise no buttons are pressed
+                after the trace ended. Defaults to False.
+        """
+        self.trace = [state if isinstance(state, InputState) else InputState.from_string(state) for state in trace]
+        self.loop = loop
+        self.current_step = 0
+
+    def get_state(self):
+        """
+        Returns:
+            InputState: The input state of the current step, every call advances the trace by one step.
+        """
+        if self.loop and len(self.trace) > 0:
+            state = self.trace[self.current_step % len(self.trace)]
+        elif self.current_step < len(self.trace):
+            state = self.trace[self.current_step]
+        else:
+            state = InputState()
+        self.current_step += 1
+        return state
+
+
+class HeadlessEngine:
+    """
+    Runs the simulation of a world without a screen, sound or keyboard: the world is stepped with a fixed time step
+    and the player is controlled by an input source. This is meant for level validation and AI training, where the
+    game needs to run much faster than in real time.
+
+    The game still needs a video and audio driver to be imported, without a screen you can use SDL's dummy drivers by
+    setting the SDL_VIDEODRIVER and SDL_AUDIODRIVER environment variables to "dummy".
+    """
+    def __init__(self, world, input_source, time_step=FIXED_TIME_STEP):
+        """
+        Initializes a HeadlessEngine object.
+
+        Args:
+            world (World): The world to simulate.
+            input_source: An object with a get_state() method returning an InputState, e.g. a ScriptedInput.
+            time_step (float, optional): The fixed time of one step in seconds. Defaults to FIXED_TIME_STEP.
+        """
+        self.world = world
+        self.world.input_source = input_source
+        self.world.headless = True
+        self.time_step = time_step
+        self.steps = 0
+
+    def step(self):
+        """
+        Performs one step of the simulation.
+        """
+        self.world.step(self.time_step)
+        self.steps += 1
+
+    def run(self, n_steps, stop_at_gameover=True):
+        """
+        Performs the given number of steps.
+
+        Args:
+            n_steps (int): The number of steps.
+            stop_at_gameover (bool, optional): Whether to stop as soon as the game is over. Defaults to True.
+
+        Returns:
+            int: The number of steps that were performed.
+        """
+        for i in range(n_steps):
+            if stop_at_gameover and self.world.gameover:
+                return i
+            self.step()
+        return n_steps
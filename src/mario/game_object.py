@@ -1,11 +1,14 @@
 import numpy as np
 from .constants import *
+from .object_types import ObjectType, collision_mask
 import pygame
 
-pygame.init()
-
 
 class GameObject(pygame.sprite.Sprite):
+    # whether the movement of objects of this class is computed together with the other objects of the world in the
+    # physics store of the world (see World.update_batch_physics) instead of in GameObject.update
+    batch_physics = False
+
     def __init__(self, pos, vel, sprite, world=None, type=None, resize=None,
                      passable=False, horizontal_movable=True, vertical_movable=True):
         """
@@ -16,7 +19,7 @@ class GameObject(pygame.sprite.Sprite):
             vel (tuple): The velocity of the game object.
             sprite (pygame.Surface): The sprite image of the game object.
             world (World, optional): The world in which the game object exists. Defaults to None.
-            type (str, optional): The type of the game object. Defaults to None.
+            type (ObjectType, optional): The type of the game object. Defaults to None, which is ObjectType.NONE.
             resize (tuple, optional): The size to resize the sprite image. Defaults to None.
             passable (bool, optional): Whether the game object is passable. Defaults to False.
             horizontal_movable (bool, optional): Whether the game object is horizontally movable. Defaults to True.
@@ -24,7 +27,9 @@ class GameObject(pygame.sprite.Sprite):
         """
         super(GameObject, self).__init__()
         self.world = None
-        self.type = type
+        self.type = ObjectType.NONE if type is None else type
+        # the types of game objects this game object collides with, see COLLISION_MATRIX
+        self.collision_mask = collision_mask(self.type)
         self.lives = 1
         self.alive = True
         self.pos = np.array(pos).astype(np.float64)
@@ -36,10 +41,16 @@ class GameObject(pygame.sprite.Sprite):
         self.vertical_movable = vertical_movable
         self.image = sprite
         self.rect, self.mask = None, None
-        if resize is not None:
+        if resize is not None and tuple(resize) != self.image.get_size():
             self.image = pygame.transform.scale(self.image, resize)
         self.start_sprite = self.image
         self.size = self.image.get_size()
+        # a sleeping object is not updated by the world, see World.set_active_region
+        self.sleeping = False
+        # the index of the object in the physics store of the world, None if it is not in the store
+        self.physics_index = None
+        # the position of the object in the render order of the world, see World.visible_game_objects
+        self.render_order = 0
         if world is not None:
             world.add_gameobject(self)
 
@@ -57,6 +68,9 @@ class GameObject(pygame.sprite.Sprite):
             self.image = pygame.transform.scale(self.image, resize)
         old_size = self.size
         new_size = self.image.get_size()
+        if new_size[0] == old_size[0] and new_size[1] == old_size[1]:
+            # only the frame of an animation changed, the position and collisions stay the same
+            return
         self.size = list(self.size)
         self.size[0] = new_size[0]
         self.pos[0] += (old_size[0] - self.size[0])
@@ -64,6 +78,16 @@ class GameObject(pygame.sprite.Sprite):
         self.size[1] = new_size[1]
         self.pos[1] += (old_size[1] - self.size[1])
         self.check_collision_update("vertical")
+        if self.world is not None:
+            self.world.refresh_gameobject(self)
+
+    def current_image(self):
+        """
+        Returns:
+            pygame.Surface: The sprite the game object is rendered with now, this can be overwritten by animated game
+                objects that take their frame from the animation clock of the world.
+        """
+        return self.image
 
     def render(self, screen, pos_camera, size_screen=SCREEN_SIZE):
         """
@@ -77,7 +101,7 @@ class GameObject(pygame.sprite.Sprite):
         position = np.round(self.pos - pos_camera).astype(np.int32)
         if 0 <= position[0] + self.size[0] and position[0] <= size_screen[0] and \
                 0 <= position[1] + self.size[1] and position[1] <= size_screen[1]:
-            screen.blit(self.image, position)
+            screen.blit(self.current_image(), position)
 
     def special_reaction_collision(self, side, other):
         """
@@ -93,43 +117,110 @@ class GameObject(pygame.sprite.Sprite):
         return not (self.pos[0] + self.size[0] <= other.pos[0] or other.pos[0] + other.size[0] <= self.pos[0] or
                     self.pos[1] + self.size[1] <= other.pos[1] or other.pos[1] + other.size[1] <= self.pos[1])
 
-    def collision_tiles(self):
+    def collision_tiles(self, side_index=1):
         """
-        Returns the first tile that the game object collides with.
+        Returns what the game object collides with in the tile grid: the runs of tiles (see CollisionMesh) and custom
+        tiles that the game object collides with. The runs are horizontal for vertical collisions and vertical for
+        horizontal collisions, so the object is pushed out of them like out of the tiles.
+
+        Args:
+            side_index (int, optional): The index of the side of the collision, 0 for horizontal and 1 for vertical.
+                Defaults to 1.
 
         Returns:
-            The tile object that the game object collides with, or None if there is no collision.
+            list: The different SolidRects (or tiles) that the game object collides with, in the order of the tiles.
         """
-        for i in range(int(np.floor(self.pos[0] - self.pos[0] % TILE_SIZE[0])),
-                       int(np.ceil(self.pos[0] + self.size[0])), TILE_SIZE[0]):
-            for j in range(int(np.floor(self.pos[1] - self.pos[1] % TILE_SIZE[1])),
-                           int(np.ceil(self.pos[1] + self.size[1])), TILE_SIZE[1]):
-                try:
-                    tile = self.world.tiles_fast_access[i // TILE_SIZE[0]][j // TILE_SIZE[1]]
-                    if tile is not None and self.collides(tile) and tile != self:
-                        return tile
-                except IndexError:
-                    pass
+        return [rect for rect in self.world.tile_grid.collision_rects(self.pos, self.size, 1 - side_index)
+                if self.collides(rect) and rect != self]
+
+    def swept_displacement(self, side_index, displacement):
+        """
+        Limits a movement of the game object along one axis, such that it doesn't pass through a tile or a solid
+        object that doesn't move: the movement stops COLLISION_SKIN pixels inside the first one on its way, so the
+        collision with it is handled as usual by check_collision_update. Movements of at most SWEEP_DISTANCE pixels
+        are not limited, they can't pass through anything.
+
+        Args:
+            side_index (int): The index of the axis, 0 for horizontal and 1 for vertical.
+            displacement (float): The movement along the axis.
+
+        Returns:
+            float: The limited movement.
+        """
+        if abs(displacement) <= SWEEP_DISTANCE or self.passable or self.world is None:
+            return displacement
+
+        # the region the game object passes through
+        pos = np.copy(self.pos)
+        size = list(self.size)
+        size[side_index] += abs(displacement)
+        if displacement < 0:
+            pos[side_index] += displacement
+        obstacles = self.world.tile_grid.collision_rects(pos, size, 1 - side_index)
+        obstacles += [game_object for game_object in self.world.get_close_game_objects(pos, size)
+                      if self.collision_mask & game_object.type and not game_object.passable and
+                      not game_object.horizontal_movable and not game_object.vertical_movable and
+                      game_object is not self]
+
+        other_index = 1 - side_index
+        distance = abs(displacement)
+        for obstacle in obstacles:
+            # an obstacle the game object is already in is left to check_collision_update
+            if GameObject.collides(self, obstacle) or \
+                    obstacle.pos[other_index] + obstacle.size[other_index] <= self.pos[other_index] or \
+                    self.pos[other_index] + self.size[other_index] <= obstacle.pos[other_index]:
+                continue
+            if displacement > 0:
+                gap = obstacle.pos[side_index] - self.pos[side_index] - self.size[side_index]
+            else:
+                gap = self.pos[side_index] - obstacle.pos[side_index] - obstacle.size[side_index]
+            if gap >= 0:
+                distance = min(distance, gap + COLLISION_SKIN)
+        return np.sign(displacement) * distance
 
-        return None
+    def collides_all(self, side_index=1):
+        """Checks for collisions with all game objects close to this one.
 
-    def collides_all(self):
-        """Checks for collisions with all game objects.
+        Args:
+            side_index (int, optional): The index of the side of the collision, see collision_tiles. Defaults to 1.
 
         Returns:
             list: A list of game objects that collide with the current game object.
         """
         collisions = []
-        tile = self.collision_tiles()
-        if tile is not None:
-            collisions.append(tile)
+        if self.collision_mask & ObjectType.TILE:
+            collisions += self.collision_tiles(side_index)
 
-        for game_object in self.world.get_all_game_objects_no_tiles():
-            if self != game_object and self.collides(game_object):
+        # the broad phase: objects of types that don't collide with this one are skipped before any geometry test
+        mask = self.collision_mask
+        for game_object in self.world.get_close_game_objects(self.pos, self.size):
+            if mask & game_object.type and self != game_object and self.collides(game_object):
                 collisions.append(game_object)
 
         return collisions
 
+    def is_static(self):
+        """
+        Returns:
+            bool: Whether the game object is a static collider: it can't move and its class doesn't change anything
+                in an update, so the world never needs to update it (e.g. pipes and coins). Other objects still
+                collide with it.
+        """
+        return not self.horizontal_movable and not self.vertical_movable and \
+            type(self).update is GameObject.update and type(self).update_state is GameObject.update_state
+
+    def sleep(self):
+        """
+        Freezes the game object, this happens when it leaves the active region of the world.
+        """
+        self.sleeping = True
+
+    def wake(self):
+        """
+        Wakes the game object up again, this happens when it enters the active region of the world.
+        """
+        self.sleeping = False
+
     def on_death(self):
         """
         Function that is performed when dying
@@ -137,6 +228,8 @@ class GameObject(pygame.sprite.Sprite):
         self.alive = False
         self.horizontal_movable = False
         self.vertical_movable = False
+        if self.world is not None:
+            self.world.refresh_gameobject(self)
 
     def set_lives(self, lives):
         """
@@ -188,30 +281,48 @@ class GameObject(pygame.sprite.Sprite):
         if side == "vertical":
             side_index = 1
 
+        if self.world is not None:
+            self.world.update_gameobject_position(self)
+
         if not self.passable and self.world is not None:
-            collision_objects = self.collides_all()
+            world = self.world
+            world.begin_section("collisions")
+            collision_objects = self.collides_all(side_index)
             for collision_object in collision_objects:
-                self.collision_set_good(collision_object, side_index)
+                # being pushed out of one rect of the tile grid can already push the object out of the others it
+                # collided with, it still reacts to all of them
+                if not ObjectType.TILE & collision_object.type or self.collides(collision_object):
+                    self.collision_set_good(collision_object, side_index)
 
                 if collision_object is not None:
                     self.special_reaction_collision(side, collision_object)
                     collision_object.special_reaction_collision(side, self)
+            world.end_section()
 
     def update(self, time):
         """
         Updates everything of the given object for the given amount of time
         """
         if self.vertical_movable:
-            self.pos[1] += time * self.vel[1]
+            self.pos[1] += self.swept_displacement(1, time * self.vel[1])
             self.check_collision_update("vertical")
             self.vel[1] += GRAVITY * time
 
         if self.horizontal_movable:
-            self.pos[0] += time * self.vel[0]
+            self.pos[0] += self.swept_displacement(0, time * self.vel[0])
             self.check_collision_update("horizontal")
 
         if self.horizontal_movable or self.vertical_movable:
             self.handle_outside_world_size()
 
+        self.update_state(time)
+
+    def update_state(self, time):
+        """
+        Updates everything of the given object apart from its movement for the given amount of time, should be
+        overwritten in the game object. For objects with batch_physics, this is the only update method the world calls.
+        """
+        pass
+
     def __str__(self):
         return "game object"
@@ -0,0 +1,376 @@
+"""
+A level file consists of:
+    - a header: the magic bytes, the version of the format, the size of the world, the top score and the name of the
+      background image. The top score is at a fixed offset, such that it can be changed without rewriting the file.
+    - the tile grid: the names of the tiles that are used in the level (the palette), followed by one byte per tile
+      position of the world with the index in the palette plus one, 0 means that there is no tile. The bytes are
+      stored column by column, like the ids of a TileGrid.
+    - the entities: all other game objects as typed records. A record starts with the tag of its type and the position
+      of the object, followed by the other parameters of its constructor.
+All numbers are little-endian, strings are utf-8 encoded and preceded by their length.
+"""
+
+import hashlib
+import struct
+import numpy as np
+from .constants import *
+from .player import Mario
+from .enemies import Goomba, KoopaTroopa, KoopTroopaTurtle
+from .specials import Mushroom, Flagpole, BackgroundSprites, Pipe, Coin
+from .tiles import MysteryBox
+
+LEVEL_MAGIC = b"MARIOLVL"
+LEVEL_FORMAT_VERSION = 1
+
+HEADER_FORMAT = "<8sHIIi"
+TOP_SCORE_OFFSET = struct.calcsize("<8sHII")
+
+# maps the tag of an entity type to its class and the types of the constructor parameters after the position.
+# A field is either "int", "str" or "size" (a pair of ints that can be None)
+ENTITY_TYPES = dict()
+
+
+def register_entity(tag, cls, fields=()):
+    """
+    Registers a game object class, such that its objects can be saved in and loaded from level files. The tag is
+    stored in the file instead of the class, so classes can be renamed or moved as long as the tag stays the same.
+
+    Args:
+        tag (str): The unique name of the entity type in level files.
+        cls (type): The class of the game objects, its first constructor parameter must be the position.
+        fields (tuple, optional): The types of the other parameters in cls.input_parameters. Defaults to ().
+    """
+    ENTITY_TYPES[tag] = (cls, tuple(fields))
+
+
+register_entity("mario", Mario, ("size",))
+register_entity("goomba", Goomba, ("int",))
+register_entity("koopa troopa", KoopaTroopa, ("int", "str"))
+register_entity("koopa turtle", KoopTroopaTurtle, ("int", "str"))
+register_entity("mushroom", Mushroom, ("size", "str", "int"))
+register_entity("flagpole", Flagpole, ("size",))
+register_entity("background sprite", BackgroundSprites, ("str", "size"))
+register_entity("pipe", Pipe, ("size", "int"))
+register_entity("coin", Coin)
+register_entity("mystery box", MysteryBox, ("str",))
+
+
+def entity_tag(game_object):
+    """
+    Returns:
+        str: The tag of the type of the given game object in level files, or None if its type is not registered.
+    """
+    for tag, (cls, fields) in ENTITY_TYPES.items():
+        if type(game_object) is cls:
+            return tag
+    return None
+
+
+class LevelData:
+    """
+    The content of a level file, before any game object is created.
+    """
+    def __init__(self, size, background_image, top_score, tile_names, tile_grid, entities, grid_offset=None):
+        """
+        Initializes a LevelData object.
+
+        Args:
+            size (tuple): The size of the world.
+            background_image (str): The name of the background image.
+            top_score (int): The top score of the level.
+            tile_names (list): The palette: the sprite names of the tiles used in the level.
+            tile_grid (numpy.ndarray): For every tile position the index in the palette plus one, 0 if there is no
+                tile.
+            entities (list): (tag, input_parameters) for every other game object.
+            grid_offset (int, optional): The offset of the tile grid in the file. Defaults to None.
+        """
+        self.size = size
+        self.background_image = background_image
+        self.top_score = top_score
+        self.tile_names = tile_names
+        self.tile_grid = tile_grid
+        self.entities = entities
+        self.grid_offset = grid_offset
+
+    def create_game_objects(self):
+        """
+        Creates the game objects of all entities of the level, in the order of the file. The tiles are not created,
+        they are used directly from the tile grid (see TileGrid).
+
+        Returns:
+            list: The game objects, they are not yet added to a world.
+        """
+        return list(self.iter_game_objects())
+
+    def iter_game_objects(self, cancelled=None):
+        """
+        Creates the game objects of all entities of the level one by one, see create_game_objects.
+
+        Args:
+            cancelled (callable, optional): Called before every game object is created, when it returns True None is
+                yielded and no more game objects are created. Defaults to None.
+
+        Yields:
+            GameObject: The next game object, or None if the creation was cancelled.
+        """
+        for tag, input_parameters in self.entities:
+            if cancelled is not None and cancelled():
+                yield None
+                return
+            yield ENTITY_TYPES[tag][0](*input_parameters)
+
+
+def tile_grid_shape(size):
+    """
+    Returns:
+        tuple: The shape of the tile grid of a world with the given size.
+    """
+    return size[0] // TILE_SIZE[0] + 1, size[1] // TILE_SIZE[1] + 1
+
+
+def is_level_file(file):
+    """
+    Returns:
+        bool: Whether the given file is a level file (and not an old pickled world).
+    """
+    with open(file, "rb") as f:
+        return f.read(len(LEVEL_MAGIC)) == LEVEL_MAGIC
+
+
+def pack_string(string):
+    """
+    Returns:
+        bytes: The given string as it is stored in a level file.
+    """
+    data = string.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+def pack_field(field, value):
+    """
+    Returns:
+        bytes: The given value of an entity field of the given type as it is stored in a level file.
+    """
+    if field == "int":
+        return struct.pack("<i", int(value))
+    if field == "str":
+        return pack_string(value)
+    if value is None:
+        return struct.pack("<ii", -1, -1)
+    return struct.pack("<ii", int(value[0]), int(value[1]))
+
+
+class LevelReader:
+    """
+    Reads the values of a level file one after the other.
+    """
+    def __init__(self, data):
+        """
+        Initializes a LevelReader object.
+
+        Args:
+            data (numpy.ndarray): The bytes of the level file.
+        """
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, format):
+        """
+        Returns:
+            tuple: The next values in the file, read with the given struct format.
+        """
+        values = struct.unpack_from(format, self.data, self.offset)
+        self.offset += struct.calcsize(format)
+        return values
+
+    def read_string(self):
+        """
+        Returns:
+            str: The next string in the file.
+        """
+        length, = self.unpack("<H")
+        string = bytes(self.data[self.offset:self.offset + length]).decode("utf-8")
+        self.offset += length
+        return string
+
+    def read_field(self, field):
+        """
+        Returns:
+            The next entity field in the file, which has the given type.
+        """
+        if field == "int":
+            return self.unpack("<i")[0]
+        if field == "str":
+            return self.read_string()
+        size = self.unpack("<ii")
+        if size == (-1, -1):
+            return None
+        return size
+
+
+def level_data(world, top_score=0):
+    """
+    Returns the content of a level file of the given world, without writing it. This is also used to keep a copy of a
+    world in memory.
+
+    Args:
+        world (World): The world.
+        top_score (int, optional): The top score of the level. Defaults to 0.
+
+    Raises:
+        ValueError: If the world contains a game object of a type that is not registered or a tile that is not a
+            NormalTile.
+
+    Returns:
+        LevelData: The content of the level file.
+    """
+    # only the ids that are used are saved, they are renumbered from 1
+    ids = world.tile_grid.ids
+    used_ids = np.unique(ids)
+    used_ids = used_ids[used_ids != 0]
+    if world.tile_grid.CUSTOM_TILE_ID in used_ids:
+        raise ValueError("Only tiles of type NormalTile can be saved.")
+    new_ids = np.zeros(256, dtype=np.uint8)
+    new_ids[used_ids] = np.arange(1, len(used_ids) + 1)
+    tile_grid = new_ids[ids]
+    tile_names = [world.tile_grid.tile_names[tile_id] for tile_id in used_ids]
+
+    entities = []
+    for game_object in world.get_all_game_objects_no_tiles() + world.background_objects:
+        tag = entity_tag(game_object)
+        if tag is None:
+            raise ValueError("Game objects of type " + type(game_object).__name__ + " can't be saved.")
+        pos = np.array(game_object.input_parameters[0], dtype=np.float64)
+        entities.append((tag, (pos,) + tuple(game_object.input_parameters[1:])))
+    return LevelData(tuple(world.size), world.string_background_image, top_score, tile_names, tile_grid, entities)
+
+
+def write_level(file, world, top_score=0):
+    """
+    Saves the given world in a level file.
+
+    Args:
+        file (str): The path of the file.
+        world (World): The world to save.
+        top_score (int, optional): The top score stored in the file. Defaults to 0.
+
+    Raises:
+        ValueError: If the world contains a game object of a type that is not registered or a tile that is not a
+            NormalTile.
+    """
+    level = level_data(world, top_score)
+    entities = []
+    for tag, input_parameters in level.entities:
+        pos = input_parameters[0]
+        record = pack_string(tag) + struct.pack("<dd", pos[0], pos[1])
+        for field, value in zip(ENTITY_TYPES[tag][1], input_parameters[1:]):
+            record += pack_field(field, value)
+        entities.append(record)
+
+    with open(file, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, LEVEL_MAGIC, LEVEL_FORMAT_VERSION, level.size[0], level.size[1], top_score))
+        f.write(pack_string(level.background_image))
+        f.write(struct.pack("<H", len(level.tile_names)))
+        for sprite_name in level.tile_names:
+            f.write(pack_string(sprite_name))
+        f.write(level.tile_grid.tobytes())
+        f.write(struct.pack("<I", len(entities)))
+        for record in entities:
+            f.write(record)
+
+
+def read_level(file, memory_map=False):
+    """
+    Reads a level file.
+
+    Args:
+        file (str): The path of the file.
+        memory_map (bool, optional): Whether the file is memory mapped instead of read. The tile grid is then a copy
+            on write memory map: changes to it are never written to the file. Defaults to False.
+
+    Raises:
+        ValueError: If the file is not a level file or was written by a newer version of the game.
+
+    Returns:
+        LevelData: The content of the file.
+    """
+    if memory_map:
+        reader = LevelReader(np.memmap(file, dtype=np.uint8, mode="c"))
+    else:
+        with open(file, "rb") as f:
+            reader = LevelReader(np.frombuffer(bytearray(f.read()), dtype=np.uint8))
+
+    magic, version, width, height, top_score = reader.unpack(HEADER_FORMAT)
+    if magic != LEVEL_MAGIC:
+        raise ValueError(file + " is not a level file.")
+    if version > LEVEL_FORMAT_VERSION:
+        raise ValueError(file + " has level format version " + str(version) + ", only versions up to " +
+                         str(LEVEL_FORMAT_VERSION) + " are supported.")
+    size = (width, height)
+    background_image = reader.read_string()
+
+    n_tile_names, = reader.unpack("<H")
+    tile_names = [reader.read_string() for _ in range(n_tile_names)]
+    shape = tile_grid_shape(size)
+    grid_offset = reader.offset
+    tile_grid = reader.data[grid_offset:grid_offset + shape[0] * shape[1]].reshape(shape)
+    reader.offset += tile_grid.size
+
+    n_entities, = reader.unpack("<I")
+    entities = []
+    for _ in range(n_entities):
+        tag = reader.read_string()
+        if tag not in ENTITY_TYPES:
+            raise ValueError(file + " contains an unknown game object: " + tag)
+        pos = np.array(reader.unpack("<dd"))
+        input_parameters = (pos,) + tuple(reader.read_field(field) for field in ENTITY_TYPES[tag][1])
+        entities.append((tag, input_parameters))
+
+    return LevelData(size, background_image, top_score, tile_names, tile_grid, entities, grid_offset)
+
+
+def write_top_score(file, top_score):
+    """
+    Changes the top score of a level file in place.
+
+    Args:
+        file (str): The path of the file.
+        top_score (int): The new top score.
+    """
+    with open(file, "r+b") as f:
+        f.seek(TOP_SCORE_OFFSET)
+        f.write(struct.pack("<i", top_score))
+
+
+def read_top_score(file):
+    """
+    Reads only the top score of a level file.
+
+    Args:
+        file (str): The path of the file.
+
+    Returns:
+        int: The top score.
+    """
+    with open(file, "rb") as f:
+        return struct.unpack(HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))[4]
+
+
+def level_content_hash(file):
+    """
+    Returns a hash of a level file without its top score, such that changing the top score with write_top_score
+    doesn't change the hash.
+
+    Args:
+        file (str): The path of the file.
+
+    Returns:
+        str: The hash as a hexadecimal string, None if the file is not a level file.
+    """
+    with open(file, "rb") as f:
+        data = f.read()
+    if not data.startswith(LEVEL_MAGIC):
+        return None
+    content_hash = hashlib.sha1(data[:TOP_SCORE_OFFSET])
+    content_hash.update(data[TOP_SCORE_OFFSET + struct.calcsize("<i"):])
+    return content_hash.hexdigest()
@@ -0,0 +1,188 @@
+import json
+import os
+from .constants import *
+from .level_format import entity_tag, level_content_hash, read_top_score
+from .world import World
+import pygame
+
+
+class LevelIndex:
+    """
+    An index of the levels in a directory, kept on disk: for every level its metadata (size, background, number of
+    entities of every type, top score) and a thumbnail of its first screen. A level is only loaded when it is not yet
+    in the index or the level in its file changed, so the level menu can show the levels without loading them. When
+    only the top score in a level file changed (see write_top_score), just the top score is read again.
+    """
+    def __init__(self, directory="Worlds", cache_directory=LEVEL_INDEX_DIRECTORY):
+        """
+        Initializes a LevelIndex object, the index is read from the cache directory if it exists.
+
+        Args:
+            directory (str, optional): The directory with the levels. Defaults to "Worlds".
+            cache_directory (str, optional): The directory in which the index and the thumbnails are kept. Defaults
+                to LEVEL_INDEX_DIRECTORY.
+        """
+        self.directory = directory
+        self.cache_directory = cache_directory
+        self.index_file = os.path.join(cache_directory, "index.json")
+        # maps the file name of a level to its entry, see index_level
+        self.entries = dict()
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as f:
+                index = json.load(f)
+            if index.get("version") == LEVEL_INDEX_VERSION:
+                self.entries = index["levels"]
+        # the loaded thumbnails: maps the file name of a thumbnail to its surface
+        self.thumbnails = dict()
+
+    def update(self):
+        """
+        Adds the levels that are new or changed to the index and removes the levels that no longer exist. The index
+        is written to disk if anything changed.
+
+        Returns:
+            list: The file names of all levels in the directory, sorted.
+        """
+        names = sorted(os.listdir(self.directory))
+        changed = False
+        for name in names:
+            stat = os.stat(os.path.join(self.directory, name))
+            entry = self.entries.get(name)
+            if entry is not None and entry["mtime"] == stat.st_mtime and entry["file_size"] == stat.st_size:
+                continue
+            if entry is None or not self.update_top_score(name, entry, stat):
+                self.entries[name] = self.index_level(name, stat)
+            changed = True
+        for name in list(self.entries):
+            if name not in names:
+                self.remove_thumbnail(self.entries.pop(name))
+                changed = True
+        if changed:
+            self.write()
+        return names
+
+    def update_top_score(self, name, entry, stat):
+        """
+        Updates the entry of a level of which the file changed, if only its top score changed. This happens every time
+        a new top score of the level is saved, so the level doesn't need to be loaded again for it.
+
+        Args:
+            name (str): The file name of the level.
+            entry (dict): The entry of the level, see index_level.
+            stat (os.stat_result): The status of the changed file of the level.
+
+        Returns:
+            bool: Whether only the top score changed, False if the level has to be loaded again.
+        """
+        if entry["content_hash"] is None or entry["file_size"] != stat.st_size:
+            return False
+        file = os.path.join(self.directory, name)
+        if level_content_hash(file) != entry["content_hash"]:
+            return False
+        entry["mtime"] = stat.st_mtime
+        entry["metadata"]["top_score"] = read_top_score(file)
+        return True
+
+    def index_level(self, name, stat):
+        """
+        Loads a level and creates its entry in the index, its thumbnail is written to the cache directory.
+
+        Args:
+            name (str): The file name of the level.
+            stat (os.stat_result): The status of the file of the level.
+
+        Returns:
+            dict: The entry of the level: the modification time and size of its file, the hash of its content without
+                the top score (see level_content_hash, None for old pickled worlds), its metadata (None if it can't be
+                loaded) and the file name of its thumbnail.
+        """
+        old_entry = self.entries.get(name)
+        if old_entry is not None:
+            self.remove_thumbnail(old_entry)
+        entry = {"mtime": stat.st_mtime, "file_size": stat.st_size, "content_hash": None, "metadata": None,
+                 "thumbnail": None}
+        file = os.path.join(self.directory, name)
+        try:
+            world = World(load_file=file)
+        except Exception:
+            # the level is still shown in the menu, but without information
+            return entry
+        entry["content_hash"] = level_content_hash(file)
+
+        entities = dict()
+        for game_object in world.get_all_game_objects_no_tiles() + world.background_objects:
+            tag = entity_tag(game_object)
+            entities[tag] = entities.get(tag, 0) + 1
+        entry["metadata"] = {
+            "size": list(world.size),
+            "background": world.string_background_image,
+            "tiles": len(world.tile_grid),
+            "entities": entities,
+            "top_score": world.top_score
+        }
+
+        os.makedirs(self.cache_directory, exist_ok=True)
+        entry["thumbnail"] = name + "-" + str(int(stat.st_mtime)) + ".png"
+        pygame.image.save(self.render_thumbnail(world), os.path.join(self.cache_directory, entry["thumbnail"]))
+        return entry
+
+    def render_thumbnail(self, world):
+        """
+        Renders the first screen of the given world, scaled down to LEVEL_THUMBNAIL_SIZE.
+
+        Args:
+            world (World): The world.
+
+        Returns:
+            pygame.Surface: The thumbnail.
+        """
+        world.update_camera()
+        screen = pygame.Surface(SCREEN_SIZE, 0, 32)
+        world.render(screen)
+        return pygame.transform.smoothscale(screen, LEVEL_THUMBNAIL_SIZE)
+
+    def remove_thumbnail(self, entry):
+        """
+        Removes the thumbnail of the given entry from the cache directory.
+        """
+        if entry["thumbnail"] is not None:
+            file = os.path.join(self.cache_directory, entry["thumbnail"])
+            if os.path.exists(file):
+                os.remove(file)
+            self.thumbnails.pop(entry["thumbnail"], None)
+
+    def write(self):
+        """
+        Writes the index to the cache directory.
+        """
+        os.makedirs(self.cache_directory, exist_ok=True)
+        # the index is replaced at once, such that it is never half written
+        temporary_file = self.index_file + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump({"version": LEVEL_INDEX_VERSION, "levels": self.entries}, f)
+        os.replace(temporary_file, self.index_file)
+
+    def metadata(self, name):
+        """
+        Returns:
+            dict: The metadata of the level with the given file name, None if it is unknown or can't be loaded.
+        """
+        entry = self.entries.get(name)
+        return None if entry is None else entry["metadata"]
+
+    def thumbnail(self, name):
+        """
+        Returns:
+            pygame.Surface: The thumbnail of the level with the given file name, None if there is no thumbnail.
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry["thumbnail"] is None:
+            return None
+        thumbnail = self.thumbnails.get(entry["thumbnail"])
+        if thumbnail is None:
+            file = os.path.join(self.cache_directory, entry["thumbnail"])
+            if not os.path.exists(file):
+                return None
+            thumbnail = pygame.image.load(file)
+            self.thumbnails[entry["thumbnail"]] = thumbnail
+        return thumbnail
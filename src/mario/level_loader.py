@@ -0,0 +1,165 @@
+import threading
+from .constants import *
+from .level_format import is_level_file, read_level
+from .static_layer import StaticLayer
+from .world import World
+
+
+class LevelLoader:
+    """
+    Loads levels in a background thread, such that a menu can keep running while a level file is read and its game
+    objects are created. After loading, the camera is put at the start of the level and the chunks of the static layer
+    that are visible there are rendered, so the first frame of the level doesn't need to render them.
+
+    There is a single worker thread, which always loads the level that was requested last. When another level is
+    requested while one is loading, the loading stops at the next game object or chunk and the worker goes on with
+    the new level, so at most one level is loaded at a time.
+
+    A world must not be used before the loader is done, it is handed over by result().
+    """
+    def __init__(self, memory_map=False):
+        """
+        Initializes a LevelLoader object and starts its worker thread.
+
+        Args:
+            memory_map (bool, optional): Whether the tile grid is memory mapped, see World.load. Defaults to False.
+        """
+        self.memory_map = memory_map
+        # guards the attributes below, the worker waits on it for a request and result() waits on it for the world.
+        # Its lock is reentrant, so done can be used while holding it
+        self.condition = threading.Condition()
+        # the level that was requested last, None if no level is wanted
+        self.file = None
+        # the fraction of the loading of the requested level that is done, between 0 and 1
+        self.progress = 0
+        # the level that was loaded last, with its world or the exception that occurred while loading it
+        self.loaded_file = None
+        self.world = None
+        self.error = None
+        # a daemon thread, such that quitting the game doesn't wait for a level that is still loading
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    @property
+    def done(self):
+        """
+        Returns:
+            bool: Whether the requested level is loaded.
+        """
+        with self.condition:
+            return self.file is not None and self.loaded_file == self.file
+
+    def request(self, file):
+        """
+        Makes the worker load the given level, unless it is already loading or loaded. The level that was requested
+        before is cancelled.
+
+        Args:
+            file (str): The path of the level file.
+        """
+        with self.condition:
+            if file != self.file:
+                self.file = file
+                self.progress = 0
+                self.condition.notify_all()
+
+    def cancel(self):
+        """
+        Stops loading as soon as possible, the loaded world is never used.
+        """
+        self.request(None)
+
+    def set_progress(self, file, progress):
+        """
+        Sets the progress of the loading of the given level, unless another level was requested since.
+        """
+        with self.condition:
+            if self.file == file:
+                self.progress = progress
+
+    def run(self):
+        """
+        Loads the requested levels, this is run in the worker thread.
+        """
+        while True:
+            with self.condition:
+                while self.file is None or self.file == self.loaded_file:
+                    self.condition.wait()
+                file = self.file
+                # the world of another level is thrown away
+                self.loaded_file = None
+                self.world = None
+                self.error = None
+
+            world = None
+            error = None
+            try:
+                world = self.load(file)
+            except Exception as exception:
+                # raised again in the main thread by result()
+                error = exception
+
+            with self.condition:
+                if self.file == file and (world is not None or error is not None):
+                    self.loaded_file = file
+                    self.world = world
+                    self.error = error
+                    self.progress = 1
+                    self.condition.notify_all()
+
+    def load(self, file):
+        """
+        Loads the given level, this is run in the worker thread.
+
+        Args:
+            file (str): The path of the level file.
+
+        Returns:
+            World: The loaded world, None if another level was requested while it was loading.
+        """
+        def cancelled():
+            return self.file != file
+
+        if is_level_file(file):
+            level = read_level(file, self.memory_map)
+            world = World()
+            if not world.load_level(level, cancelled):
+                return None
+        else:
+            # old pickled worlds can't be cancelled while they are loading
+            world = World(load_file=file)
+        self.set_progress(file, LEVEL_LOADER_WORLD_PROGRESS)
+        world.update_camera()
+        world.static_layer = StaticLayer(world)
+        visible_chunks = world.static_layer.visible_chunks(world.camera_pos)
+        for n, index in enumerate(visible_chunks):
+            if cancelled():
+                return None
+            world.static_layer.get_chunk(index, keep=visible_chunks)
+            self.set_progress(file, LEVEL_LOADER_WORLD_PROGRESS +
+                              (1 - LEVEL_LOADER_WORLD_PROGRESS) * (n + 1) / len(visible_chunks))
+        return world
+
+    def result(self):
+        """
+        Waits until the requested level is loaded and returns it. A world can only be played once, so the next
+        request of the same level loads it again.
+
+        Raises:
+            Exception: The exception that occurred while loading the level, if any.
+
+        Returns:
+            World: The loaded world.
+        """
+        with self.condition:
+            while not self.done:
+                self.condition.wait()
+            world = self.world
+            error = self.error
+            self.file = None
+            self.loaded_file = None
+            self.world = None
+            self.error = None
+        if error is not None:
+            raise error
+        return world
@@ -1,34 +1,33 @@
 import pygame
 import numpy as np
-pygame.init()
+from ..text_cache import render_text
 
 
 class Button:
-    class Button:
-        def __init__(self, pos, content, hover_over_content=None, center_pos=False):
-            """
-            Initializes a Button object.
-
-            Args:
-                pos (tuple): The position of the button (x, y).
-                content (pygame.Surface): The content to be displayed on the button.
-                hover_over_content (pygame.Surface, optional): The content to be displayed when the button is hovered over. Defaults to None.
-                center_pos (bool, optional): Whether to center the button position. Defaults to False.
-            """
-            self.pos = pos
-            self.mid_pos = None
-            self.content = content
-            self.hover_over_content = hover_over_content
-            self.center_pos = center_pos
-            self.size = self.content.get_size()
-
-            if center_pos:
-                self.pos = list(pos)
-                self.mid_pos = pos[:]
-                self.pos[0] = self.pos[0] - self.size[0] // 2
-                self.pos[1] = self.pos[1] - self.size[1] // 2
-
-            self.selected = False
+    def __init__(self, pos, content, hover_over_content=None, center_pos=False):
+        """
+        Initializes a Button object.
+
+        Args:
+            pos (tuple): The position of the button (x, y).
+            content (pygame.Surface): The content to be displayed on the button.
+            hover_over_content (pygame.Surface, optional): The content to be displayed when the button is hovered over. Defaults to None.
+            center_pos (bool, optional): Whether to center the button position. Defaults to False.
+        """
+        self.pos = pos
+        self.mid_pos = None
+        self.content = content
+        self.hover_over_content = hover_over_content
+        self.center_pos = center_pos
+        self.size = self.content.get_size()
+
+        if center_pos:
+            self.pos = list(pos)
+            self.mid_pos = pos[:]
+            self.pos[0] = self.pos[0] - self.size[0] // 2
+            self.pos[1] = self.pos[1] - self.size[1] // 2
+
+        self.selected = False
 
     def set_content(self, new_content):
         """
@@ -102,10 +101,10 @@ class TextButton(Button):
             color_selected (tuple, optional): The color of the text when the button is selected (r, g, b). Defaults to None.
             center_pos (bool, optional): Whether to center the button position. Defaults to False.
         """
-        content = font.render(message, True, color_not_selected)
+        content = render_text(font, message, color_not_selected)
         hover_content = None
         if color_selected is not None:
-            hover_content = font.render(message, True, color_selected)
+            hover_content = render_text(font, message, color_selected)
 
         self.font = font
         self.message = message
@@ -123,11 +122,11 @@ class TextButton(Button):
         Returns:
         None
         """
-        new_content = self.font.render(new_text, True, self.color)
+        new_content = render_text(self.font, new_text, self.color)
         self.message = new_text
         self.set_content(new_content)
         if self.color_selected is not None:
-            self.hover_over_content = self.font.render(new_text, True, self.color_selected)
+            self.hover_over_content = render_text(self.font, new_text, self.color_selected)
 
 
 class ImageButton(Button):
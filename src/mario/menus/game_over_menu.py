@@ -15,13 +15,15 @@ class GameOverMenu(Menu):
 
         Attributes:
             report_button: A TextButton object representing the "You won!" button.
+            retry_button: A TextButton object representing the "Retry" button.
             play_button: A TextButton object representing the "Play again" button.
             main_button: A TextButton object representing the "Main menu" button.
         """
         super(GameOverMenu, self).__init__(screen)
         self.report_button = TextButton((10, 10), "You won!", FONT_BIG, pygame.Color("White"))
-        self.play_button = TextButton((10, 70), "Play again", FONT_BIG, pygame.Color("white"), pygame.Color("red"))
-        self.main_button = TextButton((10, 130), "Main menu", FONT_BIG, pygame.Color("white"), pygame.Color("red"))
+        self.retry_button = TextButton((10, 70), "Retry", FONT_BIG, pygame.Color("white"), pygame.Color("red"))
+        self.play_button = TextButton((10, 130), "Play again", FONT_BIG, pygame.Color("white"), pygame.Color("red"))
+        self.main_button = TextButton((10, 190), "Main menu", FONT_BIG, pygame.Color("white"), pygame.Color("red"))
 
     def render(self, world):
         """
@@ -35,6 +37,7 @@ class GameOverMenu(Menu):
         """
         world.render(self.screen)
         self.report_button.render(self.screen)
+        self.retry_button.render(self.screen)
         self.play_button.render(self.screen)
         self.main_button.render(self.screen)
 
@@ -44,16 +47,19 @@ class GameOverMenu(Menu):
 
         Returns:
             str: The action to be performed based on the button clicked.
-                    Possible values are "level" or "main".
+                    Possible values are "retry", "level" or "main".
                     Returns None if no button is clicked.
         """
         mouse_buttons = pygame.mouse.get_pressed()
         pos = pygame.mouse.get_pos()
 
+        self.retry_button.update_selected(pos)
         self.play_button.update_selected(pos)
         self.main_button.update_selected(pos)
         if mouse_buttons[0] and self.time_after_creation > 0.1:
-            if self.play_button.selected:
+            if self.retry_button.selected:
+                return "retry"
+            elif self.play_button.selected:
                 return "level"
             elif self.main_button.selected:
                 return "main"
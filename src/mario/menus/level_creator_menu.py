@@ -2,6 +2,7 @@ from ..enemies import *
 from ..player import *
 from ..tiles import *
 from ..world import World
+from ..edit_journal import EditJournal
 from .level_menu import LevelMenu
 from .play_menu import PlayMenu
 from ..specials import *
@@ -222,6 +223,8 @@ class ChangeScreen(Menu):
         """
         super(ChangeScreen, self).__init__(screen)
         self.world = world
+        # every change to the world is autosaved in the journal, which also keeps the changes for undo and redo
+        self.journal = None
         # The information menu at the right shows all possible objects the user can add.
         # There are different tabs (teh user can change tabs by clicking on arrow1 or arrow2)
         self.size_information = (400, SCREEN_SIZE[1])
@@ -329,16 +332,36 @@ class ChangeScreen(Menu):
 
         self.play_screen = PlayMenu(self.screen)
 
+        # the gridlines are drawn once on a surface that is one tile larger than the world part of the screen, this
+        # surface is shifted with the camera
+        self.grid_overlay = self.render_grid_overlay()
+
+    def render_grid_overlay(self):
+        """
+        Returns:
+            pygame.Surface: A transparent surface with the gridlines, with a line at every multiple of the tile size.
+        """
+        size = (self.pos_information[0] + TILE_SIZE[0], SCREEN_SIZE[1] + TILE_SIZE[1])
+        overlay = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            overlay = overlay.convert()
+        overlay.fill(pygame.Color("magenta"))
+        for i in range(0, size[0], TILE_SIZE[0]):
+            pygame.draw.line(overlay, pygame.Color("black"), (i, 0), (i, size[1]))
+        for j in range(0, size[1], TILE_SIZE[1]):
+            pygame.draw.line(overlay, pygame.Color("black"), (0, j), (size[0], j))
+        overlay.set_colorkey(pygame.Color("magenta"))
+        return overlay
+
     def render_grid(self):
         """Renders the gridlines on the screen to make it easier for the player to see and work with."""
-        for i in range(-self.world.camera_pos[0].astype(np.int32) % TILE_SIZE[0], self.pos_information[0], TILE_SIZE[0]):
-            pygame.draw.line(self.screen, pygame.Color("black"), (i, 0), (i, SCREEN_SIZE[1]))
-        for j in range(-self.world.camera_pos[1].astype(np.int32) % TILE_SIZE[1], SCREEN_SIZE[1], TILE_SIZE[1]):
-            pygame.draw.line(self.screen, pygame.Color("black"), (0, j), (self.pos_information[0], j))
+        camera_pos = self.world.camera_pos.astype(np.int32)
+        self.screen.blit(self.grid_overlay, (-(camera_pos[0] % TILE_SIZE[0]), -(camera_pos[1] % TILE_SIZE[1])))
 
     def render(self):
         """Renders the screen, including the grid, the world and the sidebar information with its game objects"""
-        self.world.render(self.screen, fast=False)
+        # the static layer of the world is kept while editing, every added or removed tile redraws its part of it
+        self.world.render(self.screen)
         self.render_grid()
         pygame.draw.rect(self.screen, pygame.Color("grey"), self.pos_information + self.size_information)
         pygame.draw.polygon(self.screen, pygame.Color("black"), self.points_arrow1)
@@ -365,11 +388,11 @@ class ChangeScreen(Menu):
         """
         Checks whether or not there is a game object at the position selected
         """
-        for game_object in self.world.get_all_game_objects():
+        for game_object in self.world.get_all_game_objects_no_tiles() + self.world.background_objects:
             if self.mouse_on_button(pos, game_object.pos, game_object.size):
                 return game_object
 
-        return None
+        return self.world.tile_grid.tile_at(pos)
 
     def tab_change(self):
         # Changing tabs if player clicks on arrows
@@ -401,7 +424,9 @@ class ChangeScreen(Menu):
                         self.world.add_gameobject(game_object)
                         game_object.check_collision_update("vertical")
                         game_object.check_collision_update("horizontal")
-                        game_object.input_parameters = (game_object.pos,) + game_object.input_parameters[1:]
+                        game_object.input_parameters = (np.copy(game_object.pos),) + game_object.input_parameters[1:]
+                        if self.journal is not None:
+                            self.journal.added(game_object)
                 except ValueError:  # you can't add an invalid object
                     pass
 
@@ -424,6 +449,8 @@ class ChangeScreen(Menu):
             pos = pygame.mouse.get_pos() + self.world.camera_pos
             game_object = self.game_object_at_pos(pos)
             if game_object is not None:
+                if self.journal is not None:
+                    self.journal.removed(game_object)
                 self.world.remove_gameobject(game_object)
 
     def handle_keys(self):
@@ -447,7 +474,8 @@ class ChangeScreen(Menu):
         """
         Main loop for the level creator menu.
         This method handles user input, updates the screen, and returns the created world when the user presses the Enter key.
-        If the user presses the Escape key, the current world is saved, then played, and finally loaded again.
+        If the user presses the Escape key, the current world is copied, then played, and finally restored from the copy.
+        Ctrl+Z undoes the last change and Ctrl+Y (or Ctrl+Shift+Z) redoes it.
         """
         self.time_after_creation = 0
         while True:
@@ -460,13 +488,18 @@ class ChangeScreen(Menu):
                     if event.key == pygame.K_RETURN:
                         return self.world
                     if event.key == pygame.K_ESCAPE:
-                        # if the player wants to play in his world, first save the current world, then play
-                        # and then load the world again (if movement happens while playing the game, this movement
-                        # is reset)
-                        self.world.save(os.path.join("TempWorlds", "TempWorld"))
-                        self.world.surface = None
+                        # if the player wants to play in his world, first take a snapshot of the current world,
+                        # then play and then restore the snapshot (if movement happens while playing the game, this
+                        # movement is reset, and so is the camera)
+                        snapshot = self.world.snapshot()
                         self.play_screen.loop(self.world)
-                        self.world.load(os.path.join("TempWorlds", "TempWorld"))
+                        self.world.restore(snapshot)
+                        self.world.set_active_region(None)
+                    if event.mod & pygame.KMOD_CTRL and self.journal is not None:
+                        if event.key == pygame.K_y or (event.key == pygame.K_z and event.mod & pygame.KMOD_SHIFT):
+                            self.journal.redo()
+                        elif event.key == pygame.K_z:
+                            self.journal.undo()
 
             self.handle_mouse()
             self.handle_keys()
@@ -489,13 +522,31 @@ class LevelCreatorMenu(Menu):
         """
         super(LevelCreatorMenu, self).__init__(screen)
         self.question1 = QuestionScreen(screen, "Do you want to change a world or create one?", "Change", "Create")
-        self.level_screen = LevelMenu(screen)
+        # the tile grids of worlds that are changed are memory mapped, such that huge worlds open quickly
+        self.level_screen = LevelMenu(screen, memory_map=True)
         self.question2 = QuestionScreen(screen, "What is the horizontal size of your world (in pixels)?")
         self.question3 = QuestionScreen(screen, "What is the vertical size of your world (in pixels)?")
         self.question4 = BackgroundSelectScreen(screen)
         self.question5 = QuestionScreen(screen, "What is the name of your world?")
+        self.question_restore = QuestionScreen(screen, "This world has unsaved changes, do you want to restore them?",
+                                               "Restore", "Discard")
         self.adaption_screen = ChangeScreen(screen)
 
+    def recover(self, journal, world):
+        """
+        Asks whether the changes in the autosave of the given journal should be restored, if there is an autosave.
+
+        Args:
+            journal (EditJournal): The journal of the world.
+            world (World): The world without the changes, can be None for a world that is created.
+
+        Returns:
+            World: The world with the changes if they are restored, otherwise the given world.
+        """
+        if journal.has_autosave() and self.question_restore.loop() == "Restore":
+            return journal.recover()
+        return world
+
     def loop(self):
         """
         Executes the main loop of the level creator menu.
@@ -506,17 +557,27 @@ class LevelCreatorMenu(Menu):
         name = None
         if answer1 == "Change":
             _, world, name = self.level_screen.loop()
+            journal = EditJournal(os.path.basename(name))
+            world = self.recover(journal, world)
         else:
-            answer2 = max(int(self.question2.loop()), SCREEN_SIZE[0])
-            answer3 = max(int(self.question3.loop()), SCREEN_SIZE[1])
-            background = self.question4.loop()
-            world = World((answer2, answer3), background)
-
+            journal = EditJournal(NEW_WORLD_AUTOSAVE)
+            world = self.recover(journal, None)
+            if world is None:
+                answer2 = max(int(self.question2.loop()), SCREEN_SIZE[0])
+                answer3 = max(int(self.question3.loop()), SCREEN_SIZE[1])
+                background = self.question4.loop()
+                world = World((answer2, answer3), background)
+
+        journal.start(world)
         self.adaption_screen.world = world
+        self.adaption_screen.journal = journal
         self.adaption_screen.loop()
         if answer1 == "Create":
             name = self.question5.loop()
             name = os.path.join("Worlds", name)
         self.adaption_screen.world.save(name)
+        # the world is saved, so the autosave is no longer needed
+        journal.close()
+        self.adaption_screen.journal = None
 
         return "main"
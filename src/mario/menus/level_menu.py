@@ -1,5 +1,7 @@
-from ..world import World
+from ..level_index import LevelIndex
+from ..level_loader import LevelLoader
 from ..constants import *
+from ..text_cache import render_text
 from .button import TextButton
 from .menu import Menu
 
@@ -8,28 +10,36 @@ class LevelMenu(Menu):
     """
     A menu that shows all levels.
     """
-    def __init__(self, screen):
+    def __init__(self, screen, memory_map=False):
         """
         Initialize the LevelMenu object.
 
         Args:
             screen: The screen object to display the menu on.
+            memory_map (bool, optional): Whether the tile grid of the chosen world is memory mapped, see World.load.
+                Defaults to False.
 
         Returns:
             None
         """
         super(LevelMenu, self).__init__(screen)
         self.buttons = []
+        self.memory_map = memory_map
+        # the level of the button the mouse is on is loaded in the background, such that it is (almost) ready when
+        # the button is clicked
+        self.loader = LevelLoader(memory_map=memory_map)
+        # the metadata and thumbnails of the levels, such that they don't need to be loaded to show them
+        self.index = LevelIndex()
         self.check_levels()
 
     def check_levels(self):
         """
-        Loads all levels and creates buttons for each one of them.
+        Updates the index of the levels and creates buttons for each one of them.
         """
         self.buttons = []
         x_pos = 10
         y_pos = 10
-        for i, file in enumerate(os.listdir("Worlds")):
+        for i, file in enumerate(self.index.update()):
             pos = (x_pos, y_pos)
             self.buttons.append(TextButton(pos, file, FONT_SMALL, pygame.Color("white"), pygame.Color("red")))
             x_pos += self.buttons[-1].size[0] + 10
@@ -43,6 +53,86 @@ class LevelMenu(Menu):
         """
         for button in self.buttons:
             button.render(self.screen)
+            if button.selected:
+                self.render_preview(button.message)
+
+    def render_preview(self, name):
+        """
+        Renders the thumbnail and the metadata of the given level in the lower left corner of the screen.
+
+        Args:
+            name (str): The file name of the level.
+        """
+        metadata = self.index.metadata(name)
+        if metadata is None:
+            lines = ["This level can't be loaded"]
+        else:
+            entities = metadata["entities"]
+            enemies = sum(entities.get(tag, 0) for tag in ["goomba", "koopa troopa", "koopa turtle"])
+            lines = [
+                "Size: " + str(metadata["size"][0]) + " x " + str(metadata["size"][1]),
+                "Background: " + metadata["background"],
+                "Enemies: " + str(enemies),
+                "Coins: " + str(entities.get("coin", 0)),
+                "Top score: " + str(metadata["top_score"])
+            ]
+
+        y_pos = SCREEN_SIZE[1] - LEVEL_THUMBNAIL_SIZE[1] - 10
+        thumbnail = self.index.thumbnail(name)
+        if thumbnail is not None:
+            self.screen.blit(thumbnail, (10, y_pos))
+        for line in reversed(lines):
+            text = render_text(FONT_MINI, line, pygame.Color("white"))
+            y_pos -= text.get_height() + 5
+            self.screen.blit(text, (10, y_pos))
+
+    def preload(self, path):
+        """
+        Starts loading the given level in the background, unless it is already loading. The level that was loading
+        before is cancelled.
+
+        Args:
+            path (str): The path of the level file.
+        """
+        self.loader.request(path)
+
+    def render_progress(self, progress):
+        """
+        Renders a progress bar at the bottom of the screen.
+
+        Args:
+            progress (float): The fraction of the bar that is filled, between 0 and 1.
+        """
+        x_pos = (SCREEN_SIZE[0] - LOADING_BAR_SIZE[0]) // 2
+        y_pos = SCREEN_SIZE[1] - LOADING_BAR_SIZE[1] - 40
+        text = render_text(FONT_SMALL, "Loading...", pygame.Color("white"))
+        self.screen.blit(text, (x_pos, y_pos - text.get_height() - 10))
+        pygame.draw.rect(self.screen, pygame.Color("white"), (x_pos, y_pos) + LOADING_BAR_SIZE, 2)
+        pygame.draw.rect(self.screen, pygame.Color("red"),
+                         (x_pos, y_pos, int(progress * LOADING_BAR_SIZE[0]), LOADING_BAR_SIZE[1]))
+
+    def load_level(self, path):
+        """
+        Returns the loaded level, while it is still loading the menu is shown with a progress bar.
+
+        Args:
+            path (str): The path of the level file.
+
+        Returns:
+            World: The world of the level.
+        """
+        self.preload(path)
+        while not self.loader.done:
+            self.clock.tick(FPS)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    quit()
+            self.screen.fill((0, 0, 0))
+            self.render()
+            self.render_progress(self.loader.progress)
+            pygame.display.update()
+        # a world can only be played once, so the next time it is loaded again
+        return self.loader.result()
 
     def loop(self):
         """
@@ -50,6 +140,8 @@ class LevelMenu(Menu):
         """
         self.time_after_creation = 0
         self.check_levels()
+        # the levels could have changed since the last time
+        self.loader.cancel()
         while True:
             self.clock.tick(FPS)
             self.screen.fill((0, 0, 0))
@@ -60,11 +152,13 @@ class LevelMenu(Menu):
             pos = pygame.mouse.get_pos()
             for button in self.buttons:
                 button.update_selected(pos)
+                if button.selected:
+                    self.preload(os.path.join("Worlds", button.message))
             if mouse_buttons[0] and self.time_after_creation > 0.1:
                 for button in self.buttons:
                     if button.selected:
                         path = os.path.join("Worlds", button.message)
-                        return "play", World(load_file=path), path
+                        return "play", self.load_level(path), path
 
             get_fps = self.clock.get_fps()
             if get_fps != 0:
@@ -1,4 +1,6 @@
 from ..constants import *
+from ..profiler import FrameProfiler, profile_file_name
+from ..text_cache import render_text
 from .menu import Menu
 
 
@@ -11,6 +13,11 @@ class PlayMenu(Menu):
             screen: The screen object to display the menu on.
         """
         super(PlayMenu, self).__init__(screen)
+        # measures the time of every frame, F3 shows the overlay and F4 writes the frames to a csv file
+        self.profiler = FrameProfiler()
+        # maps every field of the hud to its text and rect on the screen in the last frame
+        self.hud_rects = dict()
+        self.overlay_rects = []
 
     def loop(self, world, file=None):
         """
@@ -23,33 +30,83 @@ class PlayMenu(Menu):
         Returns:
             str: The result of the loop, either "game over" or None.
         """
+        # objects far away from the screen don't need to be updated
+        world.set_active_region(ACTIVE_REGION_MARGIN)
+        world.profiler = self.profiler
+        # the screen still shows the previous menu, so the first frame is drawn entirely
+        world.drawn_camera_pos = None
+        self.hud_rects = dict()
+        self.overlay_rects = []
         while True:
             self.clock.tick(FPS)
+            self.profiler.begin_frame()
+            self.profiler.begin("input")
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        world.profiler = None
                         return "game over"
+                    if event.key == pygame.K_F3:
+                        self.profiler.toggle_overlay()
+                    if event.key == pygame.K_F4:
+                        self.profiler.dump_csv(profile_file_name())
+            self.profiler.end()
 
             get_fps = self.clock.get_fps()
             if get_fps > 10:
                 world.update(1 / get_fps)
 
-            world.render(self.screen)
+            self.profiler.begin("render")
+            # the fps is shown as a whole number, such that its text (and the text cache) only changes when it does
+            hud = {"fps": ("FPS: " + str(int(round(get_fps))), (10, 10))}
+            if world.player is not None:
+                hud["coins"] = ("Coins: " + str(world.player.coins), (10, 50))
+                hud["score"] = ("Score: " + str(world.player.score), (10, 90))
+                hud["top score"] = ("Top Score: " + str(world.top_score), (10, 130))
+
+            if DIRTY_RECT_RENDERING:
+                # only the parts of the screen that changed are drawn and updated: the fields of the hud of which the
+                # text changed (or disappeared) are drawn again together with everything that changed in the world
+                changed_fields = [field for field in self.hud_rects
+                                  if field not in hud or hud[field][0] != self.hud_rects[field][0]]
+                changed_rects = [self.hud_rects[field][1] for field in changed_fields]
+                changed_rects += self.overlay_rects
+                # the hud and the overlay don't scroll with the world
+                overlay_rects = [rect for message, rect in self.hud_rects.values()] + self.overlay_rects
+                rects = world.render_dirty(self.screen, changed_rects, overlay_rects)
+            else:
+                world.render(self.screen)
+                rects = None
 
             if world.gameover:
+                world.profiler = None
                 if file is not None:
                     world.save_top_score(file)
                 return "game over"
 
-            text = FONT_MEDIUM.render("FPS: " + str(round(get_fps, 2)), True, pygame.Color('white'))
-            self.screen.blit(text, (10, 10))
-            if world.player is not None:
-                coins_total = FONT_MEDIUM.render("Coins: " + str(world.player.coins), True, pygame.Color('white'))
-                score_total = FONT_MEDIUM.render("Score: " + str(world.player.score), True, pygame.Color('white'))
-                top_score = FONT_MEDIUM.render("Top Score: " + str(world.top_score), True, pygame.Color('white'))
-                self.screen.blit(coins_total, (10, 50))
-                self.screen.blit(score_total, (10, 90))
-                self.screen.blit(top_score, (10, 130))
-            pygame.display.update()
+            hud_rects = dict()
+            for field, (message, pos) in hud.items():
+                drawn = self.hud_rects.get(field)
+                if rects is None or drawn is None or drawn[0] != message or drawn[1].collidelist(rects) != -1:
+                    text = render_text(FONT_MEDIUM, message, pygame.Color('white'))
+                    hud_rects[field] = (message, self.screen.blit(text, pos))
+                    if rects is not None:
+                        rects.append(hud_rects[field][1])
+                else:
+                    hud_rects[field] = drawn
+            self.hud_rects = hud_rects
+            self.overlay_rects = self.profiler.render(self.screen, (SCREEN_SIZE[0] - PROFILER_GRAPH_SIZE[0] - 10, 10))
+            if rects is not None:
+                rects += self.overlay_rects
+            self.profiler.end()
+
+            self.profiler.begin("display")
+            if rects is not None and world.screen_scrolled:
+                # the whole screen was scrolled, only the drawing was limited to the rects
+                pygame.display.update()
+            else:
+                pygame.display.update(rects)
+            self.profiler.end()
+            self.profiler.end_frame()
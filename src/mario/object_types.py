@@ -0,0 +1,57 @@
+from enum import IntFlag
+
+
+class ObjectType(IntFlag):
+    """
+    The type of a game object, as a bit flag such that a set of types is one number. An object can have more than one
+    flag, e.g. a turtle is an ENEMY and a TURTLE.
+    """
+    NONE = 0
+    PLAYER = 1
+    ENEMY = 2
+    TURTLE = 4
+    MUSHROOM = 8
+    TILE = 16
+    MYSTERY_BOX = 32
+    COIN = 64
+    PIPE = 128
+    GOAL = 256
+    BACKGROUND = 512
+    ALL = 1023
+
+
+# The types of game objects that a moving game object collides with, per type of the moving object. Game objects of
+# other types are skipped before any geometry test (see GameObject.collides_all): they are never pushed out of each
+# other and their special_reaction_collision is not called. Coins only react to the player, so enemies and mushrooms
+# pass through them. Types without a row collide with everything
+COLLISION_MATRIX = {
+    ObjectType.PLAYER: ObjectType.ENEMY | ObjectType.MUSHROOM | ObjectType.TILE | ObjectType.MYSTERY_BOX |
+                       ObjectType.COIN | ObjectType.PIPE | ObjectType.GOAL,
+    ObjectType.ENEMY: ObjectType.PLAYER | ObjectType.ENEMY | ObjectType.MUSHROOM | ObjectType.TILE |
+                      ObjectType.MYSTERY_BOX | ObjectType.PIPE | ObjectType.GOAL,
+    ObjectType.MUSHROOM: ObjectType.PLAYER | ObjectType.ENEMY | ObjectType.MUSHROOM | ObjectType.TILE |
+                         ObjectType.MYSTERY_BOX | ObjectType.PIPE | ObjectType.GOAL,
+}
+
+# The solid blocks that don't move and that other game objects stand on. The player collides with their rects
+# instead of the pixels of their sprites, see Mario.collides
+BLOCK_TYPES = int(ObjectType.TILE | ObjectType.PIPE | ObjectType.MYSTERY_BOX)
+
+
+def collision_mask(object_type):
+    """
+    Returns the types of game objects that a game object of the given type collides with, see COLLISION_MATRIX.
+
+    Args:
+        object_type (ObjectType): The type of the game object.
+
+    Returns:
+        int: The flags of the types it collides with, a plain int such that testing it is fast.
+    """
+    mask = 0
+    found = False
+    for row_type, row_mask in COLLISION_MATRIX.items():
+        if row_type & object_type:
+            mask |= row_mask
+            found = True
+    return int(mask) if found else int(ObjectType.ALL)
@@ -0,0 +1,190 @@
+import numpy as np
+from .constants import *
+
+
+class PhysicsStore:
+    """
+    Keeps the positions, velocities, sizes and movability of many game objects in contiguous arrays, such that the
+    movement of all of them can be computed at once instead of one object at a time.
+
+    The pos and vel attributes of a game object in the store are views on a row of the arrays of the store, so the
+    rest of the game can keep using (and changing) them as usual. These attributes should therefore only be changed in
+    place (e.g. game_object.vel[:] = 0) and never be reassigned while the object is in the store.
+    """
+    def __init__(self, capacity=PHYSICS_STORE_CAPACITY):
+        """
+        Initializes an empty PhysicsStore.
+
+        Args:
+            capacity (int, optional): The initial number of objects the arrays can hold, the arrays grow when this
+                number is exceeded. Defaults to PHYSICS_STORE_CAPACITY.
+        """
+        self.objects = []
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.size = np.zeros((capacity, 2))
+        # movable[:, 0] is horizontal_movable, movable[:, 1] is vertical_movable
+        self.movable = np.zeros((capacity, 2), dtype=bool)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def bind(self, game_object):
+        """
+        Makes the pos and vel attributes of the game object views on its rows of the store.
+
+        Args:
+            game_object (GameObject): A game object in the store.
+        """
+        game_object.pos = self.pos[game_object.physics_index]
+        game_object.vel = self.vel[game_object.physics_index]
+
+    def grow(self):
+        """
+        Doubles the capacity of the store. This reallocates the arrays, so all views are bound again.
+        """
+        capacity = 2 * len(self.pos)
+        for name in ["pos", "vel", "size", "movable"]:
+            array = getattr(self, name)
+            new_array = np.zeros((capacity, 2), dtype=array.dtype)
+            new_array[:len(array)] = array
+            setattr(self, name, new_array)
+
+        for game_object in self.objects:
+            self.bind(game_object)
+
+    def add(self, game_object):
+        """
+        Adds a game object to the store.
+
+        Args:
+            game_object (GameObject): The game object to be added.
+        """
+        if len(self.objects) == len(self.pos):
+            self.grow()
+        index = len(self.objects)
+        self.pos[index] = game_object.pos
+        self.vel[index] = game_object.vel
+        self.objects.append(game_object)
+        game_object.physics_index = index
+        self.bind(game_object)
+        self.sync(game_object)
+
+    def remove(self, game_object):
+        """
+        Removes a game object from the store, the object gets its own pos and vel arrays back. The last object of the
+        store takes the place of the removed one, such that the arrays stay contiguous.
+
+        Args:
+            game_object (GameObject): The game object to be removed.
+        """
+        index = game_object.physics_index
+        game_object.pos = np.copy(self.pos[index])
+        game_object.vel = np.copy(self.vel[index])
+        game_object.physics_index = None
+
+        last = len(self.objects) - 1
+        if index != last:
+            moved_object = self.objects[last]
+            for array in [self.pos, self.vel, self.size, self.movable]:
+                array[index] = array[last]
+            self.objects[index] = moved_object
+            moved_object.physics_index = index
+            self.bind(moved_object)
+        self.objects.pop()
+
+    def sync(self, game_object):
+        """
+        Copies the size and movability of the game object to the store, must be called when one of these changes.
+
+        Args:
+            game_object (GameObject): A game object in the store.
+        """
+        index = game_object.physics_index
+        self.size[index] = game_object.size
+        self.movable[index, 0] = game_object.horizontal_movable
+        self.movable[index, 1] = game_object.vertical_movable
+
+    def clear(self):
+        """
+        Removes all objects from the store.
+        """
+        for game_object in self.objects[::-1]:
+            self.remove(game_object)
+
+    def indices(self, game_objects):
+        """
+        Returns the indices in the store of the given game objects, objects that are not (or no longer) in the store
+        are skipped.
+
+        Args:
+            game_objects (list): The game objects.
+
+        Returns:
+            numpy.ndarray: The indices of the objects.
+        """
+        return np.array([game_object.physics_index for game_object in game_objects
+                         if game_object.physics_index is not None], dtype=np.int64)
+
+    def displacement(self, indices, side_index, time):
+        """
+        Computes how far the given objects move along one axis with their velocity, objects that are not movable along
+        this axis don't move.
+
+        Args:
+            indices (numpy.ndarray): The indices of the objects.
+            side_index (int): 0 for the horizontal axis, 1 for the vertical axis.
+            time (float): The time over which the objects move.
+
+        Returns:
+            numpy.ndarray: The displacement of every object.
+        """
+        return time * self.vel[indices, side_index] * self.movable[indices, side_index]
+
+    def move(self, indices, side_index, displacement):
+        """
+        Moves the given objects along one axis.
+
+        Args:
+            indices (numpy.ndarray): The indices of the objects.
+            side_index (int): 0 for the horizontal axis, 1 for the vertical axis.
+            displacement (numpy.ndarray): The displacement of every object, see displacement.
+        """
+        self.pos[indices, side_index] += displacement
+
+    def apply_gravity(self, indices, time):
+        """
+        Accelerates the given objects downwards, only vertically movable objects are affected.
+
+        Args:
+            indices (numpy.ndarray): The indices of the objects.
+            time (float): The time over which the gravity works.
+        """
+        self.vel[indices, 1] += GRAVITY * time * self.movable[indices, 1]
+
+    def handle_outside_world_size(self, indices, world_size):
+        """
+        Puts the given movable objects that went outside the world at the left, right or top back inside it, like
+        GameObject.handle_outside_world_size does for a single object.
+
+        Args:
+            indices (numpy.ndarray): The indices of the objects.
+            world_size (tuple): The size of the world.
+
+        Returns:
+            list: The objects that are at the border of the world or fell out of it, these might need to react.
+        """
+        pos = self.pos[indices]
+        size = self.size[indices]
+        movable = np.any(self.movable[indices], axis=1)
+        right = movable & (pos[:, 0] + size[:, 0] > world_size[0])
+        left = movable & (pos[:, 0] <= 0)
+        top = movable & (pos[:, 1] < 0)
+        fallen = movable & (pos[:, 1] > world_size[1])
+
+        pos[right, 0] = world_size[0] - size[right, 0]
+        pos[left, 0] = 0
+        pos[top, 1] = 0
+        self.pos[indices] = pos
+
+        return [self.objects[index] for index in indices[right | left | top | fallen]]
@@ -1,6 +1,6 @@
 from .sprite_loader import *
 from .game_object import GameObject
-from .menus.settings_menu import SettingsMenu
+from .object_types import ObjectType, BLOCK_TYPES
 import numpy as np
 from .constants import *
 
@@ -16,7 +16,7 @@ class Mario(GameObject):
             world (World, optional): The world in which the Mario object exists. Defaults to None.
         """
         self.input_parameters = (pos, size)
-        super(Mario, self).__init__(pos, np.zeros(2), MARIO_STILL, resize=size, type="player", world=world)
+        super(Mario, self).__init__(pos, np.zeros(2), MARIO_STILL, resize=size, type=ObjectType.PLAYER, world=world)
         self.horizontal_speed = SPEED_PLAYER
         self.jump_speed = JUMP_SPEED_PLAYER
         self.able_to_jump = False
@@ -47,7 +47,7 @@ class Mario(GameObject):
         Returns:
             None
         """
-        if collision_object.type != "goal" and "mushroom" not in collision_object.type:
+        if collision_object.type != ObjectType.GOAL and collision_object.type != ObjectType.MUSHROOM:
             super(Mario, self).collision_set_good(collision_object, side_index)
 
     def special_reaction_collision(self, side, other):
@@ -61,14 +61,14 @@ class Mario(GameObject):
         Returns:
             None
         """
-        if other.type == "enemy" and other.alive:
+        if other.type & ObjectType.ENEMY and other.alive:
+            turtle = other.type & ObjectType.TURTLE
             if side == "vertical" and self.pos[1] < other.pos[1] and self.ducking and \
-                    (str(other) != "turtle" or other.vel[0] == 0):
-                if str(other) != "turtle":
+                    (not turtle or other.vel[0] == 0):
+                if not turtle:
                     other.set_lives(other.lives - 1)
                     self.score += 100
-                if SettingsMenu.SETTINGS["Sound"] == "on":
-                    KICK_SOUND.play()
+                self.world.play_sound(KICK_SOUND)
                 self.able_to_jump = True
                 self.jump()
                 # This makes sure that a full jump is performed, otherwise the program will call end_jump()
@@ -77,7 +77,7 @@ class Mario(GameObject):
             elif self.hit <= 0:
                 self.set_lives(self.lives - 1)
                 self.hit = INVULNERABLE_TIME
-        elif other.type == "goal":
+        elif other.type == ObjectType.GOAL:
             if not self.goal_reached and self.pos[0] >= other.pos[0] + 4 * other.size[0] // 7:
                 self.score += 1000
                 self.goal_reached = True
@@ -117,16 +117,9 @@ class Mario(GameObject):
         else:
             sprite = MARIO_RUNNING[self.current_sprite_int]
 
-        if self.direction == -1 and self.alive:
-            sprite = pygame.transform.flip(sprite, True, False)
-
         # changing size of the player. If it has hit a Mushroom, it lives will increase, so will its size
-        if self.lives <= 1:
-            size = (int(np.round(1 / 1.3 * sprite.get_size()[0])), int(np.round((1 / 1.3 * sprite.get_size()[1]))))
-        else:
-            size = (int(np.round(1 / 1.1 * sprite.get_size()[0])), int(np.round((1 / 1.1 * sprite.get_size()[1]))))
-
-        self.set_sprite(sprite, size)
+        size = mario_sprite_size(sprite, self.lives)
+        self.set_sprite(get_sprite(sprite, self.direction == -1 and self.alive, size), size)
 
     def collides(self, other):
         """
@@ -136,15 +129,14 @@ class Mario(GameObject):
         - other: The object to check for collision with.
 
         Returns:
-        - A list of sprites that collide with the player, if any.
+        - Whether the player collides with the other object. For objects that are not solid blocks (tiles, pipes and
+          mystery boxes), the pixels of their sprites have to overlap. The rects of solid blocks are used, because
+          swept_displacement stops a movement just inside their rect, where their sprite can be transparent.
         """
-        if "tile" not in other.type:
+        if not BLOCK_TYPES & other.type:
             if super(Mario, self).collides(other):
-                self.mask = pygame.mask.from_surface(self.image)
-                other.mask = pygame.mask.from_surface(other.image)
-                self.rect = self.image.get_rect()
-                other.rect = other.image.get_rect()
-                return pygame.sprite.spritecollide(self, [other], False, pygame.sprite.collide_mask)
+                offset = (int(round(other.pos[0] - self.pos[0])), int(round(other.pos[1] - self.pos[1])))
+                return get_mask(self.image).overlap(get_mask(other.current_image()), offset) is not None
         return super(Mario, self).collides(other)
 
     def duck(self):
@@ -227,8 +219,7 @@ class Mario(GameObject):
         """
         super(Mario, self).on_death()
         self.world.gameover = True
-        if SettingsMenu.SETTINGS["Sound"] == "on":
-            DIE_SOUND.play()
+        self.world.play_sound(DIE_SOUND)
 
     def update(self, time):
         """
@@ -242,15 +233,15 @@ class Mario(GameObject):
         """
         if self.vertical_movable:
             if not self.goal_reached:
-                self.pos[1] += time * self.vel[1]
+                self.pos[1] += self.swept_displacement(1, time * self.vel[1])
             else:
-                self.pos[1] += time * SPEED_DOWN_FLAGPOLE
+                self.pos[1] += self.swept_displacement(1, time * SPEED_DOWN_FLAGPOLE)
 
             self.check_collision_update("vertical")
             self.able_to_jump = self.vel[1] == 0
             self.vel[1] += GRAVITY * time
         if self.horizontal_movable:
-            self.pos[0] += time * self.vel[0]
+            self.pos[0] += self.swept_displacement(0, time * self.vel[0])
             self.check_collision_update("horizontal")
             self.handle_outside_world_size()
             self.change_sprite()
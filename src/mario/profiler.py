@@ -0,0 +1,215 @@
+import csv
+import time
+import numpy as np
+from collections import deque
+from .constants import *
+from .text_cache import render_text
+import pygame
+
+
+class FrameProfiler:
+    """
+    Measures how long every frame takes and how this time is divided over the sections of a frame (input handling,
+    updating the player, updating the enemies, collisions, rendering, ...). The times of the last frames are kept to
+    compute percentiles, draw a graph on the screen and write them to a csv file.
+
+    Sections can be nested, the time of a nested section is not counted in the section around it. The time of a frame
+    that is not in any section is counted as "other".
+    """
+    def __init__(self, history=PROFILER_HISTORY):
+        """
+        Initializes a FrameProfiler object.
+
+        Args:
+            history (int, optional): The number of frames that are kept. Defaults to PROFILER_HISTORY.
+        """
+        # the names of all sections in the order they were first used
+        self.sections = []
+        # one record per frame: (frame number, total time, dict with the time of every section), in seconds
+        self.frames = deque(maxlen=history)
+        self.frame_number = 0
+        self.frame_start = None
+        self.current = dict()
+        self.stack = []
+        self.section_start = 0
+        self.show_overlay = False
+        self.graph = None
+        self.text = None
+
+    def begin_frame(self):
+        """
+        Starts measuring a new frame.
+        """
+        self.current = dict()
+        self.stack = []
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """
+        Stops measuring the current frame and stores its record.
+        """
+        if self.frame_start is None:
+            return
+        now = time.perf_counter()
+        while len(self.stack) > 0:
+            self.end(now)
+        total = now - self.frame_start
+        self.current["other"] = max(0, total - sum(self.current.values()))
+        for name in self.current:
+            if name not in self.sections:
+                self.sections.append(name)
+        self.frames.append((self.frame_number, total, self.current))
+        self.frame_number += 1
+        self.frame_start = None
+        if self.show_overlay:
+            self.update_graph()
+
+    def begin(self, name, now=None):
+        """
+        Starts measuring a section of the current frame, the section around it (if any) is paused.
+
+        Args:
+            name (str): The name of the section.
+            now (float, optional): The current time of time.perf_counter(). Defaults to None.
+        """
+        if now is None:
+            now = time.perf_counter()
+        if len(self.stack) > 0:
+            self.add_time(self.stack[-1], now - self.section_start)
+        self.stack.append(name)
+        self.section_start = now
+
+    def end(self, now=None):
+        """
+        Stops measuring the section that was started last, the section around it (if any) continues.
+
+        Args:
+            now (float, optional): The current time of time.perf_counter(). Defaults to None.
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.add_time(self.stack.pop(), now - self.section_start)
+        self.section_start = now
+
+    def add_time(self, name, duration):
+        """
+        Adds the given duration to a section of the current frame.
+        """
+        self.current[name] = self.current.get(name, 0) + duration
+
+    def frame_times(self, name=None):
+        """
+        Returns the times of the kept frames in milliseconds.
+
+        Args:
+            name (str, optional): The name of a section, None gives the total time of the frames. Defaults to None.
+
+        Returns:
+            numpy.ndarray: The times of every frame.
+        """
+        if name is None:
+            return 1000 * np.array([total for _, total, _ in self.frames])
+        return 1000 * np.array([sections.get(name, 0) for _, _, sections in self.frames])
+
+    def percentiles(self, percentiles=(50, 95, 99)):
+        """
+        Computes percentiles of the time of the frames and of every section over the kept frames.
+
+        Args:
+            percentiles (tuple, optional): The percentiles to compute. Defaults to (50, 95, 99).
+
+        Returns:
+            dict: Maps "frame" and every section name to the list of percentiles in milliseconds.
+        """
+        if len(self.frames) == 0:
+            return dict()
+        result = {"frame": [float(value) for value in np.percentile(self.frame_times(), percentiles)]}
+        for name in self.sections:
+            result[name] = [float(value) for value in np.percentile(self.frame_times(name), percentiles)]
+        return result
+
+    def dump_csv(self, file):
+        """
+        Writes the record of every kept frame to a csv file, the times are in milliseconds.
+
+        Args:
+            file (str): The path of the file.
+        """
+        with open(file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "total"] + self.sections)
+            for frame_number, total, sections in self.frames:
+                writer.writerow([frame_number, 1000 * total] + [1000 * sections.get(name, 0) for name in self.sections])
+
+    def toggle_overlay(self):
+        """
+        Shows or hides the overlay with the frame graph.
+        """
+        self.show_overlay = not self.show_overlay
+        self.graph = None
+        self.text = None
+
+    def update_graph(self):
+        """
+        Adds the last frame to the graph. Every frame is a column of the graph with a bar per section, the graph is
+        scrolled instead of drawn again.
+        """
+        width, height = PROFILER_GRAPH_SIZE
+        if self.graph is None:
+            self.graph = pygame.Surface(PROFILER_GRAPH_SIZE)
+        self.graph.scroll(-1, 0)
+        self.graph.fill((0, 0, 0), (width - 1, 0, 1, height))
+
+        y = height
+        for index, name in enumerate(self.sections):
+            bar = int(round(1000 * self.frames[-1][2].get(name, 0) / PROFILER_GRAPH_MAX_MS * height))
+            if bar > 0:
+                y -= bar
+                self.graph.fill(PROFILER_COLORS[index % len(PROFILER_COLORS)], (width - 1, y, 1, bar))
+        # the line shows the time of a frame at the intended frame rate
+        y_target = height - int(1000 / FPS / PROFILER_GRAPH_MAX_MS * height)
+        self.graph.set_at((width - 1, y_target), (255, 255, 255))
+
+        if self.text is None or self.frames[-1][0] % PROFILER_TEXT_INTERVAL == 0:
+            self.update_text()
+
+    def update_text(self):
+        """
+        Renders the percentiles of the frame and the sections, these are shown below the graph.
+        """
+        lines = []
+        for index, (name, values) in enumerate(self.percentiles().items()):
+            color = (255, 255, 255) if name == "frame" else PROFILER_COLORS[(index - 1) % len(PROFILER_COLORS)]
+            message = name + ": " + " / ".join("{:.1f}".format(value) for value in values)
+            lines.append(FONT_MINI.render(message, True, color, (0, 0, 0)))
+        self.text = lines
+
+    def render(self, screen, pos):
+        """
+        Renders the overlay on the screen if it is shown.
+
+        Args:
+            screen (pygame.Surface): The surface to render on.
+            pos (tuple): The position of the upper left corner of the overlay.
+
+        Returns:
+            list: The rects of the screen that were drawn on.
+        """
+        if not self.show_overlay or self.graph is None:
+            return []
+        rects = [screen.blit(self.graph, pos)]
+        y = pos[1] + PROFILER_GRAPH_SIZE[1] + 5
+        rects.append(screen.blit(render_text(FONT_MINI, "ms p50 / p95 / p99", (255, 255, 255), (0, 0, 0)),
+                                 (pos[0], y)))
+        for line in self.text:
+            y += line.get_height() + 3
+            rects.append(screen.blit(line, (pos[0], y)))
+        return rects
+
+
+def profile_file_name():
+    """
+    Returns:
+        str: A file name for a csv dump of the profiler, containing the current date and time.
+    """
+    return time.strftime("profile-%Y%m%d-%H%M%S.csv")
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def copy_state(game_object):
+    """
+    Returns a copy of the attributes of the given game object. Arrays and lists are copied, such that changing the
+    game object afterwards doesn't change the copy. Everything else (sprites, the world, ...) is shared.
+
+    Args:
+        game_object (GameObject): The game object.
+
+    Returns:
+        dict: The copied attributes.
+    """
+    state = dict(game_object.__dict__)
+    for name, value in state.items():
+        if isinstance(value, np.ndarray):
+            state[name] = np.copy(value)
+        elif isinstance(value, list):
+            state[name] = list(value)
+    return state
+
+
+class WorldSnapshot:
+    """
+    The dynamic state of a world at one moment: which game objects are in the world and the attributes of every one
+    of them (positions, velocities, lives, timers, ...), the tile grid and the camera. Restoring a snapshot (see
+    World.restore) puts the same game objects back in this state, so no game object is created again and the static
+    layer is only drawn again where tiles changed.
+
+    The background objects are not part of a snapshot, they don't change while playing.
+    """
+    def __init__(self, world):
+        """
+        Takes a snapshot of the given world.
+
+        Args:
+            world (World): The world.
+        """
+        self.game_objects = [(game_object, copy_state(game_object)) for game_object in world.game_objects]
+        self.player = None
+        if world.player is not None:
+            self.player = (world.player, copy_state(world.player))
+        # one byte per tile position, the tile objects that were created are kept as they are (tiles don't change)
+        self.tile_ids = np.array(world.tile_grid.ids)
+        self.tiles = dict(world.tile_grid.tiles)
+        self.camera_pos = np.copy(world.camera_pos)
+        self.animation_time = world.animation_clock.time
+        self.gameover = world.gameover
+        self.won = world.won
+
+    @staticmethod
+    def restore_state(game_object, state):
+        """
+        Gives the given game object the attributes of the given copy again, the copy can be used again afterwards.
+        """
+        game_object.__dict__.clear()
+        game_object.__dict__.update(state)
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                setattr(game_object, name, np.copy(value))
+            elif isinstance(value, list):
+                setattr(game_object, name, list(value))
@@ -0,0 +1,118 @@
+from .constants import *
+
+
+class SpatialHash:
+    """
+    A uniform grid of buckets that keeps track of which game objects are in which part of the world. It is used to
+    quickly find the objects that are close to a given area, without having to check every object in the world.
+    """
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        """
+        Initializes an empty SpatialHash.
+
+        Args:
+            cell_size (tuple, optional): The size of one bucket in pixels. Defaults to SPATIAL_HASH_CELL_SIZE.
+        """
+        self.cell_size = cell_size
+        # maps a cell (i, j) to the objects in that cell, a dict is used as an ordered set such that queries
+        # always return the objects in the same order
+        self.cells = dict()
+        # maps an object to the range of cells it is in at the moment: (i_begin, i_end, j_begin, j_end)
+        self.object_cells = dict()
+
+    def __contains__(self, game_object):
+        return game_object in self.object_cells
+
+    def cell_range(self, pos, size):
+        """
+        Computes the range of cells covered by the given rectangle.
+
+        Args:
+            pos (tuple): The position of the rectangle.
+            size (tuple): The size of the rectangle.
+
+        Returns:
+            tuple: (i_begin, i_end, j_begin, j_end), the end values are inclusive.
+        """
+        return (int(pos[0] // self.cell_size[0]), int((pos[0] + size[0]) // self.cell_size[0]),
+                int(pos[1] // self.cell_size[1]), int((pos[1] + size[1]) // self.cell_size[1]))
+
+    def add(self, game_object):
+        """
+        Adds a game object to the buckets it overlaps.
+
+        Args:
+            game_object (GameObject): The game object to be added.
+        """
+        cells = self.cell_range(game_object.pos, game_object.size)
+        self.object_cells[game_object] = cells
+        for i in range(cells[0], cells[1] + 1):
+            for j in range(cells[2], cells[3] + 1):
+                bucket = self.cells.get((i, j))
+                if bucket is None:
+                    bucket = dict()
+                    self.cells[(i, j)] = bucket
+                bucket[game_object] = None
+
+    def remove(self, game_object):
+        """
+        Removes a game object from all buckets it is in. Nothing happens if the object is not in the hash.
+
+        Args:
+            game_object (GameObject): The game object to be removed.
+        """
+        cells = self.object_cells.pop(game_object, None)
+        if cells is None:
+            return
+        for i in range(cells[0], cells[1] + 1):
+            for j in range(cells[2], cells[3] + 1):
+                bucket = self.cells[(i, j)]
+                del bucket[game_object]
+                if len(bucket) == 0:
+                    del self.cells[(i, j)]
+
+    def update(self, game_object):
+        """
+        Moves a game object to the correct buckets after its position or size changed. This is cheap when the object
+        stays within the same buckets, which is almost always the case.
+
+        Args:
+            game_object (GameObject): The game object that moved.
+        """
+        cells = self.object_cells.get(game_object)
+        if cells is None:
+            return
+        if cells != self.cell_range(game_object.pos, game_object.size):
+            self.remove(game_object)
+            self.add(game_object)
+
+    def query(self, pos, size):
+        """
+        Returns all game objects that are in a bucket overlapping the given rectangle. The objects themselves do not
+        necessarily overlap the rectangle, so an exact test is still needed.
+
+        Args:
+            pos (tuple): The position of the rectangle.
+            size (tuple): The size of the rectangle.
+
+        Returns:
+            list: The game objects close to the rectangle, every object occurs only once.
+        """
+        cells = self.cell_range(pos, size)
+        if cells[0] == cells[1] and cells[2] == cells[3]:
+            return list(self.cells.get((cells[0], cells[2]), ()))
+
+        found = dict()
+        for i in range(cells[0], cells[1] + 1):
+            for j in range(cells[2], cells[3] + 1):
+                bucket = self.cells.get((i, j))
+                if bucket is not None:
+                    found.update(bucket)
+        return list(found)
+
+    def clear(self):
+        """
+        Removes all game objects from the hash.
+        """
+        self.cells = dict()
+        self.object_cells = dict()
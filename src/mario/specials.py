@@ -1,10 +1,12 @@
 from .sprite_loader import *
 from .game_object import GameObject
-from .menus.settings_menu import SettingsMenu
+from .object_types import ObjectType
 import numpy as np
 
 
 class Mushroom(GameObject):
+    batch_physics = True
+
     def __init__(self, pos, size=TILE_SIZE, color="red", direction=1, world=None):
         """
         Initializes a Mushroom object.
@@ -22,7 +24,7 @@ class Mushroom(GameObject):
         self.direction = direction
         self.speed = SPEED_MUSHROOM
         super(Mushroom, self).__init__(pos, np.array([self.direction * SPEED_MUSHROOM, 0]), sprite, resize=size,
-                                        world=world, type="mushroom special")
+                                        world=world, type=ObjectType.MUSHROOM)
 
     def special_reaction_collision(self, side, other):
         """
@@ -35,12 +37,12 @@ class Mushroom(GameObject):
         Returns:
             None
         """
-        if other.type == "player":
+        if other.type == ObjectType.PLAYER:
             other.lives = 2
-            self.world.remove_gameobject(self)
-            if SettingsMenu.SETTINGS["Sound"] == "on":
-                POWERUP_SOUND.play()
-        elif other.type == "enemy":
+            world = self.world
+            world.remove_gameobject(self)
+            world.play_sound(POWERUP_SOUND)
+        elif other.type & ObjectType.ENEMY:
             self.world.remove_gameobject(self)
         else:
             if side == "horizontal" and not other.passable:
@@ -59,7 +61,7 @@ class Flagpole(GameObject):
             world (World, optional): The world in which the Flagpole exists. Defaults to None.
         """
         self.input_parameters = (pos, size)
-        super(Flagpole, self).__init__(pos, np.zeros(2), FLAGPOLE, resize=size, world=world, type="goal",
+        super(Flagpole, self).__init__(pos, np.zeros(2), FLAGPOLE, resize=size, world=world, type=ObjectType.GOAL,
                                         vertical_movable=False, horizontal_movable=False)
 
     def special_reaction_collision(self, side, other):
@@ -73,7 +75,7 @@ class Flagpole(GameObject):
         Returns:
             None
         """
-        if other.type == "player":
+        if other.type == ObjectType.PLAYER:
             # the constants here are quite arbirary but give the best view when playing
             if other.pos[0] > self.pos[0] + self.size[0] // 3:
                 other.pos[0] = self.pos[0] + 4 * self.size[0] // 7
@@ -81,8 +83,7 @@ class Flagpole(GameObject):
                 other.pos[1] = self.pos[1] + self.size[1] - other.size[1] - 20
                 self.world.gameover = True
                 self.world.won = True
-                if SettingsMenu.SETTINGS["Sound"] == "on":
-                    STAGE_CLEAR_SOUND.play()
+                self.world.play_sound(STAGE_CLEAR_SOUND)
             elif other.pos[1] < self.pos[1]:
                 other.pos[1] = self.pos[1]
 
@@ -103,8 +104,9 @@ class BackgroundSprites(GameObject):
         """
         self.input_parameters = (pos, sprite_name, size)
         sprite = BACKGROUND_SPRITES[sprite_name]
-        super(BackgroundSprites, self).__init__(pos, np.zeros(2), sprite=sprite, world=world, type="background", resize=size,
-                                                passable=True, vertical_movable=False, horizontal_movable=False)
+        super(BackgroundSprites, self).__init__(pos, np.zeros(2), sprite=sprite, world=world,
+                                                type=ObjectType.BACKGROUND, resize=size, passable=True,
+                                                vertical_movable=False, horizontal_movable=False)
 
 
 class Pipe(GameObject):
@@ -140,11 +142,13 @@ class Pipe(GameObject):
         sprite = pygame.transform.rotate(sprite, dir * 90)
         sprite = pygame.transform.scale(sprite, size)
 
-        super(Pipe, self).__init__(pos, np.zeros(2), sprite=sprite, world=world, type="dont change passive collide",
+        super(Pipe, self).__init__(pos, np.zeros(2), sprite=sprite, world=world, type=ObjectType.PIPE,
                                    resize=None, vertical_movable=False, horizontal_movable=False)
 
 
 class Coin(GameObject):
+    batch_physics = True
+
     def __init__(self, pos, world=None, autoset=True):
         """
         Initializes a Coin object.
@@ -157,11 +161,9 @@ class Coin(GameObject):
         self.input_parameters = (pos,)
         if autoset:
             pos = np.array([pos[0] - pos[0] % TILE_SIZE[0], pos[1] - pos[1] % TILE_SIZE[1]])
-        sprite = COINS[0]
-        super(Coin, self).__init__(pos, np.zeros(2), sprite=sprite, world=world, type="change passive collide",
+        sprite = get_sprite(COINS[0], size=TILE_SIZE)
+        super(Coin, self).__init__(pos, np.zeros(2), sprite=sprite, world=world, type=ObjectType.COIN,
                                     resize=TILE_SIZE, passable=True, vertical_movable=False, horizontal_movable=False)
-        self.time_since_sprite_change = 0
-        self.current_sprite_int = 0
 
     def special_reaction_collision(self, side, other):
         """
@@ -174,26 +176,19 @@ class Coin(GameObject):
         Returns:
             None
         """
-        if other.type == "player":
+        if other.type == ObjectType.PLAYER:
             other.coins += 1
             other.score += 100
-            self.world.remove_gameobject(self)
-            if SettingsMenu.SETTINGS["Sound"] == "on":
-                COIN_SOUND.play()
+            world = self.world
+            world.remove_gameobject(self)
+            world.play_sound(COIN_SOUND)
 
-    def update(self, time):
+    def current_image(self):
         """
-        Updates the state of the Coin object.
-
-        Args:
-            time (float): The time elapsed since the last update.
-
         Returns:
-            None
+            pygame.Surface: The current frame of the coin animation, all coins of a world show the same frame.
         """
-        super(Coin, self).update(time)
-        self.time_since_sprite_change += time
-        if self.time_since_sprite_change > TIME_SPRITE_CHANGE_COINS:
-            self.time_since_sprite_change = 0
-            self.current_sprite_int = (self.current_sprite_int + 1) % len(COINS)
-            self.set_sprite(COINS[self.current_sprite_int], TILE_SIZE)
+        if self.world is not None:
+            frame = self.world.animation_clock.frame(TIME_SPRITE_CHANGE_COINS, len(COINS))
+            self.image = get_sprite(COINS[frame], size=TILE_SIZE)
+        return self.image
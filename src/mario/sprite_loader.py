@@ -1,123 +1,281 @@
+import json
+import numpy as np
 import pygame
 from .constants import *
 import os
-
-pygame.init()
+import weakref
+from .assets import ASSET_LOCK, LazyDict
 
 # This file is a bit different from all the rest: it is soly created to extract sprite images from the different
 # sprite sheets used.
 
+# the sprite sheets the sprites are cut from, they are only loaded when they are needed (see get_sheet)
+SHEET_FILES = {
+    "all": "all.png",
+    "tiles": "tiles transparent.png",
+    "mario": "Mario-2.png",
+    "specials": "specials.png",
+    "koopa blue": "koopablue.gif",
+    "koopa green": "koopagreen.gif",
+    "koopa red": "koopared.gif",
+    "flagpole": "flagpole.png",
+    "background": "background.png",
+    "background snow": "background_snow.png",
+    "background castle": "background_castle.png"
+}
+SHEETS = dict()
+
+# The sprite manifest is written by build_sprite_atlas.py. It contains the rects of the animation frames that are
+# found by scanning the sheets (see find_frames) and an atlas with all sprites, such that the big sheets don't need to
+# be loaded or scanned when the game starts.
+SPRITE_MANIFEST_FILE = os.path.join(SPRITE_PATH, "manifest.json")
+SPRITE_MANIFEST_VERSION = 1
+# every sprite that is cut from a sheet: maps the key of the sprite (see sprite_key) to (sheet name, rect)
+CUT_SPRITES = dict()
+
+
+def get_sheet(name):
+    """
+    Returns:
+        pygame.Surface: The sprite sheet with the given name, it is loaded the first time.
+    """
+    with ASSET_LOCK:
+        sheet = SHEETS.get(name)
+        if sheet is None:
+            sheet = pygame.image.load(os.path.join(SPRITE_PATH, SHEET_FILES[name]))
+            SHEETS[name] = sheet
+        return sheet
+
+
+def sheet_sizes():
+    """
+    Returns:
+        dict: The size in bytes of the file of every sprite sheet, this is used to detect an outdated manifest.
+    """
+    return {name: os.path.getsize(os.path.join(SPRITE_PATH, file)) for name, file in SHEET_FILES.items()}
+
+
+def load_sprite_manifest():
+    """
+    Reads the sprite manifest and its atlas.
+
+    Returns:
+        tuple: The manifest (dict) and the atlas (pygame.Surface), or (None, None) if there is no manifest or it
+            doesn't belong to the current sprite sheets.
+    """
+    if not os.path.exists(SPRITE_MANIFEST_FILE):
+        return None, None
+    with open(SPRITE_MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SPRITE_MANIFEST_VERSION or manifest.get("sheets") != sheet_sizes():
+        return None, None
+    return manifest, pygame.image.load(os.path.join(SPRITE_PATH, manifest["atlas"]))
+
+
+SPRITE_MANIFEST, SPRITE_ATLAS = load_sprite_manifest()
+
+
+def sprite_key(sheet, rect=None):
+    """
+    Returns:
+        str: The key of the sprite with the given rect (the entire sheet if None) in the sprite manifest.
+    """
+    if rect is None:
+        return sheet
+    return sheet + " " + " ".join(str(value) for value in rect)
+
+
+def cut(sheet, rect=None):
+    """
+    Cuts a sprite from a sprite sheet. The sprite is taken from the atlas if there is a sprite manifest.
+
+    Args:
+        sheet (str): The name of the sprite sheet.
+        rect (tuple, optional): The rect of the sprite in the sheet. Defaults to None, which is the entire sheet.
+
+    Returns:
+        pygame.Surface: The sprite, a subsurface of the atlas or the sheet.
+    """
+    key = sprite_key(sheet, rect)
+    CUT_SPRITES[key] = (sheet, rect)
+    if SPRITE_MANIFEST is not None and key in SPRITE_MANIFEST["sprites"]:
+        return SPRITE_ATLAS.subsurface(SPRITE_MANIFEST["sprites"][key])
+    if rect is None:
+        return get_sheet(sheet)
+    return get_sheet(sheet).subsurface(rect)
+
+
+def find_frames(sheet, columns, rows, height):
+    """
+    Finds the frames of an animation that are next to each other in a sprite sheet, separated by columns that are
+    (almost) black.
+
+    Args:
+        sheet (str): The name of the sprite sheet.
+        columns (tuple): The range of columns (begin, end) in which the frames are searched.
+        rows (tuple): The range of rows (begin, end) that must be black in a column between two frames.
+        height (int): The height of the frames, they start at the first row.
+
+    Returns:
+        list: The rects of the frames in the sheet, from left to right.
+    """
+    area = get_sheet(sheet).subsurface((columns[0], rows[0], columns[1] - columns[0], rows[1] - rows[0]))
+    # a pixel is black if the sum of its color and alpha is at most 255
+    values = pygame.surfarray.array3d(area).sum(axis=2, dtype=np.int32) + pygame.surfarray.array_alpha(area)
+    not_black = (values > 255).any(axis=1).tolist()
+
+    frames = []
+    begin_image = None
+    for i, column_not_black in enumerate(not_black):
+        if not column_not_black and begin_image is not None:
+            frames.append((columns[0] + begin_image, rows[0], i - begin_image, height))
+            begin_image = None
+        elif column_not_black and begin_image is None:
+            begin_image = i
+    return frames
+
+
+# the animations that are found by scanning the sheets: name -> (sheet, columns, rows, height), see find_frames
+SCANNED_FRAMES = {
+    "mario running": ("mario", (0, 645), (51, 85), 34),
+    "mario flagpole": ("mario", (388, 668), (185, 220), 31)
+}
+
+
+def get_frames(name):
+    """
+    Returns the frames of an animation that is found by scanning a sheet, the rects are taken from the sprite manifest
+    if there is one.
+
+    Args:
+        name (str): The name of the animation in SCANNED_FRAMES.
+
+    Returns:
+        list: The frames.
+    """
+    sheet = SCANNED_FRAMES[name][0]
+    if SPRITE_MANIFEST is not None:
+        rects = SPRITE_MANIFEST["frames"][name]
+    else:
+        rects = find_frames(*SCANNED_FRAMES[name])
+    return [cut(sheet, tuple(rect)) for rect in rects]
+
+
 # LOADING BACKGROUNDS
-background_images1 = pygame.image.load(os.path.join(SPRITE_PATH, "background.png"))
 SIZE_BACKGROUND1 = (510, 492)
-background_images2 = pygame.image.load(os.path.join(SPRITE_PATH, "background_snow.png"))
-background_images3 = pygame.image.load(os.path.join(SPRITE_PATH, "background_castle.png"))
-
-BACKGROUNDS = {
-    "Grey1": background_images1.subsurface((3, 0, SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 6)),
-    "Sky1": background_images1.subsurface((9 + 2 * SIZE_BACKGROUND1[0], 0, SIZE_BACKGROUND1[0] - 7,
-                                           SIZE_BACKGROUND1[1] - 9)),
-    "Sky2": background_images1.subsurface((9 + 3 * SIZE_BACKGROUND1[0], 0, SIZE_BACKGROUND1[0] - 6,
-                                           SIZE_BACKGROUND1[1] - 9)),
-    "Grey2": background_images1.subsurface((3, SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 6)),
-    "Sky3": background_images1.subsurface((9 + 2 * SIZE_BACKGROUND1[0], SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 7,
-                                           SIZE_BACKGROUND1[1] - 9)),
-    "Sky4": background_images1.subsurface((9 + 3 * SIZE_BACKGROUND1[0], SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6,
-                                           SIZE_BACKGROUND1[1] - 9)),
-    "Snow1": background_images2.subsurface((2, 3, SIZE_BACKGROUND1[0] - 4, SIZE_BACKGROUND1[1] - 4)),
-    "Snow2": background_images2.subsurface((6 + SIZE_BACKGROUND1[0], 3, SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 4)),
-    "Snow3": background_images2.subsurface((6 + 2 * SIZE_BACKGROUND1[0], 3, SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 4)),
-    "Snow4": background_images2.subsurface((4, 4 + SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 4)),
-    "Snow5": background_images2.subsurface((6 + SIZE_BACKGROUND1[0], 4 + SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 4))
-}
+
+
+def background_loader(sheet, rect):
+    """
+    Returns:
+        callable: A function that cuts the background with the given rect from the given sheet.
+    """
+    return lambda: get_sheet(sheet).subsurface(rect)
+
+
+# the backgrounds are big, so they are only loaded when they are used
+BACKGROUNDS = LazyDict({
+    "Grey1": background_loader("background", (3, 0, SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 6)),
+    "Sky1": background_loader("background", (9 + 2 * SIZE_BACKGROUND1[0], 0, SIZE_BACKGROUND1[0] - 7,
+                                             SIZE_BACKGROUND1[1] - 9)),
+    "Sky2": background_loader("background", (9 + 3 * SIZE_BACKGROUND1[0], 0, SIZE_BACKGROUND1[0] - 6,
+                                             SIZE_BACKGROUND1[1] - 9)),
+    "Grey2": background_loader("background", (3, SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6,
+                                              SIZE_BACKGROUND1[1] - 6)),
+    "Sky3": background_loader("background", (9 + 2 * SIZE_BACKGROUND1[0], SIZE_BACKGROUND1[1],
+                                             SIZE_BACKGROUND1[0] - 7, SIZE_BACKGROUND1[1] - 9)),
+    "Sky4": background_loader("background", (9 + 3 * SIZE_BACKGROUND1[0], SIZE_BACKGROUND1[1],
+                                             SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 9)),
+    "Snow1": background_loader("background snow", (2, 3, SIZE_BACKGROUND1[0] - 4, SIZE_BACKGROUND1[1] - 4)),
+    "Snow2": background_loader("background snow", (6 + SIZE_BACKGROUND1[0], 3, SIZE_BACKGROUND1[0] - 6,
+                                                   SIZE_BACKGROUND1[1] - 4)),
+    "Snow3": background_loader("background snow", (6 + 2 * SIZE_BACKGROUND1[0], 3, SIZE_BACKGROUND1[0] - 6,
+                                                   SIZE_BACKGROUND1[1] - 4)),
+    "Snow4": background_loader("background snow", (4, 4 + SIZE_BACKGROUND1[1], SIZE_BACKGROUND1[0] - 6,
+                                                   SIZE_BACKGROUND1[1] - 4)),
+    "Snow5": background_loader("background snow", (6 + SIZE_BACKGROUND1[0], 4 + SIZE_BACKGROUND1[1],
+                                                   SIZE_BACKGROUND1[0] - 6, SIZE_BACKGROUND1[1] - 4))
+})
 
 for i in range(18):
     pos_ = ((i % 9) * SIZE_BACKGROUND1[0] + 10, (i // 9)* SIZE_BACKGROUND1[1] + 10)
-    BACKGROUNDS["Castle" + str(i)] = background_images3.subsurface(pos_ + (SIZE_BACKGROUND1[0] - 12, SIZE_BACKGROUND1[1] - 12))
-
-all = pygame.image.load(os.path.join(SPRITE_PATH, "all.png"))
-tiles = pygame.image.load(os.path.join(SPRITE_PATH, "tiles transparent.png"))
-mario = pygame.image.load(os.path.join(SPRITE_PATH, "Mario-2.png"))
-goomba = pygame.image.load(os.path.join(SPRITE_PATH, "goomba.png"))
-specials = pygame.image.load(os.path.join(SPRITE_PATH, "specials.png"))
-koopatroopa_blue = pygame.image.load(os.path.join(SPRITE_PATH, "koopablue.gif"))
-koopatroopa_green = pygame.image.load(os.path.join(SPRITE_PATH, "koopagreen.gif"))
-koopatroopa_red = pygame.image.load(os.path.join(SPRITE_PATH, "koopared.gif"))
+    BACKGROUNDS["Castle" + str(i)] = background_loader("background castle",
+                                                       pos_ + (SIZE_BACKGROUND1[0] - 12, SIZE_BACKGROUND1[1] - 12))
 
 TILES_SPECIAl = {
-    "yellow": tiles.subsurface((186, 23, 15, 15)),
-    "blue": tiles.subsurface((203, 23, 15, 15)),
-    "red": tiles.subsurface((220, 23, 15, 15))
+    "yellow": cut("tiles", (186, 23, 15, 15)),
+    "blue": cut("tiles", (203, 23, 15, 15)),
+    "red": cut("tiles", (220, 23, 15, 15))
 }
 
 TILES = {
-    "brown brick": tiles.subsurface((186, 40, 15, 15)),
-    "blue brick": tiles.subsurface((203, 40, 15, 15)),
-    "red brick": tiles.subsurface((220, 40, 15, 15)),
-    "brown solid": tiles.subsurface((186, 57, 15, 15)),
-    "blue solid": tiles.subsurface((203, 57, 15, 15)),
-    "grass 1": tiles.subsurface((17, 56, 15, 15)),
-    "grass 2": tiles.subsurface((34, 56, 15, 15)),
-    "grass 3": tiles.subsurface((51, 56, 15, 15)),
-    "grass 4": tiles.subsurface((68, 56, 15, 15)),
-    "subgrass 1": tiles.subsurface((17, 73, 15, 15)),
-    "red solid": tiles.subsurface((220, 57, 15, 15)),
-    "gold block": tiles.subsurface((169, 23, 15, 15)),
-    "ruby block": tiles.subsurface((169, 40, 15, 15)),
-    "white block": tiles.subsurface((169, 57, 15, 15)),
-    "green angry block": tiles.subsurface((169, 74, 15, 15)),
-    "ice normal": tiles.subsurface((217, 234, 15, 15)),
-    "ice corner 1": tiles.subsurface((201, 218, 15, 15)),
-    "ice corner 2": tiles.subsurface((252, 269, 15, 15)),
-    "ice corner 3": tiles.subsurface((253, 218, 15, 15)),
-    "ice corner 4": tiles.subsurface((201, 269, 15, 15)),
-    "ice side 1": tiles.subsurface((201, 234, 15, 15)),
-    "ice side 2": tiles.subsurface((217, 218, 15, 15)),
-    "ice side 3": tiles.subsurface((252, 234, 15, 15)),
-    "ice side 4": tiles.subsurface((217, 269, 15, 15)),
-    "sky grass 1": tiles.subsurface((322, 152, 15, 15)),
-    "sky grass 2": tiles.subsurface((339, 152, 15, 15)),
-    "sky grass 3": tiles.subsurface((356, 152, 15, 15)),
-    "sky grass 4": tiles.subsurface((373, 152, 15, 15)),
-    "sky ground 1": tiles.subsurface((322, 167, 15, 15)),
-    "sky ground 2": tiles.subsurface((339, 167, 15, 15)),
-    "sky ground 3": tiles.subsurface((356, 167, 15, 15)),
-    "sky ground 4": tiles.subsurface((373, 167, 15, 15)),
-    "snow 1": tiles.subsurface((191, 562, 15, 15)),
-    "snow 2": tiles.subsurface((208, 562, 15, 15)),
-    "snow 3": tiles.subsurface((225, 562, 15, 15)),
-    "snow 4": tiles.subsurface((242, 562, 15, 15)),
-    "snow ground": tiles.subsurface((191, 579, 15, 15)),
-    "purple 1": tiles.subsurface((161, 305, 15, 15)),
-    "purple 2": tiles.subsurface((178, 305, 15, 15)),
-    "purple 3": tiles.subsurface((178, 322, 15, 15)),
-    "brown 1": tiles.subsurface((298, 305, 15, 15)),
-    "brown 2": tiles.subsurface((315, 305, 15, 15)),
-    "brown 3": tiles.subsurface((315, 322, 15, 15)),
-    "mud 1": tiles.subsurface((100, 470, 15, 15)),
-    "mud 2": tiles.subsurface((100, 487, 15, 15))
+    "brown brick": cut("tiles", (186, 40, 15, 15)),
+    "blue brick": cut("tiles", (203, 40, 15, 15)),
+    "red brick": cut("tiles", (220, 40, 15, 15)),
+    "brown solid": cut("tiles", (186, 57, 15, 15)),
+    "blue solid": cut("tiles", (203, 57, 15, 15)),
+    "grass 1": cut("tiles", (17, 56, 15, 15)),
+    "grass 2": cut("tiles", (34, 56, 15, 15)),
+    "grass 3": cut("tiles", (51, 56, 15, 15)),
+    "grass 4": cut("tiles", (68, 56, 15, 15)),
+    "subgrass 1": cut("tiles", (17, 73, 15, 15)),
+    "red solid": cut("tiles", (220, 57, 15, 15)),
+    "gold block": cut("tiles", (169, 23, 15, 15)),
+    "ruby block": cut("tiles", (169, 40, 15, 15)),
+    "white block": cut("tiles", (169, 57, 15, 15)),
+    "green angry block": cut("tiles", (169, 74, 15, 15)),
+    "ice normal": cut("tiles", (217, 234, 15, 15)),
+    "ice corner 1": cut("tiles", (201, 218, 15, 15)),
+    "ice corner 2": cut("tiles", (252, 269, 15, 15)),
+    "ice corner 3": cut("tiles", (253, 218, 15, 15)),
+    "ice corner 4": cut("tiles", (201, 269, 15, 15)),
+    "ice side 1": cut("tiles", (201, 234, 15, 15)),
+    "ice side 2": cut("tiles", (217, 218, 15, 15)),
+    "ice side 3": cut("tiles", (252, 234, 15, 15)),
+    "ice side 4": cut("tiles", (217, 269, 15, 15)),
+    "sky grass 1": cut("tiles", (322, 152, 15, 15)),
+    "sky grass 2": cut("tiles", (339, 152, 15, 15)),
+    "sky grass 3": cut("tiles", (356, 152, 15, 15)),
+    "sky grass 4": cut("tiles", (373, 152, 15, 15)),
+    "sky ground 1": cut("tiles", (322, 167, 15, 15)),
+    "sky ground 2": cut("tiles", (339, 167, 15, 15)),
+    "sky ground 3": cut("tiles", (356, 167, 15, 15)),
+    "sky ground 4": cut("tiles", (373, 167, 15, 15)),
+    "snow 1": cut("tiles", (191, 562, 15, 15)),
+    "snow 2": cut("tiles", (208, 562, 15, 15)),
+    "snow 3": cut("tiles", (225, 562, 15, 15)),
+    "snow 4": cut("tiles", (242, 562, 15, 15)),
+    "snow ground": cut("tiles", (191, 579, 15, 15)),
+    "purple 1": cut("tiles", (161, 305, 15, 15)),
+    "purple 2": cut("tiles", (178, 305, 15, 15)),
+    "purple 3": cut("tiles", (178, 322, 15, 15)),
+    "brown 1": cut("tiles", (298, 305, 15, 15)),
+    "brown 2": cut("tiles", (315, 305, 15, 15)),
+    "brown 3": cut("tiles", (315, 322, 15, 15)),
+    "mud 1": cut("tiles", (100, 470, 15, 15)),
+    "mud 2": cut("tiles", (100, 487, 15, 15))
 }
 
-PIPE = all.subsurface((67, 76, 200, 33))
+PIPE = cut("all", (67, 76, 200, 33))
 
 GOOMBA = [
-    all.subsurface((297 + 19 * i, 122, 19, 20)) for i in range(4)
+    cut("all", (297 + 19 * i, 122, 19, 20)) for i in range(4)
 ]
 
 for i in range(5, 9):
-    GOOMBA.append(all.subsurface((298 + 19 * i, 122, 19, 20)))
+    GOOMBA.append(cut("all", (298 + 19 * i, 122, 19, 20)))
 
-GOOMBA_DEATH = all.subsurface((297, 153, 25, 10))
+GOOMBA_DEATH = cut("all", (297, 153, 25, 10))
 
 KOOPA = {
     "blue": [
-        koopatroopa_blue.subsurface((0, 2 + 32 * i, 16, 31)) for i in range(16)
+        cut("koopa blue", (0, 2 + 32 * i, 16, 31)) for i in range(16)
     ],
     "green": [
-        koopatroopa_green.subsurface((0, 2 + 32 * i, 16, 31)) for i in range(16)
+        cut("koopa green", (0, 2 + 32 * i, 16, 31)) for i in range(16)
     ],
     "red": [
-        koopatroopa_red.subsurface((0, 2 + 32 * i, 16, 31)) for i in range(16)
+        cut("koopa red", (0, 2 + 32 * i, 16, 31)) for i in range(16)
     ]
 }
 
@@ -135,76 +293,200 @@ FLYING_KOOPA = {
 
 KOOPA_TURTLE = {
     "blue": [
-        koopatroopa_blue.subsurface((0, 513 + 16 * i, 16, 16)) for i in range(3)
+        cut("koopa blue", (0, 513 + 16 * i, 16, 16)) for i in range(3)
     ],
     "green": [
-        koopatroopa_green.subsurface((0, 513 + 16 * i, 16, 16)) for i in range(3)
+        cut("koopa green", (0, 513 + 16 * i, 16, 16)) for i in range(3)
     ],
     "red": [
-        koopatroopa_red.subsurface((0, 513 + 16 * i, 16, 16)) for i in range(3)
+        cut("koopa red", (0, 513 + 16 * i, 16, 16)) for i in range(3)
     ]
 }
 
-MARIO_STILL = mario.subsurface((697, 10, 15, 32))
-MARIO_DUCK = mario.subsurface((551, 106, 18, 18))
-MARIO_RUNNING = []
-
-begin_image = None
-for i in range(0, 645):
-    all_black = True
-    for j in range(51, 85):
-        if sum(mario.get_at((i, j))) > 255:
-            all_black = False
-            break
-    if all_black and begin_image is not None:
-        MARIO_RUNNING.append(mario.subsurface((begin_image, 51, i - begin_image, 34)))
-        begin_image = None
-    elif not all_black and begin_image is None:
-        begin_image = i
-
-MARIO_FLAGPOLE = []
-
-begin_image = None
-for i in range(388, 668):
-    all_black = True
-    for j in range(185, 220):
-        if sum(mario.get_at((i, j))) > 255:
-            all_black = False
-            break
-    if all_black and begin_image is not None:
-        MARIO_FLAGPOLE.append(mario.subsurface((begin_image, 185, i - begin_image, 31)))
-        begin_image = None
-    elif not all_black and begin_image is None:
-        begin_image = i
-
-FLAGPOLE = pygame.image.load(os.path.join(SPRITE_PATH, "flagpole.png"))
+MARIO_STILL = cut("mario", (697, 10, 15, 32))
+MARIO_DUCK = cut("mario", (551, 106, 18, 18))
+MARIO_RUNNING = get_frames("mario running")
+MARIO_FLAGPOLE = get_frames("mario flagpole")
+
+FLAGPOLE = cut("flagpole")
 
 SPECIALS = {
-    "red mushroom": specials.subsurface((1, 1, 38, 38)),
-    "blue mushroom": specials.subsurface((40, 1, 38, 38)),
-    "flower": specials.subsurface((1, 40, 38, 38)),
-    "star": specials.subsurface((40, 40, 38, 38))
+    "red mushroom": cut("specials", (1, 1, 38, 38)),
+    "blue mushroom": cut("specials", (40, 1, 38, 38)),
+    "flower": cut("specials", (1, 40, 38, 38)),
+    "star": cut("specials", (40, 40, 38, 38))
 }
 
 COINS = [
-    tiles.subsurface((291, 1291, 15, 16)),
-    tiles.subsurface((308, 1291, 15, 16)),
-    tiles.subsurface((325, 1291, 15, 16))
+    cut("tiles", (291, 1291, 15, 16)),
+    cut("tiles", (308, 1291, 15, 16)),
+    cut("tiles", (325, 1291, 15, 16))
 ]
 
 BACKGROUND_SPRITES = {
-    "big bush": tiles.subsurface((3, 98, 90, 45)),
-    "small bush 1": tiles.subsurface((2, 20, 35, 30)),
-    "small bush 2": tiles.subsurface((96, 113, 35, 25)),
-    "flower 1": tiles.subsurface((40, 20, 27, 30)),
-    "flower 2": tiles.subsurface((70, 22, 30, 30)),
-    "flower 3": tiles.subsurface((104, 38, 30, 22)),
-    "mushroom": tiles.subsurface((101, 22, 36, 12)),
-    "fence": tiles.subsurface((101, 60, 35, 20)),
-    "castle": mario.subsurface((310, 465, 100, 100)),
-    "cloud": pygame.transform.rotate(tiles.subsurface((278, 254, 82, 32)), 180)
+    "big bush": cut("tiles", (3, 98, 90, 45)),
+    "small bush 1": cut("tiles", (2, 20, 35, 30)),
+    "small bush 2": cut("tiles", (96, 113, 35, 25)),
+    "flower 1": cut("tiles", (40, 20, 27, 30)),
+    "flower 2": cut("tiles", (70, 22, 30, 30)),
+    "flower 3": cut("tiles", (104, 38, 30, 22)),
+    "mushroom": cut("tiles", (101, 22, 36, 12)),
+    "fence": cut("tiles", (101, 60, 35, 20)),
+    "castle": cut("mario", (310, 465, 100, 100)),
+    "cloud": pygame.transform.rotate(cut("tiles", (278, 254, 82, 32)), 180)
 }
 
+# A cache with the flipped and scaled versions of the animated sprites, such that animations are a dictionary lookup
+# and don't create new surfaces every frame. It maps (sprite, flip, size) to the transformed sprite.
+SPRITE_CACHE = dict()
+
+
+def get_sprite(sprite, flip=False, size=None):
+    """
+    Returns the given sprite, flipped horizontally and scaled to the given size. The result is cached, so this
+    only creates a new surface the first time it is called for a combination of arguments.
+
+    Args:
+        sprite (pygame.Surface): The original sprite.
+        flip (bool, optional): Whether to flip the sprite horizontally. Defaults to False.
+        size (tuple, optional): The size of the returned sprite, None keeps the original size. Defaults to None.
+
+    Returns:
+        pygame.Surface: The transformed sprite.
+    """
+    key = (sprite, flip, size)
+    cached_sprite = SPRITE_CACHE.get(key)
+    if cached_sprite is None:
+        cached_sprite = sprite
+        if flip:
+            cached_sprite = pygame.transform.flip(cached_sprite, True, False)
+        if size is not None and tuple(size) != cached_sprite.get_size():
+            cached_sprite = pygame.transform.scale(cached_sprite, size)
+        if pygame.display.get_surface() is not None:
+            # converting is only possible once the screen is created
+            cached_sprite = cached_sprite.convert_alpha()
+        SPRITE_CACHE[key] = cached_sprite
+    return cached_sprite
+
+
+# The collision masks of sprites, such that a pixel-perfect collision test doesn't create new masks. The sprites are
+# weak keys, so a mask is thrown away together with its sprite.
+MASK_CACHE = weakref.WeakKeyDictionary()
+
+
+def get_mask(sprite):
+    """
+    Returns the collision mask of the given sprite, the mask is only created the first time.
+
+    Args:
+        sprite (pygame.Surface): The sprite.
+
+    Returns:
+        pygame.mask.Mask: The mask of the sprite.
+    """
+    mask = MASK_CACHE.get(sprite)
+    if mask is None:
+        mask = pygame.mask.from_surface(sprite)
+        MASK_CACHE[sprite] = mask
+    return mask
+
+
+def mario_sprite_size(sprite, lives):
+    """
+    Returns the size of the given Mario sprite, which depends on the lives of Mario.
+
+    Args:
+        sprite (pygame.Surface): The original Mario sprite.
+        lives (int): The lives of Mario.
+
+    Returns:
+        tuple: The size of the sprite.
+    """
+    factor = MARIO_SCALE_SMALL if lives <= 1 else MARIO_SCALE_BIG
+    size = sprite.get_size()
+    return int(round(1 / factor * size[0])), int(round(1 / factor * size[1]))
+
+
+def load_sprite_cache():
+    """
+    Fills the sprite cache with all variants of the animated sprites and their collision masks. This is done when
+    loading the sprites and should be done again once the screen is created, such that all cached sprites are
+    converted for fast blitting.
+    """
+    SPRITE_CACHE.clear()
+    for sprite in MARIO_RUNNING + MARIO_FLAGPOLE + [MARIO_STILL, MARIO_DUCK]:
+        for lives in [1, 2]:
+            size = mario_sprite_size(sprite, lives)
+            get_sprite(sprite, False, size)
+            get_sprite(sprite, True, size)
+
+    enemy_sprites = GOOMBA + [GOOMBA_DEATH]
+    for color in KOOPA:
+        enemy_sprites += KOOPA[color] + KOOPA_TURTLE[color]
+    for sprite in enemy_sprites:
+        get_sprite(sprite, False)
+        get_sprite(sprite, True)
+
+    for sprite in COINS:
+        get_sprite(sprite, size=TILE_SIZE)
+
+    for sprite in SPRITE_CACHE.values():
+        get_mask(sprite)
+
+
+load_sprite_cache()
+
+
+def build_sprite_atlas(atlas_file="atlas.png", width=1024):
+    """
+    Writes the sprite manifest and its atlas: all sprites that are cut from the sheets are packed in rows (tallest
+    first) in one image, and the animation frames in SCANNED_FRAMES are found by scanning the sheets. This must be done
+    again when a sheet or a sprite rect changes, until then the game falls back to the sheets.
+
+    The screen must be created before calling this, the sprites are converted to per pixel alpha to copy them.
+
+    Args:
+        atlas_file (str, optional): The file name of the atlas in SPRITE_PATH. Defaults to "atlas.png".
+        width (int, optional): The width of the atlas. Defaults to 1024.
+    """
+    frames = {name: find_frames(*scan) for name, scan in SCANNED_FRAMES.items()}
+    for name, rects in frames.items():
+        for rect in rects:
+            CUT_SPRITES[sprite_key(SCANNED_FRAMES[name][0], rect)] = (SCANNED_FRAMES[name][0], rect)
+
+    sprites = dict()
+    for key, (sheet, rect) in CUT_SPRITES.items():
+        sprites[key] = get_sheet(sheet) if rect is None else get_sheet(sheet).subsurface(rect)
+
+    # shelf packing, there is one pixel between the sprites
+    rects = dict()
+    x, y, row_height = 0, 0, 0
+    for key in sorted(sprites, key=lambda key: -sprites[key].get_height()):
+        sprite_width, sprite_height = sprites[key].get_size()
+        if x + sprite_width > width:
+            x, y, row_height = 0, y + row_height + 1, 0
+        rects[key] = [x, y, sprite_width, sprite_height]
+        x += sprite_width + 1
+        row_height = max(row_height, sprite_height)
+
+    atlas = pygame.Surface((width, y + row_height), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for key, sprite in sprites.items():
+        # the atlas is transparent, so this copies the pixels (with a color key converted to alpha) exactly
+        atlas.blit(sprite.convert_alpha(), rects[key][:2], special_flags=pygame.BLEND_RGBA_MAX)
+    pygame.image.save(atlas, os.path.join(SPRITE_PATH, atlas_file))
+
+    manifest = {
+        "version": SPRITE_MANIFEST_VERSION,
+        "sheets": sheet_sizes(),
+        "atlas": atlas_file,
+        "frames": frames,
+        "sprites": rects
+    }
+    with open(SPRITE_MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
 if __name__ == "__main__":
     screen = pygame.display.set_mode((1200, 800))
 
@@ -0,0 +1,146 @@
+import numpy as np
+from collections import OrderedDict
+from .constants import *
+import pygame
+
+
+class StaticLayer:
+    """
+    Everything of a world that doesn't change during the game (the background, tiles and background objects) is
+    blitted on surfaces once, such that rendering a frame only needs a few blits. The world is split into vertical
+    chunks of a fixed width which are only rendered when the camera comes close to them. The least recently used
+    chunks are thrown away when the chunks take more memory than the budget, so the memory use does not depend on
+    the width of the world.
+    """
+    def __init__(self, world, chunk_width=STATIC_CHUNK_WIDTH, memory_budget=STATIC_LAYER_MEMORY_BUDGET):
+        """
+        Initializes a StaticLayer object.
+
+        Args:
+            world (World): The world of which the static layer is rendered.
+            chunk_width (int, optional): The width of one chunk in pixels. Defaults to STATIC_CHUNK_WIDTH.
+            memory_budget (int, optional): The maximum number of bytes used by the chunks, the chunks that are
+                needed for the current screen are always kept. Defaults to STATIC_LAYER_MEMORY_BUDGET.
+        """
+        self.world = world
+        self.chunk_width = chunk_width
+        self.memory_budget = memory_budget
+        # maps the index of a chunk to its surface, the least recently used chunk comes first
+        self.chunks = OrderedDict()
+
+    def chunk_size(self, index):
+        """
+        Returns:
+            tuple: The size of the chunk with the given index, the last chunk can be smaller than the others.
+        """
+        return min(self.chunk_width, self.world.size[0] - index * self.chunk_width), self.world.size[1]
+
+    def memory_usage(self):
+        """
+        Returns:
+            int: The number of bytes used by the rendered chunks.
+        """
+        return sum(chunk.get_bytesize() * chunk.get_width() * chunk.get_height() for chunk in self.chunks.values())
+
+    def visible_chunks(self, camera_pos, size=SCREEN_SIZE):
+        """
+        Returns the indices of the chunks that are (partly) visible with the given camera position.
+
+        Args:
+            camera_pos (numpy.ndarray): The position of the camera.
+            size (tuple, optional): The size of the screen. Defaults to SCREEN_SIZE.
+
+        Returns:
+            range: The indices of the visible chunks.
+        """
+        n_chunks = (self.world.size[0] - 1) // self.chunk_width + 1
+        begin = max(0, int(camera_pos[0]) // self.chunk_width)
+        end = min(n_chunks, int(camera_pos[0] + size[0]) // self.chunk_width + 1)
+        return range(begin, end)
+
+    def render_chunk(self, index):
+        """
+        Renders the chunk with the given index on a new surface.
+
+        Args:
+            index (int): The index of the chunk.
+
+        Returns:
+            pygame.Surface: The rendered chunk.
+        """
+        size = self.chunk_size(index)
+        chunk = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+        self.world.render_tiles_and_basic(chunk, size, camera_pos=np.array([index * self.chunk_width, 0]))
+        return chunk
+
+    def get_chunk(self, index, keep=()):
+        """
+        Returns the chunk with the given index, rendering it if it is not yet rendered. Old chunks are thrown away if
+        the memory budget is exceeded.
+
+        Args:
+            index (int): The index of the chunk.
+            keep (iterable, optional): Indices of chunks that may not be thrown away. Defaults to ().
+
+        Returns:
+            pygame.Surface: The chunk.
+        """
+        chunk = self.chunks.get(index)
+        if chunk is not None:
+            self.chunks.move_to_end(index)
+            return chunk
+
+        chunk = self.render_chunk(index)
+        self.chunks[index] = chunk
+        for old_index in list(self.chunks):
+            if self.memory_usage() <= self.memory_budget:
+                break
+            if old_index != index and old_index not in keep:
+                del self.chunks[old_index]
+        return chunk
+
+    def prepare(self, camera_pos, size=SCREEN_SIZE):
+        """
+        Renders the chunks that are visible with the given camera position, without blitting them.
+
+        Args:
+            camera_pos (numpy.ndarray): The position of the camera.
+            size (tuple, optional): The size of the screen. Defaults to SCREEN_SIZE.
+        """
+        visible_chunks = self.visible_chunks(camera_pos, size)
+        for index in visible_chunks:
+            self.get_chunk(index, keep=visible_chunks)
+
+    def render(self, screen, camera_pos, size=SCREEN_SIZE):
+        """
+        Blits the visible part of the static layer on the screen.
+
+        Args:
+            screen (pygame.Surface): The surface to render on.
+            camera_pos (numpy.ndarray): The position of the camera.
+            size (tuple, optional): The size of the screen. Defaults to SCREEN_SIZE.
+        """
+        camera_pos = np.round(camera_pos).astype(np.int32)
+        visible_chunks = self.visible_chunks(camera_pos, size)
+        for index in visible_chunks:
+            chunk = self.get_chunk(index, keep=visible_chunks)
+            screen.blit(chunk, (index * self.chunk_width - camera_pos[0], - camera_pos[1]))
+
+    def redraw(self, pos, size):
+        """
+        Renders the given part of the world again in the chunks that are already rendered, this is used when a tile or
+        background object is added or removed.
+
+        Args:
+            pos (tuple): The position of the part of the world that changed.
+            size (tuple): The size of the part of the world that changed.
+        """
+        for index, chunk in self.chunks.items():
+            chunk_pos = np.array([index * self.chunk_width, 0])
+            rect = pygame.Rect(int(pos[0]) - chunk_pos[0], int(pos[1]), int(np.ceil(size[0])), int(np.ceil(size[1])))
+            if rect.colliderect(chunk.get_rect()):
+                chunk.set_clip(rect)
+                self.world.render_tiles_and_basic(chunk, chunk.get_size(), camera_pos=chunk_pos)
+                chunk.set_clip(None)
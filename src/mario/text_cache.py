@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from .constants import *
+
+
+class TextCache:
+    """
+    Keeps the surfaces of rendered texts, such that a text that is shown every frame (like the hud or the text of a
+    button) is only rendered once by the font. The least recently used texts are removed when the cache is full.
+
+    The surfaces are shared by everyone that renders the same text, so they must not be changed.
+    """
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        """
+        Initializes a TextCache object.
+
+        Args:
+            max_size (int, optional): The maximum number of texts that are kept. Defaults to TEXT_CACHE_SIZE.
+        """
+        self.max_size = max_size
+        # maps (font, text, color, background) to the rendered surface, the most recently used text comes last
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, font, text, color, background=None):
+        """
+        Renders an antialiased text, or returns it from the cache if it was already rendered.
+
+        Args:
+            font (pygame.font.Font): The font.
+            text (str): The text.
+            color (tuple): The color of the text, a tuple or pygame.Color.
+            background (tuple, optional): The color of the background, None for a transparent background. Defaults to
+                None.
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        # pygame.Color can't be used in a dict key
+        key = (font, text, tuple(color), None if background is None else tuple(background))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        if background is None:
+            surface = font.render(text, True, color)
+        else:
+            surface = font.render(text, True, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """
+        Removes all texts from the cache.
+        """
+        self.surfaces.clear()
+
+
+# the cache that is used by the whole game
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color, background=None):
+    """
+    Renders a text with the text cache of the game, see TextCache.render.
+    """
+    return TEXT_CACHE.render(font, text, color, background)
@@ -0,0 +1,261 @@
+import numpy as np
+from .constants import *
+from .sprite_loader import TILES, get_sprite
+from .tiles import NormalTile
+from .collision_mesh import CollisionMesh
+
+
+class TileGrid:
+    """
+    Keeps track of the tiles of a world in a grid with one byte per tile position: 0 means that there is no tile,
+    otherwise it is the id of the sprite name of the tile (see tile_names). The grid can be a memory map of a level
+    file, such that huge levels can be opened without reading the entire file.
+
+    Tile objects are only created when they are needed, and are kept in a side table. Tiles that are not a
+    NormalTile are always kept in the side table and have the id CUSTOM_TILE_ID in the grid. Collisions with normal
+    tiles use the rectangles of the collision mesh instead of tile objects, see collision_rect.
+    """
+    CUSTOM_TILE_ID = 255
+
+    def __init__(self, shape, world=None, ids=None, tile_names=()):
+        """
+        Initializes a TileGrid object.
+
+        Args:
+            shape (tuple): The number of tile positions horizontally and vertically.
+            world (World, optional): The world the tiles belong to. Defaults to None.
+            ids (numpy.ndarray, optional): An existing grid of ids of the given shape, this array is used (and changed)
+                by the TileGrid, it is not copied. Defaults to None, which creates an empty grid.
+            tile_names (list, optional): The sprite names belonging to the ids in the given grid, the id of a name is
+                its index plus one. Defaults to ().
+        """
+        self.world = world
+        if ids is None:
+            ids = np.zeros(shape, dtype=np.uint8)
+        self.ids = ids
+        # tile_names[id] is the sprite name of the tiles with the given id
+        self.tile_names = [None] + list(tile_names)
+        self.name_ids = {name: tile_id for tile_id, name in enumerate(self.tile_names) if name is not None}
+        # maps (i, j) to the tile object at that position, only for tiles that were already created
+        self.tiles = dict()
+        # the runs of normal tiles, it is built the first time it is needed and updated when tiles change
+        self.mesh = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.ids))
+
+    @property
+    def shape(self):
+        return self.ids.shape
+
+    def cell(self, pos):
+        """
+        Returns:
+            tuple: The indices (i, j) of the tile position containing the given position.
+        """
+        return int(pos[0] // TILE_SIZE[0]), int(pos[1] // TILE_SIZE[1])
+
+    def in_grid(self, i, j):
+        """
+        Returns:
+            bool: Whether (i, j) is a valid tile position.
+        """
+        return 0 <= i < self.ids.shape[0] and 0 <= j < self.ids.shape[1]
+
+    def tile_id(self, tile):
+        """
+        Returns the id of the given tile, a new id is created if its sprite name is not yet in the grid.
+
+        Args:
+            tile (Tile): The tile.
+
+        Raises:
+            ValueError: If there are too many different tiles in the grid.
+
+        Returns:
+            int: The id of the tile.
+        """
+        if type(tile) is not NormalTile:
+            return self.CUSTOM_TILE_ID
+        sprite_name = tile.input_parameters[1]
+        tile_id = self.name_ids.get(sprite_name)
+        if tile_id is None:
+            tile_id = len(self.tile_names)
+            if tile_id >= self.CUSTOM_TILE_ID:
+                raise ValueError("A world can't contain more than " + str(self.CUSTOM_TILE_ID - 1) + " kinds of tiles.")
+            self.tile_names.append(sprite_name)
+            self.name_ids[sprite_name] = tile_id
+        return tile_id
+
+    def add(self, tile):
+        """
+        Puts the given tile in the grid, a tile that was at the same position is replaced.
+
+        Args:
+            tile (Tile): The tile to be added.
+        """
+        i, j = self.cell(tile.pos)
+        self.ids[i, j] = self.tile_id(tile)
+        self.tiles[(i, j)] = tile
+        if self.mesh is not None:
+            self.mesh.update(i, j)
+
+    def remove(self, tile):
+        """
+        Removes the given tile from the grid.
+
+        Args:
+            tile (Tile): The tile to be removed.
+        """
+        i, j = self.cell(tile.pos)
+        self.ids[i, j] = 0
+        self.tiles.pop((i, j), None)
+        if self.mesh is not None:
+            self.mesh.update(i, j)
+
+    def restore_ids(self, ids):
+        """
+        Gives the grid the given ids again, e.g. from a snapshot of the world.
+
+        Args:
+            ids (numpy.ndarray): The ids, an array of the shape of the grid. It is copied.
+
+        Returns:
+            list: The (i, j) indices of the tile positions that changed.
+        """
+        changed_cells = np.argwhere(self.ids != ids).tolist()
+        self.ids[...] = ids
+        if self.mesh is not None:
+            for i, j in changed_cells:
+                self.mesh.update(i, j)
+        return changed_cells
+
+    def get(self, i, j):
+        """
+        Returns the tile at the given tile position, the tile object is created if this didn't happen yet.
+
+        Args:
+            i (int): The horizontal index of the tile position.
+            j (int): The vertical index of the tile position.
+
+        Returns:
+            Tile: The tile, or None if there is no tile at the given position.
+        """
+        tile = self.tiles.get((i, j))
+        if tile is not None:
+            return tile
+        if not self.in_grid(i, j) or self.ids[i, j] == 0:
+            return None
+        tile = NormalTile((i * TILE_SIZE[0], j * TILE_SIZE[1]), self.tile_names[self.ids[i, j]])
+        tile.world = self.world
+        self.tiles[(i, j)] = tile
+        return tile
+
+    def cells(self, pos, size):
+        """
+        Returns:
+            tuple: The range (i_begin, i_end, j_begin, j_end) of the tile positions that overlap with the rectangle
+                with the given position and size, see occupied.
+        """
+        i_begin, j_begin = self.cell(pos)
+        i_end = (int(np.ceil(pos[0] + size[0])) - 1) // TILE_SIZE[0] + 1
+        j_end = (int(np.ceil(pos[1] + size[1])) - 1) // TILE_SIZE[1] + 1
+        return i_begin, i_end, j_begin, j_end
+
+    def collision_rects(self, pos, size, axis):
+        """
+        Returns:
+            list: The different collision rects (see collision_rect) of the tiles that overlap with the rectangle with
+                the given position and size, in the order of the tiles.
+        """
+        rects = []
+        for i, j in self.occupied(*self.cells(pos, size)):
+            rect = self.collision_rect(i, j, axis)
+            # a run covers several tile positions
+            if rect not in rects:
+                rects.append(rect)
+        return rects
+
+    def collision_rect(self, i, j, axis):
+        """
+        Returns what a collision with the tile at the given tile position is resolved against: for a normal tile the
+        run of tiles along the given axis that contains it (see CollisionMesh), for other tiles the tile itself.
+
+        Args:
+            i (int): The horizontal index of the tile position.
+            j (int): The vertical index of the tile position.
+            axis (int): 0 for a horizontal run (used in vertical collisions), 1 for a vertical run.
+
+        Returns:
+            SolidRect or Tile: The rectangle or tile, None if there is no tile at the given position.
+        """
+        if self.ids[i, j] == self.CUSTOM_TILE_ID:
+            return self.get(i, j)
+        if self.mesh is None:
+            self.mesh = CollisionMesh(self)
+        return self.mesh.rect_at(i, j, axis)
+
+    def tile_at(self, pos):
+        """
+        Returns:
+            Tile: The tile containing the given position, or None if there is no tile there.
+        """
+        return self.get(*self.cell(pos))
+
+    def occupied(self, i_begin, i_end, j_begin, j_end):
+        """
+        Returns the tile positions in the given range that contain a tile, column by column. The range is clipped to
+        the grid.
+
+        Args:
+            i_begin (int): The first horizontal index.
+            i_end (int): The horizontal index after the last one.
+            j_begin (int): The first vertical index.
+            j_end (int): The vertical index after the last one.
+
+        Returns:
+            list: The (i, j) indices of the tile positions with a tile.
+        """
+        i_begin, j_begin = max(0, i_begin), max(0, j_begin)
+        window = self.ids[i_begin:i_end, j_begin:j_end]
+        if window.size <= 64:
+            # for small ranges (like in collision checks) this is faster than numpy
+            return [(i_begin + i, j_begin + j) for i, column in enumerate(window.tolist())
+                    for j, tile_id in enumerate(column) if tile_id != 0]
+        return [(i_begin + i, j_begin + j) for i, j in np.argwhere(window).tolist()]
+
+    def all_tiles(self):
+        """
+        Returns:
+            list: All tiles in the grid, column by column. This creates all tile objects, so it is slow for big worlds.
+        """
+        return [self.get(i, j) for i, j in np.argwhere(self.ids).tolist()]
+
+    def render(self, screen, camera_pos, size):
+        """
+        Renders the tiles that are visible on the screen, only the tile positions that overlap the clip rect of the
+        screen are visited. Tiles are blitted directly from their id, so this doesn't create tile objects.
+
+        Args:
+            screen (pygame.Surface): The surface to render on.
+            camera_pos (numpy.ndarray): The position of the camera.
+            size (tuple): The size of the screen.
+        """
+        camera_pos = np.round(camera_pos).astype(np.int32)
+        clip = screen.get_clip()
+        i_begin, j_begin = self.cell((camera_pos[0] + clip.left, camera_pos[1] + clip.top))
+        i_end, j_end = self.cell((camera_pos[0] + clip.right - 1, camera_pos[1] + clip.bottom - 1))
+        for i, j in self.occupied(i_begin, i_end + 1, j_begin, j_end + 1):
+            tile = self.tiles.get((i, j))
+            if tile is not None:
+                tile.render(screen, camera_pos, size)
+            else:
+                sprite = get_sprite(TILES[self.tile_names[self.ids[i, j]]], size=TILE_SIZE)
+                screen.blit(sprite, (i * TILE_SIZE[0] - camera_pos[0], j * TILE_SIZE[1] - camera_pos[1]))
+
+    def detach(self):
+        """
+        Copies the grid to memory if it is a memory map of a file, such that the file can be overwritten.
+        """
+        if isinstance(self.ids, np.memmap):
+            self.ids = np.array(self.ids)
@@ -1,4 +1,5 @@
 from .game_object import GameObject
+from .object_types import ObjectType, collision_mask
 from .specials import *
 import numpy as np
 from .sprite_loader import *
@@ -21,8 +22,8 @@ class Tile(GameObject):
         """
         if autoset:
             pos = np.array([pos[0] - pos[0] % TILE_SIZE[0], pos[1] - pos[1] % TILE_SIZE[1]])
-        super(Tile, self).__init__(pos, np.zeros(2), sprite, world=world, type="tile", horizontal_movable=False,
-                                   vertical_movable=False, resize=TILE_SIZE)
+        super(Tile, self).__init__(pos, np.zeros(2), sprite, world=world, type=ObjectType.TILE,
+                                   horizontal_movable=False, vertical_movable=False, resize=TILE_SIZE)
 
 
 class MysteryBox(Tile):
@@ -39,9 +40,10 @@ class MysteryBox(Tile):
         assert color == "yellow" or color == "blue" or color == "red"
         self.input_parameters = (pos, color)
         self.color = color
-        sprite = TILES_SPECIAl[color]
+        sprite = get_sprite(TILES_SPECIAl[color], size=TILE_SIZE)
         super(MysteryBox, self).__init__(pos, sprite, world, autoset=autoset)
-        self.type = "change passive collide"
+        self.type = ObjectType.MYSTERY_BOX
+        self.collision_mask = collision_mask(self.type)
 
     def special_reaction_collision(self, side, other):
         """
@@ -56,7 +58,7 @@ class MysteryBox(Tile):
         """
         # when hit by the player in a certain way, a Mushroom will pop out and the object will be changed
         # into a Solid with the appropriate color
-        if side == "vertical" and other.type == "player" and (other.ducking or self.pos[1] < other.pos[1]):
+        if side == "vertical" and other.type == ObjectType.PLAYER and (other.ducking or self.pos[1] < other.pos[1]):
             color_solid = self.color
             if self.color == "yellow":
                 color_solid = "brown"
@@ -71,8 +73,7 @@ class MysteryBox(Tile):
             self.world.remove_gameobject(self)
             world.add_gameobject(solid)
             world.add_gameobject(mushroom)
-            if SettingsMenu.SETTINGS["Sound"] == "on":
-                POWERUP_APPEARS_SOUND.play()
+            world.play_sound(POWERUP_APPEARS_SOUND)
 
     def __str__(self):
         return "mystery box"
@@ -90,5 +91,5 @@ class NormalTile(Tile):
             autoset (bool, optional): Whether to automatically set the tile in the world. Defaults to True.
         """
         self.input_parameters = (pos, sprite_name)
-        sprite = TILES[sprite_name]
+        sprite = get_sprite(TILES[sprite_name], size=TILE_SIZE)
         super(NormalTile, self).__init__(pos, sprite, world, autoset=autoset)
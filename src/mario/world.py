@@ -1,59 +1,99 @@
 import numpy as np
 from .constants import *
 from .sprite_loader import BACKGROUNDS
+from .spatial_hash import SpatialHash
+from .physics import PhysicsStore
+from .animation import AnimationClock
+from .static_layer import StaticLayer
+from .tile_grid import TileGrid
+from .object_types import ObjectType
+from .snapshot import WorldSnapshot
+from .level_format import is_level_file, read_level, write_level, write_top_score, tile_grid_shape
+from .engine import KeyboardInput
+from .menus.settings_menu import SettingsMenu
 import pygame
 import pickle
 
-pygame.init()
-
 
 class World:
-    def __init__(self, size=None, background_image=None, load_file=None):
+    def __init__(self, size=None, background_image=None, load_file=None, memory_map=False):
         """
         Initializes a World object.
 
         Args:
-            size (tuple, optional): The size of the world. Defaults to None.
+            size (tuple, optional): The size of the world. Defaults to None. A world without size and load_file has
+                no content until load or load_level is called.
             background_image (str, optional): The background image of the world. Defaults to None.
             load_file (str, optional): The file to load the world from. Defaults to None.
+            memory_map (bool, optional): Whether the tile grid of the loaded file is memory mapped, see load.
+                Defaults to False.
 
         Raises:
-            AssertionError: If both size and background_image are None, or if load_file is None.
+            AssertionError: If only one of size and background_image is given, or if both size and load_file are
+                given.
         """
-        assert (size is not None and background_image is not None) or load_file is not None
-        if size is not None:
-            # creates an empty world with the given background and size
-            self.size = size
-            self.string_background_image = background_image  # for saving purposes
-            self.background_image = BACKGROUNDS[background_image]
-            self.background_size = self.background_image.get_size()
-            factor = self.size[1] / self.background_size[1]
-            self.background_size = (int(self.background_size[0] * factor), self.size[1])
-            self.background_image = pygame.transform.scale(self.background_image, self.background_size)
-            self.tiles_fast_access = [[None for _ in range(self.size[1] // TILE_SIZE[1] + 1)]
-                                      for _ in range(self.size[0] // TILE_SIZE[0] + 1)]
-            self.save_list = None
-            self.top_score = 0
+        assert (size is None) == (background_image is None) and (size is None or load_file is None)
+        self.save_list = None
 
         # All objects in different places, this is for speed
         self.player = None
         self.game_objects = []
-        self.tiles = []
+        # every game object and background object gets the number of objects added before it as render_order, such that
+        # the order of self.game_objects and self.background_objects (in which they are rendered) can be restored from a
+        # subset of them
+        self.n_added_objects = 0
+        # the tiles are kept in self.tile_grid, see the tiles property
         self.background_objects = []
+        # the background objects are also bucketed in a spatial hash, such that drawing a part of the static layer only
+        # needs the background objects in that part
+        self.background_hash = SpatialHash()
         self.top_score = 0
-
-        # on the surface, the background (with tiles etc.) will be blitted. This speeds up the entire thing
-        # a lot.
-        self.surface = None
+        # the player and all game objects (not tiles and background objects) are bucketed in a spatial hash, such
+        # that collisions only need to be checked with objects that are close. Static colliders (see
+        # GameObject.is_static) are kept in their own hash, which doesn't change while playing, all other objects
+        # are dynamic: they are in self.dynamic_objects (a dict used as an ordered set) and in self.spatial_hash
+        self.spatial_hash = SpatialHash()
+        self.static_hash = SpatialHash()
+        self.dynamic_objects = dict()
+        # when active_region_margin is not None, only the game objects within this margin around the screen are
+        # updated, all others are sleeping. The active objects are kept in a dict (used as an ordered set)
+        self.active_region_margin = None
+        self.active_objects = dict()
+        # the positions and velocities of all game objects with batch_physics are kept in the physics store, such
+        # that they can be moved all at once
+        self.physics = PhysicsStore()
+        # the shared frames of the animations of coins and enemies
+        self.animation_clock = AnimationClock()
+
+        # on the static layer, the background (with tiles etc.) will be blitted in chunks. This speeds up the entire
+        # thing a lot. It is created the first time the world is rendered with fast=True
+        self.static_layer = None
+        # what was drawn on the screen by render_dirty: the camera position, the rect and sprite of every visible game
+        # object and the parts of the world where the static layer changed since then. screen_scrolled tells whether
+        # the last call scrolled the screen
+        self.drawn_camera_pos = None
+        self.drawn_objects = dict()
+        self.static_changes = []
+        self.screen_scrolled = False
 
         self.camera_pos = np.zeros(2)
 
         self.gameover = False
         self.won = False
 
-        if load_file is not None:
+        # the player is controlled by the input source, by default the keyboard. A headless world doesn't use the
+        # screen or sounds, see HeadlessEngine
+        self.input_source = KeyboardInput()
+        self.headless = False
+        # when a FrameProfiler is set, the world measures how long the sections of an update take
+        self.profiler = None
+
+        if size is not None:
+            # creates an empty world with the given background and size
+            self.reset(size, background_image, 0)
+        elif load_file is not None:
             # load the world that is asked
-            self.load(load_file)
+            self.load(load_file, memory_map)
 
     def get_all_game_objects(self):
         """
@@ -64,6 +104,13 @@ class World:
             game_objects = [self.player]
         return game_objects + self.game_objects + self.background_objects + self.tiles
 
+    @property
+    def tiles(self):
+        """
+        All tiles of the world. This creates all tile objects, so use self.tile_grid when only some tiles are needed.
+        """
+        return self.tile_grid.all_tiles()
+
     def get_all_game_objects_no_tiles(self):
         """
         gets all game objects excluding tiles and background images
@@ -73,34 +120,149 @@ class World:
             game_objects = [self.player]
         return game_objects + self.game_objects
 
+    def get_close_game_objects(self, pos, size):
+        """
+        gets the player and game objects (excluding tiles and background images) that are close to the given
+        rectangle. Use this instead of get_all_game_objects_no_tiles() when only nearby objects are relevant.
+
+        Args:
+            pos (tuple): The position of the rectangle.
+            size (tuple): The size of the rectangle.
+
+        Returns:
+            list: The game objects in the buckets of the spatial hashes that overlap the rectangle, the dynamic ones
+                first.
+        """
+        return self.spatial_hash.query(pos, size) + self.static_hash.query(pos, size)
+
+    def update_gameobject_position(self, game_object):
+        """
+        Must be called when the position or size of a game object changed, such that the spatial hashes stay
+        correct.
+
+        Args:
+            game_object (GameObject): The game object that moved.
+        """
+        self.spatial_hash.update(game_object)
+        self.static_hash.update(game_object)
+
+    def refresh_gameobject(self, game_object):
+        """
+        Must be called when the size or movability of a game object changed.
+
+        Args:
+            game_object (GameObject): The game object that changed.
+        """
+        if game_object.physics_index is not None:
+            self.physics.sync(game_object)
+        if game_object in self.dynamic_objects or game_object in self.static_hash:
+            self.classify_gameobject(game_object)
+
+    def classify_gameobject(self, game_object):
+        """
+        Puts a game object in the static hash if it is a static collider, otherwise it is a dynamic object. An object
+        that is already classified is moved when its state changed (e.g. an object that can no longer move).
+
+        Args:
+            game_object (GameObject): A game object of self.game_objects.
+        """
+        if game_object.is_static():
+            if game_object not in self.static_hash:
+                self.dynamic_objects.pop(game_object, None)
+                self.spatial_hash.remove(game_object)
+                self.static_hash.add(game_object)
+        elif game_object not in self.dynamic_objects:
+            self.static_hash.remove(game_object)
+            self.dynamic_objects[game_object] = None
+            self.spatial_hash.add(game_object)
+
+    def set_active_region(self, margin=ACTIVE_REGION_MARGIN):
+        """
+        Enables or disables the active region mode. In this mode, only the game objects within the given margin
+        around the camera are updated, all other objects sleep until the camera comes close to them. This makes the
+        cost of an update independent of the size of the world.
+
+        Args:
+            margin (int, optional): The margin around the screen in pixels, None disables the active region.
+                Defaults to ACTIVE_REGION_MARGIN.
+        """
+        self.active_region_margin = margin
+        if margin is None:
+            for game_object in self.game_objects:
+                game_object.wake()
+            self.active_objects = dict()
+        else:
+            for game_object in self.game_objects:
+                game_object.sleep()
+            self.active_objects = dict()
+            self.update_active_region()
+
+    def update_active_region(self):
+        """
+        Recomputes which dynamic game objects are in the active region. Objects that enter the region are woken up,
+        objects that leave it are put to sleep.
+        """
+        margin = self.active_region_margin
+        pos = (self.camera_pos[0] - margin, self.camera_pos[1] - margin)
+        size = (SCREEN_SIZE[0] + 2 * margin, SCREEN_SIZE[1] + 2 * margin)
+        active_objects = dict()
+        for game_object in self.spatial_hash.query(pos, size):
+            if game_object is not self.player:
+                active_objects[game_object] = None
+                if game_object.sleeping:
+                    game_object.wake()
+
+        for game_object in self.active_objects:
+            if game_object not in active_objects and game_object.world is self:
+                game_object.sleep()
+        self.active_objects = active_objects
+
+    def get_active_game_objects(self):
+        """
+        gets the game objects that need to be updated: all dynamic game objects, or only the ones in the active
+        region if the active region mode is enabled. Static colliders are never updated.
+        """
+        if self.active_region_margin is None:
+            return list(self.dynamic_objects)
+        return list(self.active_objects)
+
     def render_tiles_and_basic(self, screen, size, camera_pos=np.zeros(2)):
         """
         This function renders the tiles, background, background objects and objects that dont change but do collide
-        on the given screen of given size.
+        on the given screen of given size. Only the repeats of the background and the background objects that overlap
+        the clip rect of the screen are drawn, so drawing a small part doesn't depend on the size of the world.
         """
-        for i in range(self.size[0] // self.background_size[0] + 1):
-            pos = (i * self.background_size[1] - camera_pos[0].astype(np.int32), - camera_pos[1].astype(np.int32))
+        clip = screen.get_clip()
+        left = int(camera_pos[0].astype(np.int32)) + clip.x
+        right = left + clip.width
+        # the background is repeated every background_size[1] pixels, every repeat is background_size[0] wide
+        step, width = self.background_size[1], self.background_size[0]
+        first = max(0, (left - width) // step + 1)
+        last = min(self.size[0] // width, (right - 1) // step)
+        for i in range(first, last + 1):
+            pos = (i * step - camera_pos[0].astype(np.int32), - camera_pos[1].astype(np.int32))
             screen.blit(self.background_image, pos)
-        for tile in self.tiles:
-            tile.render(screen, camera_pos, size)
-        for game_object in self.background_objects:
+        self.tile_grid.render(screen, camera_pos, size)
+        # one pixel more on every side, the positions of the objects are rounded
+        pos = (left - 1, int(camera_pos[1]) + clip.y - 1)
+        background_objects = self.background_hash.query(pos, (clip.width + 2, clip.height + 2))
+        background_objects.sort(key=lambda game_object: game_object.render_order)
+        for game_object in background_objects:
             game_object.render(screen, camera_pos, size)
 
     def render(self, screen, fast=True):
         """
-        Renders the entire world. fast=True will allow the world to use the faster blitting method with self.surface
-        This is not possible when a world is under construction, like in the level creator menu.
+        Renders the entire world. fast=True will allow the world to use the faster blitting method with
+        self.static_layer, which is drawn again where a tile or background object is added or removed. fast=False
+        renders the tiles and background objects directly.
         """
+        # the screen is drawn entirely, so render_dirty has to draw it entirely the next time as well
+        self.drawn_camera_pos = None
+        self.static_changes = []
         if fast:
-            if self.surface is None:
-                # if self.surface is not already created, blit everything that doesnt change through the entire
-                # game on self.surface
-                self.surface = pygame.Surface(self.size)
-                self.render_tiles_and_basic(self.surface, self.size)
-
-            screen.blit(
-                self.surface.subsurface((self.camera_pos[0], self.camera_pos[1], SCREEN_SIZE[0], SCREEN_SIZE[1])),
-                (0, 0))
+            if self.static_layer is None:
+                self.static_layer = StaticLayer(self)
+            self.static_layer.render(screen, self.camera_pos)
         else:
             self.render_tiles_and_basic(screen, SCREEN_SIZE, camera_pos=self.camera_pos)
 
@@ -109,6 +271,133 @@ class World:
         if self.player is not None:
             self.player.render(screen, self.camera_pos)
 
+    def visible_game_objects(self, screen_rect):
+        """
+        Returns the game objects (and the player) that are visible on the screen.
+
+        Args:
+            screen_rect (pygame.Rect): The rect of the screen.
+
+        Returns:
+            dict: Maps every visible game object to its rect on the screen and its sprite, the player comes last.
+        """
+        visible_objects = dict()
+        game_objects = self.get_close_game_objects(self.camera_pos, screen_rect.size)
+        # the same order as in render, the player is rendered on top of everything
+        game_objects.sort(key=lambda game_object: (game_object is self.player, game_object.render_order))
+        for game_object in game_objects:
+            position = np.round(game_object.pos - self.camera_pos).astype(np.int32)
+            rect = pygame.Rect(int(position[0]), int(position[1]), game_object.size[0], game_object.size[1])
+            if rect.colliderect(screen_rect):
+                visible_objects[game_object] = (rect, game_object.current_image())
+        return visible_objects
+
+    def render_dirty(self, screen, extra_rects=(), overlay_rects=()):
+        """
+        Renders the world like render, but only the parts of the screen that changed since the last call are drawn
+        again: the rects of game objects that moved, changed sprite, appeared or disappeared and of tiles that changed.
+        When the camera moved, the screen is scrolled by the camera movement and only the strips that came into view
+        are drawn. Only the game objects on the screen are drawn, so the time does not depend on the size of the world.
+
+        Args:
+            screen (pygame.Surface): The screen, which must still contain what was drawn in the last call.
+            extra_rects (list, optional): Other rects of the screen that must be drawn again, e.g. because the text
+                on them changed. Defaults to ().
+            overlay_rects (list, optional): The rects of the screen that are drawn on top of the world and don't
+                scroll with it, e.g. the hud. When the screen is scrolled, they are drawn again together with the
+                rects they were scrolled to. Defaults to ().
+
+        Returns:
+            list: The rects of the screen that were drawn. When self.screen_scrolled is True, everything on the
+                screen moved and the whole display must be updated.
+        """
+        if self.static_layer is None:
+            self.static_layer = StaticLayer(self)
+        screen_rect = screen.get_rect()
+        visible_objects = self.visible_game_objects(screen_rect)
+        camera_pos = np.round(self.camera_pos).astype(np.int32)
+        drawn_camera_pos = self.drawn_camera_pos
+        self.drawn_camera_pos = np.copy(self.camera_pos)
+        self.screen_scrolled = False
+
+        if drawn_camera_pos is not None:
+            dx, dy = (camera_pos - np.round(drawn_camera_pos).astype(np.int32)).tolist()
+        if drawn_camera_pos is None or abs(dx) >= screen_rect.width or abs(dy) >= screen_rect.height:
+            # nothing that is on the screen can be reused
+            self.static_layer.render(screen, self.camera_pos)
+            for rect, image in visible_objects.values():
+                screen.blit(image, rect)
+            self.drawn_objects = visible_objects
+            self.static_changes = []
+            return [screen_rect]
+
+        dirty_rects = [pygame.Rect(rect) for rect in extra_rects]
+        if dx != 0 or dy != 0:
+            screen.scroll(-dx, -dy)
+            self.screen_scrolled = True
+            # the strips that came into view
+            if dx != 0:
+                dirty_rects.append(pygame.Rect(screen_rect.width - dx if dx > 0 else 0, 0, abs(dx),
+                                               screen_rect.height))
+            if dy != 0:
+                dirty_rects.append(pygame.Rect(0, screen_rect.height - dy if dy > 0 else 0, screen_rect.width,
+                                               abs(dy)))
+            for rect in overlay_rects:
+                dirty_rects.append(pygame.Rect(rect))
+                dirty_rects.append(pygame.Rect(rect).move(-dx, -dy))
+            self.drawn_objects = {game_object: (rect.move(-dx, -dy), image)
+                                  for game_object, (rect, image) in self.drawn_objects.items()}
+
+        for pos, size in self.static_changes:
+            dirty_rects.append(pygame.Rect(int(pos[0]) - camera_pos[0], int(pos[1]) - camera_pos[1],
+                                           int(np.ceil(size[0])), int(np.ceil(size[1]))))
+        self.static_changes = []
+        for game_object, (rect, image) in visible_objects.items():
+            drawn = self.drawn_objects.pop(game_object, None)
+            if drawn is None:
+                dirty_rects.append(rect)
+            elif drawn[0] != rect or drawn[1] is not image:
+                dirty_rects.append(rect.union(drawn[0]))
+        # the objects that are no longer visible
+        for rect, image in self.drawn_objects.values():
+            dirty_rects.append(rect)
+        self.drawn_objects = visible_objects
+
+        dirty_rects = [rect.clip(screen_rect) for rect in dirty_rects]
+        dirty_rects = [rect for rect in dirty_rects if rect.width > 0 and rect.height > 0]
+        for dirty_rect in dirty_rects:
+            screen.set_clip(dirty_rect)
+            self.static_layer.render(screen, self.camera_pos)
+            for rect, image in visible_objects.values():
+                if rect.colliderect(dirty_rect):
+                    screen.blit(image, rect)
+        screen.set_clip(None)
+        return dirty_rects
+
+    def redraw_static(self, game_object):
+        """
+        Draws the part of the static layer where the given tile or background object is again, after it was added or
+        removed.
+
+        Args:
+            game_object (GameObject): The tile or background object.
+        """
+        self.redraw_static_area(game_object.pos, game_object.size)
+
+    def redraw_static_area(self, pos, size):
+        """
+        Draws the given part of the static layer again, after something in it changed.
+
+        Args:
+            pos (numpy.ndarray): The position of the part.
+            size (tuple): The size of the part.
+        """
+        if self.static_layer is not None:
+            self.static_layer.redraw(pos, size)
+            # only render_dirty uses the changes, and only when it drew the screen before
+            if self.drawn_camera_pos is not None:
+                self.static_changes.append((np.copy(pos), size))
+
     def allowed_game_object(self, game_object):
         """
         Determines whether a game object is allowed in the world.
@@ -119,9 +408,9 @@ class World:
         Returns:
             bool: True if the game object is allowed, False otherwise.
         """
-        if game_object.type == "tile" or game_object.passable:
+        if game_object.type == ObjectType.TILE or game_object.passable:
             return True
-        for game_object2 in self.get_all_game_objects_no_tiles():
+        for game_object2 in self.get_close_game_objects(game_object.pos, game_object.size):
             if game_object.collides(game_object2):
                 return False
         return True
@@ -140,22 +429,29 @@ class World:
             None
         """
         game_object.world = self
-        if game_object.type == "player":
+        if game_object.type == ObjectType.PLAYER:
             if self.player is None:
                 self.player = game_object
+                self.spatial_hash.add(game_object)
             else:
                 game_object.world = None
                 raise ValueError("World already has a player.")
-        elif game_object.type == "tile":
-            self.tiles.append(game_object)
-            pos = game_object.pos.astype(np.int32)
-            self.tiles_fast_access[pos[0] // TILE_SIZE[0]][pos[1] // TILE_SIZE[1]] = game_object
-            if self.surface is not None:
-                self.surface.blit(game_object.image, pos)
-        elif game_object.type == "background":
+        elif game_object.type == ObjectType.TILE:
+            self.tile_grid.add(game_object)
+            self.redraw_static(game_object)
+        elif game_object.type == ObjectType.BACKGROUND:
+            game_object.render_order = self.n_added_objects
+            self.n_added_objects += 1
             self.background_objects.append(game_object)
+            self.background_hash.add(game_object)
+            self.redraw_static(game_object)
         else:
+            game_object.render_order = self.n_added_objects
+            self.n_added_objects += 1
             self.game_objects.append(game_object)
+            self.classify_gameobject(game_object)
+            if game_object.batch_physics:
+                self.physics.add(game_object)
 
     def remove_gameobject(self, game_object):
         """
@@ -169,37 +465,54 @@ class World:
 
         """
         game_object.world = None
-        if game_object.type == "player":
+        if game_object.type == ObjectType.PLAYER:
             if self.player == game_object:
                 self.player = None
+                self.spatial_hash.remove(game_object)
             else:
                 raise ValueError("This player doesn't belong to the world.")
-        elif game_object.type == "tile":
-            self.tiles.remove(game_object)
-            pos = game_object.pos.astype(np.int32)
-            self.tiles_fast_access[pos[0] // TILE_SIZE[0]][pos[1] // TILE_SIZE[1]] = None
-        elif game_object.type == "background":
+        elif game_object.type == ObjectType.TILE:
+            self.tile_grid.remove(game_object)
+            self.redraw_static(game_object)
+        elif game_object.type == ObjectType.BACKGROUND:
             self.background_objects.remove(game_object)
+            self.background_hash.remove(game_object)
+            self.redraw_static(game_object)
         else:
             self.game_objects.remove(game_object)
+            self.dynamic_objects.pop(game_object, None)
+            self.spatial_hash.remove(game_object)
+            self.static_hash.remove(game_object)
+            if game_object.physics_index is not None:
+                self.physics.remove(game_object)
+
+    def play_sound(self, sound):
+        """
+        Plays the given sound, unless sounds are turned off in the settings or the world is headless.
+
+        Args:
+            sound (pygame.mixer.Sound): The sound to play.
+        """
+        if not self.headless and SettingsMenu.SETTINGS["Sound"] == "on":
+            sound.play()
 
     def update_handle_keys(self):
         """
-        handles key movements, allowing the user to move the player
+        handles key movements, allowing the user to move the player with the buttons pressed in the input source
         """
         if self.player is not None:
-            keys = pygame.key.get_pressed()  # checking pressed keys
-            if keys[pygame.K_LEFT] or pygame.K_a:
+            keys = self.input_source.get_state()  # checking pressed keys
+            if keys.left:
                 self.player.horizontal_move(direction=-1)
-            elif keys[pygame.K_RIGHT] or pygame.K_d:
+            elif keys.right:
                 self.player.horizontal_move(direction=1)
             else:
                 self.player.horizontal_move(direction=0)
-            if (keys[pygame.K_UP] or pygame.K_w) and not self.player.jumping:
+            if keys.up and not self.player.jumping:
                 self.player.jump()
-            elif not (keys[pygame.K_UP] or pygame.K_w) and self.player.jumping:
+            elif not keys.up and self.player.jumping:
                 self.player.end_jump()
-            if keys[pygame.K_DOWN] or pygame.K_s:
+            if keys.down:
                 self.player.duck()
             else:
                 self.player.stop_ducking()
@@ -214,12 +527,90 @@ class World:
         Returns:
             None
         """
+        self.animation_clock.advance(time)
+        self.begin_section("input")
         self.update_handle_keys()
+        self.end_section()
         if self.player is not None:
+            self.begin_section("player")
             self.player.update(time)
-
-        for game_object in self.game_objects:
+            self.update_gameobject_position(self.player)
+            self.end_section()
+
+        self.begin_section("enemies")
+        batch_objects = []
+        for game_object in self.get_active_game_objects():
+            if game_object.world is not self:
+                # the object was removed during this update
+                continue
+            if game_object.physics_index is not None:
+                batch_objects.append(game_object)
+                continue
             game_object.update(time)
+            if game_object.world is self:
+                self.update_gameobject_position(game_object)
+
+        self.update_batch_physics(batch_objects, time)
+        self.end_section()
+
+    def begin_section(self, name):
+        """
+        Starts measuring a section of the frame with the profiler, if the world has one.
+
+        Args:
+            name (str): The name of the section.
+        """
+        if self.profiler is not None:
+            self.profiler.begin(name)
+
+    def end_section(self):
+        """
+        Stops measuring the section of the frame that was started last, if the world has a profiler.
+        """
+        if self.profiler is not None:
+            self.profiler.end()
+
+    def update_batch_physics(self, game_objects, time):
+        """
+        Updates the game objects in the physics store. This does the same as GameObject.update, but the displacements,
+        gravity, horizontal movement and the borders of the world are computed for all objects at once on the arrays
+        of the store. Collisions are still handled per object.
+
+        Args:
+            game_objects (list): The game objects to update, all of them must be in the physics store.
+            time (float): The elapsed time since the last update.
+        """
+        if len(game_objects) == 0:
+            return
+
+        # objects can be removed from the world (and the store) by a collision, so the indices are computed again
+        # after every round of collisions. The vertical movement is applied one object at a time, right before its
+        # collisions are checked: objects standing on top of each other would otherwise sink into each other.
+        displacement = self.physics.displacement(self.physics.indices(game_objects), 1, time)
+        for game_object, vertical_displacement in zip(game_objects, displacement):
+            if game_object.world is self and game_object.vertical_movable:
+                game_object.pos[1] += game_object.swept_displacement(1, vertical_displacement)
+                game_object.check_collision_update("vertical")
+
+        indices = self.physics.indices(game_objects)
+        self.physics.apply_gravity(indices, time)
+        displacement = self.physics.displacement(indices, 0, time)
+        # only fast objects can pass through something, their movement is swept (see GameObject.swept_displacement)
+        for k in np.flatnonzero(np.abs(displacement) > SWEEP_DISTANCE).tolist():
+            displacement[k] = self.physics.objects[indices[k]].swept_displacement(0, displacement[k])
+        self.physics.move(indices, 0, displacement)
+        for game_object in game_objects:
+            if game_object.world is self and game_object.horizontal_movable:
+                game_object.check_collision_update("horizontal")
+
+        for game_object in self.physics.handle_outside_world_size(self.physics.indices(game_objects), self.size):
+            game_object.handle_outside_world_size()
+
+        for game_object in game_objects:
+            if game_object.world is self:
+                game_object.update_state(time)
+                if game_object.world is self:
+                    self.update_gameobject_position(game_object)
 
     def update(self, time):
         """
@@ -231,24 +622,106 @@ class World:
         Returns:
             None
         """
-        passed_time = 0
-        while time > passed_time:
-            # Not allowing the update to be too high, because the game would glitch if this happened
-            new_passed_time = np.minimum(0.02, time - passed_time)
-            self.one_update(new_passed_time)
-            passed_time += new_passed_time
+        if self.active_region_margin is not None:
+            self.update_active_region()
+
+        # a long time is split into equal updates of at most MAX_TIME_STEP, fast movements are swept so they don't
+        # pass through tiles (see GameObject.swept_displacement)
+        n_updates = int(np.ceil(time / MAX_TIME_STEP))
+        for _ in range(n_updates):
+            self.one_update(time / n_updates)
 
+        self.after_update()
+
+    def step(self, time=FIXED_TIME_STEP):
+        """
+        Performs one update with a fixed time step, this is used to simulate the world independent of the real time.
+
+        Args:
+            time (float, optional): The time step. Defaults to FIXED_TIME_STEP.
+        """
+        if self.active_region_margin is not None:
+            self.update_active_region()
+        self.one_update(time)
+        self.after_update()
+
+    def after_update(self):
+        """
+        Updates the camera position and the top score after all game objects were updated.
+        """
+        if self.player is not None:
+            self.update_camera()
+
+            if self.gameover:
+                if self.player.score > self.top_score:
+                    self.top_score = self.player.score
+
+    def update_camera(self):
+        """
+        Updates the camera position based on the position of the player.
+        """
         if self.player is not None:
-            # updates the camera position based on the position of the player
             player_pos_x = self.player.pos[0] + self.player.size[0] // 2
             player_pos_y = self.player.pos[1] + self.player.size[1] // 2
             x_camera_pos = np.minimum(np.maximum(0, player_pos_x + CAMERA_POS[0]), self.size[0] - SCREEN_SIZE[0])
             y_camera_pos = np.minimum(np.maximum(0, player_pos_y + CAMERA_POS[1]), self.size[1] - SCREEN_SIZE[1])
             self.camera_pos = np.array([x_camera_pos, y_camera_pos])
 
-            if self.gameover:
-                if self.player.score > self.top_score:
-                    self.top_score = self.player.score
+    def snapshot(self):
+        """
+        Takes a snapshot of the dynamic state of the world, it can be restored with restore.
+
+        Returns:
+            WorldSnapshot: The snapshot.
+        """
+        return WorldSnapshot(self)
+
+    def restore(self, snapshot):
+        """
+        Puts the world back in the state of the given snapshot: the game objects that were added since are removed,
+        the ones that were removed are back and every game object gets its attributes of the snapshot. No game object
+        is created and only the tiles that changed are drawn again on the static layer. The snapshot can be restored
+        again afterwards. The top score is kept.
+
+        Args:
+            snapshot (WorldSnapshot): A snapshot of this world, see snapshot.
+        """
+        # the arrays of the game objects in the physics store are given back before they get their old attributes
+        self.physics.clear()
+        self.spatial_hash.clear()
+        self.static_hash.clear()
+        self.dynamic_objects = dict()
+        self.game_objects = []
+        for game_object, state in snapshot.game_objects:
+            WorldSnapshot.restore_state(game_object, state)
+            game_object.physics_index = None
+            self.game_objects.append(game_object)
+            self.classify_gameobject(game_object)
+            if game_object.batch_physics:
+                self.physics.add(game_object)
+        self.player = None
+        if snapshot.player is not None:
+            self.player, state = snapshot.player
+            WorldSnapshot.restore_state(self.player, state)
+            self.spatial_hash.add(self.player)
+
+        changed_cells = self.tile_grid.restore_ids(snapshot.tile_ids)
+        self.tile_grid.tiles = dict(snapshot.tiles)
+        for tile in self.tile_grid.tiles.values():
+            tile.world = self
+        for i, j in changed_cells:
+            self.redraw_static_area(np.array([i * TILE_SIZE[0], j * TILE_SIZE[1]]), TILE_SIZE)
+
+        self.camera_pos = np.copy(snapshot.camera_pos)
+        self.animation_clock.time = snapshot.animation_time
+        self.gameover = snapshot.gameover
+        self.won = snapshot.won
+        self.drawn_camera_pos = None
+        self.drawn_objects = dict()
+        if self.active_region_margin is not None:
+            self.set_active_region(self.active_region_margin)
+        else:
+            self.active_objects = dict()
 
     def save_top_score(self, file):
         """
@@ -257,12 +730,16 @@ class World:
         Parameters:
         - file (str): The path to the file where the state will be saved.
         """
-        self.save_list[2] = self.top_score
-        pickle.dump(self.save_list, open(file, "wb"))
+        if self.save_list is not None:
+            # the world was loaded from an old pickled file
+            self.save_list[2] = self.top_score
+            pickle.dump(self.save_list, open(file, "wb"))
+        else:
+            write_top_score(file, self.top_score)
 
     def save(self, file):
         """
-        Saves the world to the given file.
+        Saves the world to the given file, see level_format for the format of the file.
 
         Parameters:
         - file (str): The file path to save the world data.
@@ -270,48 +747,91 @@ class World:
         Returns:
         - None
         """
-        save_list = [self.size, self.string_background_image, 0]
-        game_objects = self.get_all_game_objects()
-
-        for game_object in game_objects:
-            save_list += [[game_object.__class__, game_object.input_parameters]]
-
-        pickle.dump(save_list, open(file, "wb"))
+        # the file might be the one the tile grid is memory mapped to
+        self.tile_grid.detach()
+        write_level(file, self)
 
-    def load(self, file):
+    def load(self, file, memory_map=False):
         """
-        Loads the world from the given file
+        Loads the world from the given file, this can be a level file (see level_format) or an old pickled world.
 
         Parameters:
             file (str): The path to the file containing the saved world data.
+            memory_map (bool, optional): Whether the tile grid of a level file is memory mapped instead of read,
+                changes to the tiles are never written to the file. Defaults to False.
 
         Returns:
             None
         """
-        save_list = pickle.load(open(file, "rb"))
-        self.save_list = save_list
+        if is_level_file(file):
+            self.load_level(read_level(file, memory_map))
+        else:
+            save_list = pickle.load(open(file, "rb"))
+            self.save_list = save_list
+            self.reset(save_list[0], save_list[1], save_list[2])
+            # loads all game objects
+            for element in save_list[3:]:
+                self.add_gameobject(element[0](*element[1]))
+
+    def load_level(self, level, cancelled=None):
+        """
+        Replaces the content of the world by the given level.
+
+        Parameters:
+            level (LevelData): The level, e.g. read from a level file. Its tile grid is used by the world, not copied.
+            cancelled (callable, optional): Called before every game object is created, when it returns True the
+                loading stops and the world is left half loaded. Defaults to None.
+
+        Returns:
+            bool: Whether the level was loaded entirely, False if it was cancelled.
+        """
+        self.save_list = None
+        self.reset(level.size, level.background_image, level.top_score,
+                   TileGrid(level.tile_grid.shape, self, level.tile_grid, level.tile_names))
+        # loads all game objects
+        for game_object in level.iter_game_objects(cancelled):
+            if game_object is None:
+                return False
+            self.add_gameobject(game_object)
+        return True
+
+    def reset(self, size, background_image, top_score, tile_grid=None):
+        """
+        Removes all game objects from the world and gives it a new size and background.
+
+        Parameters:
+            size (tuple): The new size of the world.
+            background_image (str): The name of the new background image.
+            top_score (int): The new top score.
+            tile_grid (TileGrid, optional): The new tiles of the world. Defaults to None, which gives the world an
+                empty tile grid.
+        """
         self.camera_pos = np.zeros(2)
         self.gameover = False
         self.won = False
 
         self.player = None
         self.game_objects = []
-        self.tiles = []
+        self.spatial_hash.clear()
+        self.static_hash.clear()
+        self.dynamic_objects = dict()
+        self.physics.clear()
+        self.static_layer = None
+        self.drawn_camera_pos = None
+        self.drawn_objects = dict()
+        self.static_changes = []
 
-        self.size = save_list[0]
+        self.size = size
 
-        self.tiles_fast_access = [[None for _ in range(self.size[1] // TILE_SIZE[1] + 1)]
-                                    for _ in range(self.size[0] // TILE_SIZE[0] + 1)]
+        if tile_grid is None:
+            tile_grid = TileGrid(tile_grid_shape(self.size), self)
+        self.tile_grid = tile_grid
 
         # set background image and resizes it so it fits the screen better.
-        self.background_image = BACKGROUNDS[save_list[1]]
-        self.string_background_image = save_list[1]
+        self.background_image = BACKGROUNDS[background_image]
+        self.string_background_image = background_image
         self.background_size = self.background_image.get_size()
         factor = self.size[1] / self.background_size[1]
         self.background_size = (int(self.background_size[0] * factor), self.size[1])
         self.background_image = pygame.transform.scale(self.background_image, self.background_size)
-        self.top_score = save_list[2]
-        # loads all game objects
-        for element in save_list[3:]:
-            game_object = element[0](*element[1])
-            self.add_gameobject(game_object)
+        self.top_score = top_score